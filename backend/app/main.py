@@ -3,13 +3,16 @@ BetaShift - Carousel Assignment Automation System
 FastAPI Main Application
 """
 
+import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine, Base
-from app.models import Airline, Carousel, Flight, Assignment  # noqa: F401
+from app import migrations
+from app.database import engine
+from app.services import change_service
+from app.services.compression import CompressionMiddleware
 
 
 # =============================================================================
@@ -26,15 +29,22 @@ async def lifespan(app: FastAPI):
     # === Startup ===
     print("BetaShift server starting...")
 
-    # Create all tables if they don't exist
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables ready!")
+    # The schema is migrated out-of-band (python -m app.tools.migrate upgrade);
+    # workers only check its version. AUTO_MIGRATE=true migrates here (local dev).
+    if os.getenv("AUTO_MIGRATE", "false").lower() == "true":
+        migrations.upgrade(engine)
+    version = migrations.check_schema(engine)
+    print(f"Database schema version {version} ready!")
+
+    # Invalidate per-process caches when other workers write
+    if change_service.start_listener(engine):
+        print("Listening for changes from other workers")
 
     yield  # App runs at this point
 
     # === Shutdown ===
     print("BetaShift server shutting down...")
+    change_service.stop_listener()
 
 
 # =============================================================================
@@ -65,16 +75,26 @@ app.add_middleware(
 )
 
 
+# =============================================================================
+# Response Compression (gzip/brotli, negotiated by Accept-Encoding)
+# =============================================================================
+
+app.add_middleware(CompressionMiddleware)
+
+
 # =============================================================================
 # Router Registration
 # =============================================================================
 
-from app.routers import airlines, carousels, flights, assignments
+from app.routers import airlines, carousels, flights, assignments, analytics, scenarios, history
 
 app.include_router(airlines.router, prefix="/api/airlines", tags=["airlines"])
 app.include_router(carousels.router, prefix="/api/carousels", tags=["carousels"])
 app.include_router(flights.router, prefix="/api/flights", tags=["flights"])
 app.include_router(assignments.router, prefix="/api/assignments", tags=["assignments"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(scenarios.router, prefix="/api/scenarios", tags=["scenarios"])
+app.include_router(history.router, prefix="/api/history", tags=["history"])
 
 
 # =============================================================================
@@ -0,0 +1,85 @@
+"""
+Schema Migrations
+Versioned schema changes, applied once out-of-band (python -m app.tools.migrate)
+
+Web workers only compare the recorded version with SCHEMA_VERSION at
+startup (one query), instead of running create_all on every boot.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.migrations.versions import MIGRATIONS, Migration
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+# Kept out of Base.metadata so the baseline never creates or drops it
+version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class SchemaVersionError(Exception):
+    """The database schema is older than this code expects."""
+
+
+def current_version(connection: Connection) -> int:
+    """Latest applied migration (0 for a database never migrated)."""
+    # Checked up front: any other database error must reach the caller
+    if not inspect(connection).has_table(version_table.name):
+        return 0
+    return connection.execute(select(func.max(version_table.c.version))).scalar() or 0
+
+
+def upgrade(engine: Engine, target: int = SCHEMA_VERSION) -> list[Migration]:
+    """
+    Apply pending migrations up to target, each in its own transaction.
+
+    Returns:
+        The migrations that were applied
+    """
+    with engine.begin() as connection:
+        version_table.create(connection, checkfirst=True)
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version > target:
+            break
+        with engine.begin() as connection:
+            # Re-read inside the transaction; a concurrent run that got here
+            # first makes the version insert below fail (primary key)
+            if migration.version <= current_version(connection):
+                continue
+            migration.apply(connection)
+            connection.execute(version_table.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow(),
+            ))
+        applied.append(migration)
+    return applied
+
+
+def check_schema(engine: Engine) -> int:
+    """
+    Startup check: the database must be at least at SCHEMA_VERSION.
+    A newer schema is accepted (workers of the previous release keep
+    running while a deploy rolls out).
+
+    Raises:
+        SchemaVersionError: If migrations are pending
+    """
+    with engine.connect() as connection:
+        version = current_version(connection)
+    if version < SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, this release needs "
+            f"{SCHEMA_VERSION}. Run: python -m app.tools.migrate upgrade"
+        )
+    return version
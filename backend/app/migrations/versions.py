@@ -0,0 +1,249 @@
+"""
+Migration Versions
+Ordered list of schema migrations (append only, never edit an applied one)
+
+Every migration spells out its own DDL with frozen table definitions, never
+the models: a model describes the newest schema, a migration one step of it.
+0001 is the schema databases had before migrations existed (created on boot
+by earlier releases); it only creates the tables that are missing, so those
+databases are adopted as they are. Every later migration runs on exactly
+the schema left by the one before it and changes it unconditionally.
+Data backfills read and write frozen tables too; they may reuse pure
+helpers (e.g. analytics minute arithmetic), never ORM queries.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    false,
+    select,
+)
+from sqlalchemy.engine import Connection
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change"""
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def add_column(connection: Connection, table: str, column: Column) -> None:
+    """ALTER TABLE ... ADD COLUMN (dialect-specific column DDL)."""
+    Table(table, MetaData(), column)  # The DDL compiler needs the column on a table
+    spec = connection.dialect.ddl_compiler(connection.dialect, None).get_column_specification(column)
+    connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {spec}")
+
+
+def _reference(metadata: MetaData, table: str, key: str, key_type) -> Table:
+    """Primary key of an existing table, so foreign keys to it compile (not created)."""
+    return Table(table, metadata, Column(key, key_type, primary_key=True))
+
+
+# =============================================================================
+# Migrations
+# =============================================================================
+
+def _baseline(connection: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        "airlines", metadata,
+        Column("airline_code", String(10), primary_key=True),
+        Column("airline_name", String(100), nullable=False),
+        Column("color_code", String(7)),
+    )
+    Table(
+        "carousels", metadata,
+        Column("carousel_id", String(10), primary_key=True),
+        Column("terminal", String(10)),
+        Column("capacity", Integer),
+        Column("is_active", Boolean),
+    )
+    Table(
+        "flights", metadata,
+        Column("flight_id", String(20), primary_key=True),
+        Column("airline", String(10), ForeignKey("airlines.airline_code"), nullable=False),
+        Column("flight_number", String(10), nullable=False),
+        Column("scheduled_time", DateTime, nullable=False),
+        Column("pax_count", Integer),
+        Column("baggage_count", Integer),
+        Column("aircraft_type", String(20)),
+        Column("created_at", DateTime),
+    )
+    Table(
+        "assignments", metadata,
+        Column("assignment_id", Integer, primary_key=True, autoincrement=True),
+        Column("flight_id", String(20), ForeignKey("flights.flight_id"), nullable=False),
+        Column("carousel_id", String(10), ForeignKey("carousels.carousel_id"), nullable=False),
+        Column("start_time", DateTime, nullable=False),
+        Column("end_time", DateTime, nullable=False),
+        Column("assignment_type", String(10)),
+        Column("created_at", DateTime),
+        Column("updated_at", DateTime),
+    )
+    # Databases from before migrations already have these tables
+    metadata.create_all(connection, checkfirst=True)
+
+
+def _daily_usage(connection: Connection) -> None:
+    metadata = MetaData()
+    usage = Table(
+        "daily_usage", metadata,
+        Column("usage_date", Date, primary_key=True),
+        Column("scope", String(10), primary_key=True),
+        Column("scope_id", String(10), primary_key=True),
+        Column("minute_counts", JSON, nullable=False),
+        Column("assignment_count", Integer),
+        Column("busy_minutes", Integer),
+        Column("conflict_minutes", Integer),
+        Column("peak_concurrency", Integer),
+        Column("peak_minute", Integer),
+        Column("hourly_minutes", JSON),
+        Column("idle_gap_count", Integer),
+        Column("longest_idle_minutes", Integer),
+        Column("updated_at", DateTime),
+    )
+    usage.create(connection)
+    _backfill_daily_usage(connection, metadata, usage)
+
+
+def _backfill_daily_usage(connection: Connection, metadata: MetaData, usage: Table) -> None:
+    """Aggregates of the assignments already stored (what rebuild_day computes)."""
+    from app.services.analytics_service import MINUTES_PER_DAY, idle_gaps, split_by_day
+
+    carousels = Table(
+        "carousels", metadata,
+        Column("carousel_id", String(10), primary_key=True),
+        Column("terminal", String(10)),
+    )
+    assignments = Table(
+        "assignments", metadata,
+        Column("assignment_id", Integer, primary_key=True),
+        Column("carousel_id", String(10)),
+        Column("start_time", DateTime),
+        Column("end_time", DateTime),
+    )
+    terminals = dict(connection.execute(select(carousels.c.carousel_id, carousels.c.terminal)).all())
+
+    minutes: dict[tuple, list[int]] = {}
+    started: Counter = Counter()
+    rows = connection.execute(select(
+        assignments.c.carousel_id, assignments.c.start_time, assignments.c.end_time,
+    ))
+    for carousel_id, start, end in rows:
+        if end <= start:
+            continue
+        scopes = [("CAROUSEL", carousel_id)]
+        if terminals.get(carousel_id):
+            scopes.append(("TERMINAL", terminals[carousel_id]))
+        for day, first, last in split_by_day(start, end):
+            for scope, scope_id in scopes:
+                counts = minutes.setdefault((day, scope, scope_id), [0] * MINUTES_PER_DAY)
+                for minute in range(first, last):
+                    counts[minute] += 1
+                if day == start.date():
+                    started[day, scope, scope_id] += 1
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    values = []
+    for (day, scope, scope_id), counts in minutes.items():
+        peak = max(counts)
+        gaps = idle_gaps(counts)
+        values.append({
+            "usage_date": day,
+            "scope": scope,
+            "scope_id": scope_id,
+            "minute_counts": counts,
+            "assignment_count": started[day, scope, scope_id],
+            "busy_minutes": sum(1 for count in counts if count > 0),
+            "conflict_minutes": sum(1 for count in counts if count > 1),
+            "peak_concurrency": peak,
+            "peak_minute": counts.index(peak) if peak else None,
+            "hourly_minutes": [
+                sum(1 for count in counts[hour * 60:(hour + 1) * 60] if count > 0)
+                for hour in range(24)
+            ],
+            "idle_gap_count": len(gaps),
+            "longest_idle_minutes": max((end - start for start, end in gaps), default=0),
+            "updated_at": now,
+        })
+    if values:
+        connection.execute(usage.insert(), values)
+
+
+def _carousel_rules(connection: Connection) -> None:
+    add_column(connection, "airlines", Column("terminal", String(10)))
+    add_column(connection, "carousels", Column("wide_body_only", Boolean, server_default=false()))
+
+    metadata = MetaData()
+    _reference(metadata, "carousels", "carousel_id", String(10))
+    Table(
+        "carousel_maintenance", metadata,
+        Column("maintenance_id", Integer, primary_key=True, autoincrement=True),
+        Column("carousel_id", String(10), ForeignKey("carousels.carousel_id"), nullable=False),
+        Column("start_time", DateTime, nullable=False),
+        Column("end_time", DateTime, nullable=False),
+        Column("reason", String(100)),
+        Column("created_at", DateTime),
+    ).create(connection)
+
+
+def _assignment_versions(connection: Connection) -> None:
+    add_column(connection, "assignments", Column("version", Integer, nullable=False, server_default="1"))
+
+
+def _assignment_history(connection: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        "assignment_events", metadata,
+        Column("event_id", Integer, primary_key=True, autoincrement=True),
+        Column("plan_date", Date, nullable=False),
+        Column("assignment_id", Integer, nullable=False),
+        Column("event_type", String(10), nullable=False),
+        Column("batch_id", String(36), nullable=False),
+        Column("batch_kind", String(10), nullable=False),
+        Column("before", JSON),
+        Column("after", JSON),
+        Column("created_at", DateTime),
+        Index("ix_assignment_events_batch_id", "batch_id"),
+        Index("ix_assignment_events_plan_date_event_id", "plan_date", "event_id"),
+    )
+    Table(
+        "plan_snapshots", metadata,
+        Column("snapshot_id", Integer, primary_key=True, autoincrement=True),
+        Column("plan_date", Date, nullable=False),
+        Column("last_event_id", Integer, nullable=False),
+        Column("assignments", JSON, nullable=False),
+        Column("stacks", JSON),  # Undo/redo batch IDs as of the snapshot
+        Column("created_at", DateTime),
+        Index("ix_plan_snapshots_plan_date_last_event_id", "plan_date", "last_event_id"),
+    )
+    metadata.create_all(connection, checkfirst=False)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline", _baseline),
+    Migration(2, "daily utilization aggregates", _daily_usage),
+    Migration(3, "carousel rules and maintenance windows", _carousel_rules),
+    Migration(4, "assignment versions", _assignment_versions),
+    Migration(5, "assignment history and plan snapshots", _assignment_history),
+]
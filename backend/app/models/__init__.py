@@ -5,12 +5,20 @@ Export all models for easy import
 
 from app.models.airline import Airline
 from app.models.carousel import Carousel
+from app.models.carousel_maintenance import CarouselMaintenance
 from app.models.flight import Flight
 from app.models.assignment import Assignment
+from app.models.assignment_event import AssignmentEvent
+from app.models.plan_snapshot import PlanSnapshot
+from app.models.daily_usage import DailyUsage
 
 __all__ = [
     "Airline",
     "Carousel",
+    "CarouselMaintenance",
     "Flight",
     "Assignment",
+    "AssignmentEvent",
+    "PlanSnapshot",
+    "DailyUsage",
 ]
@@ -17,12 +17,14 @@ class Airline(Base):
         airline_code: Airline code (PK, e.g., "KE", "OZ", "7C")
         airline_name: Full airline name (e.g., "Korean Air", "Asiana Airlines")
         color_code: UI display color in hex format (e.g., "#0F4C81")
+        terminal: Terminal the airline must use (e.g., "T1"), None = any terminal
     """
     __tablename__ = "airlines"
 
     airline_code = Column(String(10), primary_key=True)
     airline_name = Column(String(100), nullable=False)
     color_code = Column(String(7), default="#808080")
+    terminal = Column(String(10), nullable=True)
 
     # Relationships
     flights = relationship("Flight", back_populates="airline_info")
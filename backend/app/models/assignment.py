@@ -21,7 +21,8 @@ class Assignment(Base):
         carousel_id: Carousel identifier (FK to carousels table)
         start_time: Carousel occupation start time
         end_time: Carousel occupation end time
-        assignment_type: Assignment type ("MANUAL" or "AI")
+        assignment_type: Assignment type ("MANUAL", "AI" or "FEED" from the upstream feed)
+        version: Row version for optimistic concurrency (incremented on every update)
         created_at: Record creation timestamp
         updated_at: Record update timestamp
     """
@@ -41,6 +42,7 @@ class Assignment(Base):
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, nullable=False)
     assignment_type = Column(String(10), default="MANUAL")
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -48,5 +50,8 @@ class Assignment(Base):
     flight = relationship("Flight", back_populates="assignments")
     carousel = relationship("Carousel", back_populates="assignments")
 
+    # ORM updates add "WHERE version = :v" and bump the version automatically
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<Assignment {self.assignment_id}: {self.flight_id} -> {self.carousel_id}>"
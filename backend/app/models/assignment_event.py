@@ -0,0 +1,48 @@
+"""
+Assignment Event Model
+Append-only log of every assignment mutation (audit, undo/redo, restore)
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, Index
+
+from app.database import Base
+
+
+class AssignmentEvent(Base):
+    """
+    Assignment event table - One row per assignment mutation per plan day
+
+    Rows are only ever inserted. A move to another day is logged on both
+    days so each day's history can be replayed on its own.
+
+    Columns:
+        event_id: Auto-increment primary key (defines replay order)
+        plan_date: Day the event belongs to (assignment start date)
+        assignment_id: Assignment identifier (no FK, deleted rows stay logged)
+        event_type: "CREATE", "UPDATE" or "DELETE"
+        batch_id: Groups the events of one user action or AI run
+        batch_kind: "MANUAL", "AI", "FEED", "SCENARIO", "UNDO", "REDO" or "RESTORE"
+        before: Assignment state before the event (None for CREATE)
+        after: Assignment state after the event (None for DELETE)
+        created_at: Event timestamp
+    """
+    __tablename__ = "assignment_events"
+
+    event_id = Column(Integer, primary_key=True, autoincrement=True)
+    plan_date = Column(Date, nullable=False)
+    assignment_id = Column(Integer, nullable=False)
+    event_type = Column(String(10), nullable=False)
+    batch_id = Column(String(36), nullable=False, index=True)
+    batch_kind = Column(String(10), nullable=False)
+    before = Column(JSON)
+    after = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_assignment_events_plan_date_event_id", "plan_date", "event_id"),
+    )
+
+    def __repr__(self):
+        return f"<AssignmentEvent {self.event_id}: {self.event_type} {self.assignment_id}>"
@@ -18,6 +18,7 @@ class Carousel(Base):
         terminal: Terminal information (e.g., "T1", "T2")
         capacity: Carousel capacity
         is_active: Whether the carousel is currently operational
+        wide_body_only: Whether only wide-body aircraft may use the carousel
     """
     __tablename__ = "carousels"
 
@@ -25,9 +26,11 @@ class Carousel(Base):
     terminal = Column(String(10))
     capacity = Column(Integer, default=100)
     is_active = Column(Boolean, default=True)
+    wide_body_only = Column(Boolean, default=False)
 
     # Relationships
     assignments = relationship("Assignment", back_populates="carousel")
+    maintenance_windows = relationship("CarouselMaintenance", back_populates="carousel")
 
     def __repr__(self):
         return f"<Carousel {self.carousel_id}>"
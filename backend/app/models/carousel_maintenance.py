@@ -0,0 +1,43 @@
+"""
+Carousel Maintenance Model
+Stores time windows in which a carousel is out of service
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+
+class CarouselMaintenance(Base):
+    """
+    Carousel maintenance table - Planned out-of-service windows
+
+    Columns:
+        maintenance_id: Auto-increment primary key
+        carousel_id: Carousel identifier (FK to carousels table)
+        start_time: Maintenance start time
+        end_time: Maintenance end time
+        reason: Free text description (e.g., "Belt repair")
+        created_at: Record creation timestamp
+    """
+    __tablename__ = "carousel_maintenance"
+
+    maintenance_id = Column(Integer, primary_key=True, autoincrement=True)
+    carousel_id = Column(
+        String(10),
+        ForeignKey("carousels.carousel_id"),
+        nullable=False
+    )
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    reason = Column(String(100))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    carousel = relationship("Carousel", back_populates="maintenance_windows")
+
+    def __repr__(self):
+        return f"<CarouselMaintenance {self.carousel_id}: {self.start_time} ~ {self.end_time}>"
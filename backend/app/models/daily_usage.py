@@ -0,0 +1,52 @@
+"""
+Daily Usage Model
+Stores precomputed per-day carousel/terminal occupancy aggregates
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, Date, DateTime, JSON
+
+from app.database import Base
+
+
+class DailyUsage(Base):
+    """
+    Daily usage table - Occupancy aggregate for one carousel or terminal per day
+
+    Maintained incrementally on every assignment write
+    (see services/analytics_service.py), so analytics never rescan assignments.
+
+    Columns:
+        usage_date: Day the aggregate covers (PK)
+        scope: "CAROUSEL" or "TERMINAL" (PK)
+        scope_id: Carousel ID (e.g., "C1") or terminal (e.g., "T1") (PK)
+        minute_counts: 1440 ints, number of assignments occupying each minute
+        assignment_count: Number of assignments starting on this day
+        busy_minutes: Minutes with at least one assignment
+        conflict_minutes: Minutes with more than one assignment
+        peak_concurrency: Highest value in minute_counts
+        peak_minute: First minute of the day at which the peak occurs
+        hourly_minutes: 24 ints, busy minutes per hour
+        idle_gap_count: Idle gaps between the first and last busy minute
+        longest_idle_minutes: Length of the longest such gap
+        updated_at: Last aggregate update timestamp
+    """
+    __tablename__ = "daily_usage"
+
+    usage_date = Column(Date, primary_key=True)
+    scope = Column(String(10), primary_key=True)
+    scope_id = Column(String(10), primary_key=True)
+    minute_counts = Column(JSON, nullable=False)
+    assignment_count = Column(Integer, default=0)
+    busy_minutes = Column(Integer, default=0)
+    conflict_minutes = Column(Integer, default=0)
+    peak_concurrency = Column(Integer, default=0)
+    peak_minute = Column(Integer)
+    hourly_minutes = Column(JSON)
+    idle_gap_count = Column(Integer, default=0)
+    longest_idle_minutes = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DailyUsage {self.usage_date} {self.scope}:{self.scope_id}>"
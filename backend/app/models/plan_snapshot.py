@@ -0,0 +1,42 @@
+"""
+Plan Snapshot Model
+Stores periodic full copies of a day's plan for fast history replay
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, Date, DateTime, JSON, Index
+
+from app.database import Base
+
+
+class PlanSnapshot(Base):
+    """
+    Plan snapshot table - A day's assignments as of one event
+
+    The state at any event is the latest snapshot at or before it plus a
+    replay of the events after the snapshot (at most SNAPSHOT_INTERVAL).
+
+    Columns:
+        snapshot_id: Auto-increment primary key
+        plan_date: Day of the plan
+        last_event_id: Last event included in the snapshot (0 = before any event)
+        assignments: List of assignment states
+        stacks: Undo/redo batch IDs as of the snapshot ({"undo": [...], "redo": [...]})
+        created_at: Snapshot creation timestamp
+    """
+    __tablename__ = "plan_snapshots"
+
+    snapshot_id = Column(Integer, primary_key=True, autoincrement=True)
+    plan_date = Column(Date, nullable=False)
+    last_event_id = Column(Integer, nullable=False)
+    assignments = Column(JSON, nullable=False)
+    stacks = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_plan_snapshots_plan_date_last_event_id", "plan_date", "last_event_id"),
+    )
+
+    def __repr__(self):
+        return f"<PlanSnapshot {self.plan_date} @ {self.last_event_id}>"
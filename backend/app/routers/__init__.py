@@ -3,6 +3,6 @@ Routers Package
 Export all API routers
 """
 
-from app.routers import airlines, carousels, flights, assignments
+from app.routers import airlines, carousels, flights, assignments, analytics, scenarios, history
 
-__all__ = ["airlines", "carousels", "flights", "assignments"]
+__all__ = ["airlines", "carousels", "flights", "assignments", "analytics", "scenarios", "history"]
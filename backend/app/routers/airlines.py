@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import Airline
 from app.schemas import AirlineCreate, AirlineResponse
+from app.services import change_service
 
 router = APIRouter()
 
@@ -44,6 +45,7 @@ def create_airline(airline: AirlineCreate, db: Session = Depends(get_db)):
 
     db_airline = Airline(**airline.model_dump())
     db.add(db_airline)
+    change_service.publish(db, "airlines")
     db.commit()
     db.refresh(db_airline)
     return db_airline
@@ -76,6 +78,7 @@ def init_airlines(db: Session = Depends(get_db)):
             db.add(db_airline)
             created.append(db_airline)
 
+    change_service.publish(db, "airlines")
     db.commit()
     for airline in created:
         db.refresh(airline)
@@ -0,0 +1,107 @@
+"""
+Analytics API Router
+Carousel/terminal utilization served from precomputed daily aggregates
+"""
+
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas import (
+    DayUtilizationResponse,
+    RangeUtilizationResponse,
+    UsageSummary,
+)
+from app.services import analytics_service
+from app.services.export import parse_date_range
+
+router = APIRouter()
+
+
+@router.get("/utilization", response_model=DayUtilizationResponse)
+def get_day_utilization(
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Per-carousel and per-terminal utilization for one day.
+    Includes hourly occupancy, peak concurrency per terminal and
+    idle gaps per carousel.
+    """
+    try:
+        usage_date = datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+    carousels = []
+    terminals = []
+    for usage in analytics_service.get_day_usage(db, usage_date):
+        if usage.scope == analytics_service.SCOPE_TERMINAL:
+            terminals.append(usage)
+            continue
+        carousels.append({
+            **UsageSummary.model_validate(usage).model_dump(),
+            "utilization": round(
+                usage.busy_minutes / analytics_service.MINUTES_PER_DAY, 4
+            ),
+            "idle_gaps": [
+                {"start_minute": start, "end_minute": end}
+                for start, end in analytics_service.idle_gaps(usage.minute_counts)
+            ],
+        })
+
+    return {"date": usage_date, "carousels": carousels, "terminals": terminals}
+
+
+@router.get("/utilization/range", response_model=RangeUtilizationResponse)
+def get_range_utilization(
+    date_from: str = Query(..., description="First date (YYYY-MM-DD)"),
+    date_to: str = Query(..., description="Last date, inclusive (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Utilization rolled up over a date range.
+    Served only from stored daily summaries (no assignment scan).
+    """
+    try:
+        start, end = parse_date_range(date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    first_day = start.date()
+    last_day = (end - timedelta(days=1)).date()
+
+    summaries = analytics_service.get_range_usage(db, first_day, last_day)
+    carousels, terminals = analytics_service.rollup(summaries, (end - start).days)
+
+    return {
+        "date_from": first_day,
+        "date_to": last_day,
+        "carousels": carousels,
+        "terminals": terminals,
+        "terminal_days": [
+            usage for usage in summaries
+            if usage.scope == analytics_service.SCOPE_TERMINAL
+        ],
+    }
+
+
+@router.post("/rebuild")
+def rebuild_utilization(
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute a day's aggregates from the assignments table.
+    Repairs drift (existing days are backfilled by the migration).
+    """
+    try:
+        usage_date = datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+    count = analytics_service.rebuild_day(db, usage_date)
+    db.commit()
+    return {"date": usage_date, "assignments": count}
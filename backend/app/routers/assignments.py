@@ -5,8 +5,12 @@ CRUD operations for carousel assignment management
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.database import get_db
 from app.models import Assignment, Flight, Carousel
@@ -16,20 +20,71 @@ from app.schemas import (
     AssignmentResponse,
     AssignmentWithDetailsResponse,
 )
+from app.services import (
+    analytics_service,
+    constraint_service,
+    day_cache,
+    history_service,
+)
+from app.services.export import (
+    assignments_statement,
+    export_response,
+    parse_date_range,
+)
+from app.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    paginate,
+    parse_fields,
+    project,
+    split_page,
+)
 
 router = APIRouter()
 
+_day_adapter = TypeAdapter(list[AssignmentWithDetailsResponse])
+
 
 @router.get("/", response_model=list[AssignmentWithDetailsResponse])
 def get_assignments(
+    response: Response,
     date: str | None = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: str | None = Query(None, description="X-Next-Cursor value of the previous page"),
+    fields: str | None = Query(None, description="Comma separated fields to return"),
+    accept_encoding: str | None = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Get all assignments.
+    Get all assignments, ordered by (start_time, assignment_id).
     Optionally filter by date (YYYY-MM-DD).
+
+    Pagination:
+        - Without a date filter, at most DEFAULT_PAGE_SIZE assignments are returned
+        - If more rows exist, the X-Next-Cursor header holds the cursor
+          for the next page (pass it back as ?cursor=)
+
+    Full-day loads (?date= only) are served from a per-process day
+    snapshot, serialized once and kept gzip/brotli-compressed for clients
+    that accept it (concurrent misses share one query and encode).
+
+    Projection:
+        - ?fields=assignment_id,carousel_id,start_time,end_time skips the
+          nested flight/carousel objects (they are not even loaded)
     """
+    if limit is None and not date:
+        limit = DEFAULT_PAGE_SIZE
+
+    try:
+        selected = parse_fields(fields, AssignmentWithDetailsResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     query = db.query(Assignment)
+    if selected is None or "flight" in selected:
+        query = query.options(selectinload(Assignment.flight))
+    if selected is None or "carousel" in selected:
+        query = query.options(selectinload(Assignment.carousel))
 
     if date:
         try:
@@ -41,24 +96,98 @@ def get_assignments(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    assignments = query.all()
+    try:
+        query = paginate(
+            query, Assignment.start_time, Assignment.assignment_id, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if date and limit is None and cursor is None and selected is None:
+        # Shift-start herd and repeated loads: served from the day snapshot
+        snapshot = day_cache.get(
+            "assignments",
+            filter_date,
+            lambda: _day_adapter.dump_json(
+                _day_adapter.validate_python(query.all(), from_attributes=True)
+            ),
+        )
+        return snapshot.response(accept_encoding)
+
+    assignments, next_cursor = split_page(
+        query.all(), limit, "start_time", "assignment_id"
+    )
+
+    if selected is not None:
+        projected = JSONResponse(
+            project(assignments, selected, AssignmentWithDetailsResponse)
+        )
+        if next_cursor:
+            projected.headers["X-Next-Cursor"] = next_cursor
+        return projected
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return assignments
 
 
+@router.get("/export")
+def export_assignments(
+    date_from: str = Query(..., description="First date (YYYY-MM-DD)"),
+    date_to: str = Query(..., description="Last date, inclusive (YYYY-MM-DD)"),
+    export_format: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"
+    ),
+    accept_encoding: str | None = Header(None),
+):
+    """
+    Stream assignments for a date range as NDJSON or CSV.
+    Rows are read through a server-side cursor, so memory use does not
+    grow with the range. Gzip is used when the client accepts it.
+    Each row carries the flight's airline and flight_number for reporting.
+    """
+    try:
+        start, end = parse_date_range(date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return export_response(
+        assignments_statement(start, end),
+        export_format,
+        f"assignments_{date_from}_{date_to}",
+        accept_encoding,
+    )
+
+
 @router.get("/{assignment_id}", response_model=AssignmentWithDetailsResponse)
-def get_assignment(assignment_id: int, db: Session = Depends(get_db)):
-    """Get a specific assignment by ID."""
+def get_assignment(
+    assignment_id: int,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """
+    Get a specific assignment by ID.
+    The ETag header holds the version to send back as If-Match.
+    """
     assignment = db.query(Assignment).filter(
         Assignment.assignment_id == assignment_id
     ).first()
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
+    response.headers["ETag"] = f'"{assignment.version}"'
     return assignment
 
 
 @router.post("/", response_model=AssignmentResponse, status_code=201)
-def create_assignment(assignment: AssignmentCreate, db: Session = Depends(get_db)):
-    """Create a new assignment."""
+def create_assignment(
+    assignment: AssignmentCreate,
+    x_batch_id: str | None = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Create a new assignment.
+    Send the same X-Batch-Id with several writes to undo them as one step.
+    """
     # Check if flight exists
     flight = db.query(Flight).filter(Flight.flight_id == assignment.flight_id).first()
     if not flight:
@@ -75,56 +204,232 @@ def create_assignment(assignment: AssignmentCreate, db: Session = Depends(get_db
     if not carousel.is_active:
         raise HTTPException(status_code=400, detail="Carousel is not active")
 
+    # Check carousel constraints (terminal, wide-body, capacity, maintenance)
+    violations = constraint_service.check_assignment(
+        db, flight, carousel, assignment.start_time, assignment.end_time
+    )
+    if violations:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Constraint violated: {', '.join(violations)}"
+        )
+
     db_assignment = Assignment(**assignment.model_dump())
     db.add(db_assignment)
+    analytics_service.record_assignment(db, db_assignment)
+    db.flush()
+    history_service.record(
+        db,
+        x_batch_id or history_service.new_batch_id(),
+        history_service.batch_kind_for(db_assignment.assignment_type),
+        None,
+        history_service.to_state(db_assignment),
+    )
     db.commit()
     db.refresh(db_assignment)
     return db_assignment
 
 
+def _parse_if_match(if_match: str | None) -> int | None:
+    """
+    Parse an If-Match header holding an assignment version ('"3"' or 'W/"3"').
+    '*' or no header means no version check.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be an assignment version")
+
+
+def _version_conflict(db: Session, assignment_id: int) -> HTTPException:
+    """404 if the assignment is gone, else 409 carrying its current state."""
+    current = db.query(Assignment).filter(
+        Assignment.assignment_id == assignment_id
+    ).populate_existing().first()
+    if not current:
+        return HTTPException(status_code=404, detail="Assignment not found")
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": "Assignment was modified by another user",
+            "current": jsonable_encoder(AssignmentResponse.model_validate(current)),
+        },
+        headers={"ETag": f'"{current.version}"'},
+    )
+
+
 @router.put("/{assignment_id}", response_model=AssignmentResponse)
 def update_assignment(
     assignment_id: int,
     assignment: AssignmentUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
+    x_batch_id: str | None = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Update an assignment (for manual adjustments)."""
-    db_assignment = db.query(Assignment).filter(
-        Assignment.assignment_id == assignment_id
-    ).first()
-    if not db_assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
+    """
+    Update an assignment (for manual adjustments).
+
+    Optimistic concurrency:
+        - Send the version from GET (ETag) as If-Match or as "version" in the body
+        - If someone else changed the assignment first, 409 is returned with
+          the current state instead of overwriting their change
+        - Without a version the last write wins (never 409)
 
+    Edits that do not move the bar are a single UPDATE ... RETURNING on
+    PostgreSQL, which also returns the previous values for the history log.
+    Moves read the row first to validate the new placement.
+
+    The change is logged for undo/redo (see X-Batch-Id on POST).
+    """
     # Only update fields that were provided
     update_data = assignment.model_dump(exclude_unset=True)
+    expected = update_data.pop("version", None)
+    if if_match is not None:
+        expected = _parse_if_match(if_match)
 
-    # If carousel is being changed, verify it exists and is active
-    if "carousel_id" in update_data:
-        carousel = db.query(Carousel).filter(
-            Carousel.carousel_id == update_data["carousel_id"]
-        ).first()
-        if not carousel:
-            raise HTTPException(status_code=400, detail="Carousel not found")
-        if not carousel.is_active:
-            raise HTTPException(status_code=400, detail="Carousel is not active")
+    statement = (
+        update(Assignment)
+        .where(Assignment.assignment_id == assignment_id)
+        .values(**update_data, version=Assignment.version + 1)
+        .returning(*Assignment.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+    if expected is not None:
+        statement = statement.where(Assignment.version == expected)
 
-    for field, value in update_data.items():
-        setattr(db_assignment, field, value)
+    moved = bool(update_data.keys() & {"carousel_id", "start_time", "end_time"})
+    current = None
+    if moved or db.get_bind().dialect.name != "postgresql":
+        # With a client version the UPDATE is guarded by it, so a change
+        # between this read and the write still ends in 409. Without one,
+        # the row is locked until commit instead.
+        query = db.query(Assignment).filter(Assignment.assignment_id == assignment_id)
+        if moved:
+            query = query.options(
+                joinedload(Assignment.flight, innerjoin=True),
+                joinedload(Assignment.carousel, innerjoin=True),
+            )
+        if expected is None:
+            query = query.with_for_update(of=Assignment)
+            if db.get_bind().dialect.name == "sqlite":
+                # FOR UPDATE is ignored there: a no-op write takes the
+                # database write lock until commit instead
+                db.execute(
+                    update(Assignment)
+                    .where(Assignment.assignment_id == assignment_id)
+                    .values(version=Assignment.version)
+                    .execution_options(synchronize_session=False)
+                )
+        current = query.first()
+        if not current:
+            raise HTTPException(status_code=404, detail="Assignment not found")
+        if expected is not None and current.version != expected:
+            raise _version_conflict(db, assignment_id)
+    else:
+        # Previous values from a locked sub-select of the same statement
+        # (plain RETURNING only has the new ones)
+        old = (
+            select(Assignment.__table__)
+            .where(Assignment.assignment_id == assignment_id)
+            .with_for_update()
+            .subquery("old")
+        )
+        statement = statement.where(
+            Assignment.assignment_id == old.c.assignment_id
+        ).returning(*(
+            old.c[name].label(f"before_{name}") for name in history_service.STATE_FIELDS
+        ))
+
+    if moved:
+        # If carousel is being changed, verify it exists and is active
+        carousel = current.carousel
+        if "carousel_id" in update_data:
+            carousel = db.query(Carousel).filter(
+                Carousel.carousel_id == update_data["carousel_id"]
+            ).first()
+            if not carousel:
+                raise HTTPException(status_code=400, detail="Carousel not found")
+            if not carousel.is_active:
+                raise HTTPException(status_code=400, detail="Carousel is not active")
+
+        # Check carousel constraints for the new placement
+        violations = constraint_service.check_assignment(
+            db,
+            current.flight,
+            carousel,
+            update_data.get("start_time", current.start_time),
+            update_data.get("end_time", current.end_time),
+        )
+        if violations:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Constraint violated: {', '.join(violations)}"
+            )
 
+    before = history_service.to_state(current) if current is not None else None
+    updated = db.execute(statement).first()
+    if updated is None:
+        db.rollback()
+        raise _version_conflict(db, assignment_id)
+    if before is None:
+        before = history_service.to_state(updated, prefix="before_")
+
+    if moved:
+        analytics_service.lock_usage(
+            db, [analytics_service.placement(current), analytics_service.placement(updated)]
+        )
+        analytics_service.record_assignment(db, current, -1)
+        analytics_service.record_assignment(db, updated)
+
+    history_service.record(
+        db,
+        x_batch_id or history_service.new_batch_id(),
+        history_service.batch_kind_for(updated.assignment_type),
+        before,
+        history_service.to_state(updated),
+    )
     db.commit()
-    db.refresh(db_assignment)
-    return db_assignment
+    response.headers["ETag"] = f'"{updated.version}"'
+    return updated
 
 
 @router.delete("/{assignment_id}", status_code=204)
-def delete_assignment(assignment_id: int, db: Session = Depends(get_db)):
-    """Delete an assignment."""
-    assignment = db.query(Assignment).filter(
-        Assignment.assignment_id == assignment_id
-    ).first()
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
+def delete_assignment(
+    assignment_id: int,
+    if_match: str | None = Header(None),
+    x_batch_id: str | None = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Delete an assignment.
+    With If-Match, fails with 409 (and the current state) if the
+    assignment changed since that version was read.
+    """
+    statement = (
+        delete(Assignment)
+        .where(Assignment.assignment_id == assignment_id)
+        .returning(*Assignment.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+    expected = _parse_if_match(if_match)
+    if expected is not None:
+        statement = statement.where(Assignment.version == expected)
+
+    deleted = db.execute(statement).first()
+    if deleted is None:
+        db.rollback()
+        raise _version_conflict(db, assignment_id)
 
-    db.delete(assignment)
+    analytics_service.record_assignment(db, deleted, -1)
+    history_service.record(
+        db,
+        x_batch_id or history_service.new_batch_id(),
+        history_service.batch_kind_for(deleted.assignment_type),
+        history_service.to_state(deleted),
+        None,
+    )
     db.commit()
     return None
@@ -3,12 +3,21 @@ Carousels API Router
 CRUD operations for carousel management
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models import Carousel
-from app.schemas import CarouselCreate, CarouselUpdate, CarouselResponse
+from app.models import Carousel, CarouselMaintenance, Flight
+from app.schemas import (
+    CarouselCreate,
+    CarouselUpdate,
+    CarouselResponse,
+    MaintenanceCreate,
+    MaintenanceResponse,
+)
+from app.services import change_service, constraint_service
 
 router = APIRouter()
 
@@ -20,6 +29,25 @@ def get_carousels(db: Session = Depends(get_db)):
     return carousels
 
 
+@router.get("/feasible", response_model=list[str])
+def get_feasible_carousels(
+    flight_id: str = Query(..., description="Flight to place"),
+    start_time: datetime = Query(..., description="Occupation start time"),
+    end_time: datetime = Query(..., description="Occupation end time"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get carousel IDs the flight may use in the given time range.
+    Answered from the day's compiled constraint bitmasks
+    (used for drop feedback and auto-assignment candidates).
+    """
+    flight = db.query(Flight).filter(Flight.flight_id == flight_id).first()
+    if not flight:
+        raise HTTPException(status_code=404, detail="Flight not found")
+
+    return constraint_service.feasible_carousels(db, flight, start_time, end_time)
+
+
 @router.get("/{carousel_id}", response_model=CarouselResponse)
 def get_carousel(carousel_id: str, db: Session = Depends(get_db)):
     """Get a specific carousel by ID."""
@@ -40,6 +68,7 @@ def create_carousel(carousel: CarouselCreate, db: Session = Depends(get_db)):
 
     db_carousel = Carousel(**carousel.model_dump())
     db.add(db_carousel)
+    change_service.publish(db, "carousels")
     db.commit()
     db.refresh(db_carousel)
     return db_carousel
@@ -61,6 +90,7 @@ def update_carousel(
     for field, value in update_data.items():
         setattr(db_carousel, field, value)
 
+    change_service.publish(db, "carousels")
     db.commit()
     db.refresh(db_carousel)
     return db_carousel
@@ -88,8 +118,68 @@ def init_carousels(db: Session = Depends(get_db)):
             db.add(db_carousel)
             created.append(db_carousel)
 
+    change_service.publish(db, "carousels")
     db.commit()
     for carousel in created:
         db.refresh(carousel)
 
     return created
+
+
+@router.get("/{carousel_id}/maintenance", response_model=list[MaintenanceResponse])
+def get_maintenance_windows(carousel_id: str, db: Session = Depends(get_db)):
+    """Get maintenance windows of a carousel."""
+    return db.query(CarouselMaintenance).filter(
+        CarouselMaintenance.carousel_id == carousel_id
+    ).order_by(CarouselMaintenance.start_time).all()
+
+
+@router.post(
+    "/{carousel_id}/maintenance",
+    response_model=MaintenanceResponse,
+    status_code=201,
+)
+def create_maintenance_window(
+    carousel_id: str,
+    maintenance: MaintenanceCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Add a maintenance window.
+    The carousel cannot be assigned during [start_time, end_time).
+    """
+    carousel = db.query(Carousel).filter(Carousel.carousel_id == carousel_id).first()
+    if not carousel:
+        raise HTTPException(status_code=404, detail="Carousel not found")
+    if maintenance.end_time <= maintenance.start_time:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+
+    db_maintenance = CarouselMaintenance(
+        carousel_id=carousel_id,
+        **maintenance.model_dump()
+    )
+    db.add(db_maintenance)
+    change_service.publish(db, "maintenance")
+    db.commit()
+    db.refresh(db_maintenance)
+    return db_maintenance
+
+
+@router.delete("/{carousel_id}/maintenance/{maintenance_id}", status_code=204)
+def delete_maintenance_window(
+    carousel_id: str,
+    maintenance_id: int,
+    db: Session = Depends(get_db)
+):
+    """Delete a maintenance window."""
+    maintenance = db.query(CarouselMaintenance).filter(
+        CarouselMaintenance.maintenance_id == maintenance_id,
+        CarouselMaintenance.carousel_id == carousel_id
+    ).first()
+    if not maintenance:
+        raise HTTPException(status_code=404, detail="Maintenance window not found")
+
+    db.delete(maintenance)
+    change_service.publish(db, "maintenance")
+    db.commit()
+    return None
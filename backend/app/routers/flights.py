@@ -5,26 +5,72 @@ CRUD operations for flight management
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, selectinload
 
 from app.database import get_db
 from app.models import Flight, Airline
 from app.schemas import FlightCreate, FlightResponse, FlightWithAirlineResponse
+from app.services import change_service, day_cache
+from app.services.export import (
+    export_response,
+    flights_statement,
+    parse_date_range,
+)
+from app.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    paginate,
+    parse_fields,
+    project,
+    split_page,
+)
 
 router = APIRouter()
 
+_day_adapter = TypeAdapter(list[FlightWithAirlineResponse])
+
 
 @router.get("/", response_model=list[FlightWithAirlineResponse])
 def get_flights(
+    response: Response,
     date: str | None = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: str | None = Query(None, description="X-Next-Cursor value of the previous page"),
+    fields: str | None = Query(None, description="Comma separated fields to return"),
+    accept_encoding: str | None = Header(None),
     db: Session = Depends(get_db)
 ):
     """
-    Get all flights.
+    Get all flights, ordered by (scheduled_time, flight_id).
     Optionally filter by date (YYYY-MM-DD).
+
+    Pagination:
+        - Without a date filter, at most DEFAULT_PAGE_SIZE flights are returned
+        - If more rows exist, the X-Next-Cursor header holds the cursor
+          for the next page (pass it back as ?cursor=)
+
+    Full-day loads (?date= only) are served from a per-process day
+    snapshot, serialized once and kept gzip/brotli-compressed for clients
+    that accept it (concurrent misses share one query and encode).
+
+    Projection:
+        - ?fields=flight_id,scheduled_time returns only those fields
+        - airline_info is only loaded when it is requested
     """
+    if limit is None and not date:
+        limit = DEFAULT_PAGE_SIZE
+
+    try:
+        selected = parse_fields(fields, FlightWithAirlineResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     query = db.query(Flight)
+    if selected is None or "airline_info" in selected:
+        query = query.options(selectinload(Flight.airline_info))
 
     if date:
         # Parse date and filter by scheduled_time
@@ -37,10 +83,62 @@ def get_flights(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    flights = query.all()
+    try:
+        query = paginate(query, Flight.scheduled_time, Flight.flight_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if date and limit is None and cursor is None and selected is None:
+        # Shift-start herd and repeated loads: served from the day snapshot
+        snapshot = day_cache.get(
+            "flights",
+            filter_date,
+            lambda: _day_adapter.dump_json(
+                _day_adapter.validate_python(query.all(), from_attributes=True)
+            ),
+        )
+        return snapshot.response(accept_encoding)
+
+    flights, next_cursor = split_page(query.all(), limit, "scheduled_time", "flight_id")
+
+    if selected is not None:
+        projected = JSONResponse(project(flights, selected, FlightWithAirlineResponse))
+        if next_cursor:
+            projected.headers["X-Next-Cursor"] = next_cursor
+        return projected
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return flights
 
 
+@router.get("/export")
+def export_flights(
+    date_from: str = Query(..., description="First date (YYYY-MM-DD)"),
+    date_to: str = Query(..., description="Last date, inclusive (YYYY-MM-DD)"),
+    export_format: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"
+    ),
+    accept_encoding: str | None = Header(None),
+):
+    """
+    Stream flights for a date range as NDJSON or CSV.
+    Rows are read through a server-side cursor, so memory use does not
+    grow with the range. Gzip is used when the client accepts it.
+    """
+    try:
+        start, end = parse_date_range(date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return export_response(
+        flights_statement(start, end),
+        export_format,
+        f"flights_{date_from}_{date_to}",
+        accept_encoding,
+    )
+
+
 @router.get("/{flight_id}", response_model=FlightWithAirlineResponse)
 def get_flight(flight_id: str, db: Session = Depends(get_db)):
     """Get a specific flight by ID."""
@@ -65,6 +163,7 @@ def create_flight(flight: FlightCreate, db: Session = Depends(get_db)):
 
     db_flight = Flight(**flight.model_dump())
     db.add(db_flight)
+    change_service.publish(db, "flights", db_flight.scheduled_time.date())
     db.commit()
     db.refresh(db_flight)
     return db_flight
@@ -86,6 +185,8 @@ def upload_flights(flights: list[FlightCreate], db: Session = Depends(get_db)):
             db.add(db_flight)
             created.append(db_flight)
 
+    for day in {flight.scheduled_time.date() for flight in created}:
+        change_service.publish(db, "flights", day)
     db.commit()
     for flight in created:
         db.refresh(flight)
@@ -101,5 +202,6 @@ def delete_flight(flight_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Flight not found")
 
     db.delete(flight)
+    change_service.publish(db, "flights", flight.scheduled_time.date())
     db.commit()
     return None
@@ -0,0 +1,128 @@
+"""
+History API Router
+Assignment audit log, undo/redo and point-in-time restore per day
+"""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas import (
+    AssignmentEventResponse,
+    PlanStateResponse,
+    HistoryActionResponse,
+)
+from app.services import history_service
+from app.services.history_service import HistoryConflictError
+
+router = APIRouter()
+
+
+def _parse_date(date: str):
+    try:
+        return datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+
+def _parse_at(at: str) -> datetime:
+    """ISO 8601 time as naive UTC (times with an offset are converted)."""
+    try:
+        return history_service.as_utc(datetime.fromisoformat(at))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid time format. Use YYYY-MM-DDTHH:MM:SS (UTC) or add an offset"
+        )
+
+
+@router.get("/events", response_model=list[AssignmentEventResponse])
+def get_events(
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    limit: int = Query(200, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Audit log of a day, newest first."""
+    return history_service.get_events(db, _parse_date(date), limit)
+
+
+@router.get("/state", response_model=PlanStateResponse)
+def get_state(
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    at: str | None = Query(None, description="Point in time (UTC, ISO 8601)"),
+    db: Session = Depends(get_db)
+):
+    """A day's plan rebuilt from snapshots + events (latest if `at` is omitted)."""
+    plan_date = _parse_date(date)
+    if at is None:
+        state = history_service.state_at(db, plan_date)
+        at_time = None
+    else:
+        at_time = _parse_at(at)
+        state = history_service.state_as_of(db, plan_date, at_time)
+    return {
+        "date": plan_date,
+        "at": at_time,
+        "assignments": sorted(state.values(), key=lambda item: item["start_time"]),
+    }
+
+
+def _revert(action, plan_date, db: Session) -> dict:
+    try:
+        reverted, batch_id, changed = action(db, plan_date)
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except HistoryConflictError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "date": plan_date,
+        "batch_id": batch_id,
+        "reverted_batch_id": reverted,
+        "changed": changed,
+    }
+
+
+@router.post("/undo", response_model=HistoryActionResponse)
+def undo(
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Undo the latest action of a day (manual edit, AI run, promoted scenario...).
+    Fails with 409 if the affected assignments were changed since.
+    """
+    return _revert(history_service.undo, _parse_date(date), db)
+
+
+@router.post("/redo", response_model=HistoryActionResponse)
+def redo(
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """Redo the latest undone action of a day."""
+    return _revert(history_service.redo, _parse_date(date), db)
+
+
+@router.post("/restore", response_model=HistoryActionResponse)
+def restore(
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    at: str = Query(..., description="Point in time (UTC, ISO 8601)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Restore a day's plan as it was at a point in time.
+    Logged as one RESTORE action, so it can be undone.
+    """
+    plan_date = _parse_date(date)
+    try:
+        batch_id, changed = history_service.restore(db, plan_date, _parse_at(at))
+        db.commit()
+    except HistoryConflictError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"date": plan_date, "batch_id": batch_id, "changed": changed}
@@ -0,0 +1,163 @@
+"""
+Scenarios API Router
+In-memory what-if scenarios over a day's plan (no live data is touched
+until a scenario is promoted)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas import (
+    ScenarioCreate,
+    ScenarioMove,
+    ScenarioClosure,
+    ScenarioTerminalOverride,
+    PlanAssignmentResponse,
+    ScenarioResponse,
+    ScenarioPlanResponse,
+    SolveResponse,
+    ScenarioDiffResponse,
+)
+from app.services import scenario_service
+
+router = APIRouter()
+
+
+def _get_or_404(scenario_id: str) -> scenario_service.Scenario:
+    try:
+        return scenario_service.get_scenario(scenario_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+
+
+def _summary(scenario: scenario_service.Scenario) -> dict:
+    return {
+        "scenario_id": scenario.scenario_id,
+        "name": scenario.name,
+        "date": scenario.base.day,
+        "changes": len(scenario.overlay),
+        "closures": [
+            {"carousel_id": carousel_id, "start_time": start, "end_time": end}
+            for carousel_id, start, end in scenario.closures
+        ],
+        "terminal_overrides": scenario.terminal_overrides,
+        "created_at": scenario.created_at,
+        "last_access": scenario.last_access,
+    }
+
+
+@router.get("/", response_model=list[ScenarioResponse])
+def get_scenarios():
+    """Get all live scenarios."""
+    return [_summary(scenario) for scenario in scenario_service.list_scenarios()]
+
+
+@router.post("/", response_model=ScenarioResponse, status_code=201)
+def create_scenario(scenario: ScenarioCreate, db: Session = Depends(get_db)):
+    """
+    Fork a day's plan into a new scenario.
+    Cheap: the day's snapshot is shared, only edits are stored per scenario.
+    """
+    try:
+        created = scenario_service.fork(
+            db, scenario.date, scenario.name, scenario.from_scenario
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="from_scenario not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _summary(created)
+
+
+@router.get("/{scenario_id}", response_model=ScenarioPlanResponse)
+def get_scenario(scenario_id: str):
+    """Get a scenario with its full plan."""
+    scenario = _get_or_404(scenario_id)
+    return {**_summary(scenario), "assignments": scenario.plan()}
+
+
+@router.delete("/{scenario_id}", status_code=204)
+def delete_scenario(scenario_id: str):
+    """Discard a scenario."""
+    _get_or_404(scenario_id)
+    scenario_service.discard(scenario_id)
+    return None
+
+
+@router.post("/{scenario_id}/move", response_model=PlanAssignmentResponse)
+def move_assignment(
+    scenario_id: str,
+    move: ScenarioMove,
+    db: Session = Depends(get_db)
+):
+    """Move an assignment to another carousel and/or time inside the scenario."""
+    scenario = _get_or_404(scenario_id)
+    try:
+        return scenario_service.move(
+            db, scenario, move.assignment_id,
+            move.carousel_id, move.start_time, move.end_time
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Assignment not found in scenario")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{scenario_id}/close-carousel", response_model=SolveResponse)
+def close_carousel(
+    scenario_id: str,
+    closure: ScenarioClosure,
+    db: Session = Depends(get_db)
+):
+    """Close a carousel from a given time (e.g., "close C7 from 14:00")."""
+    scenario = _get_or_404(scenario_id)
+    if closure.carousel_id not in scenario.base.terminals:
+        raise HTTPException(status_code=400, detail="Carousel not found")
+    return scenario_service.close_carousel(
+        db, scenario, closure.carousel_id,
+        closure.start_time, closure.end_time, closure.reassign
+    )
+
+
+@router.post("/{scenario_id}/airline-terminal", response_model=SolveResponse)
+def set_airline_terminal(
+    scenario_id: str,
+    override: ScenarioTerminalOverride,
+    db: Session = Depends(get_db)
+):
+    """Move all flights of an airline to a terminal (e.g., "all KE to T1")."""
+    scenario = _get_or_404(scenario_id)
+    if override.terminal not in set(scenario.base.terminals.values()):
+        raise HTTPException(status_code=400, detail="Terminal not found")
+    return scenario_service.set_airline_terminal(
+        db, scenario, override.airline, override.terminal, override.reassign
+    )
+
+
+@router.post("/{scenario_id}/solve", response_model=SolveResponse)
+def solve_scenario(scenario_id: str, db: Session = Depends(get_db)):
+    """Run the solver on all conflicting or disallowed assignments."""
+    scenario = _get_or_404(scenario_id)
+    return scenario_service.solve(db, scenario)
+
+
+@router.get("/{scenario_id}/diff", response_model=ScenarioDiffResponse)
+def get_scenario_diff(scenario_id: str):
+    """Compare the scenario with the live plan: changes, conflicts, utilization."""
+    scenario = _get_or_404(scenario_id)
+    return scenario_service.diff(scenario)
+
+
+@router.post("/{scenario_id}/promote")
+def promote_scenario(scenario_id: str, db: Session = Depends(get_db)):
+    """
+    Apply the scenario to the live plan in one transaction.
+    Fails with 409 if any changed assignment was edited since the fork.
+    """
+    scenario = _get_or_404(scenario_id)
+    try:
+        updated = scenario_service.promote(db, scenario)
+    except scenario_service.StaleScenarioError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"scenario_id": scenario_id, "updated": updated}
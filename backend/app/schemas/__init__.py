@@ -9,6 +9,8 @@ from app.schemas.carousel import (
     CarouselCreate,
     CarouselUpdate,
     CarouselResponse,
+    MaintenanceCreate,
+    MaintenanceResponse,
 )
 from app.schemas.flight import (
     FlightBase,
@@ -23,6 +25,35 @@ from app.schemas.assignment import (
     AssignmentResponse,
     AssignmentWithDetailsResponse,
 )
+from app.schemas.analytics import (
+    IdleGap,
+    UsageSummary,
+    CarouselDayUtilization,
+    DayUtilizationResponse,
+    CarouselRangeUtilization,
+    TerminalRangeUtilization,
+    RangeUtilizationResponse,
+)
+from app.schemas.scenario import (
+    ScenarioCreate,
+    ScenarioMove,
+    ScenarioClosure,
+    ScenarioTerminalOverride,
+    PlanAssignmentResponse,
+    ScenarioResponse,
+    ScenarioPlanResponse,
+    SolveResponse,
+    ScenarioChange,
+    ScenarioConflict,
+    CarouselUtilizationDiff,
+    ScenarioDiffResponse,
+)
+from app.schemas.history import (
+    AssignmentState,
+    AssignmentEventResponse,
+    PlanStateResponse,
+    HistoryActionResponse,
+)
 
 __all__ = [
     # Airline
@@ -34,6 +65,8 @@ __all__ = [
     "CarouselCreate",
     "CarouselUpdate",
     "CarouselResponse",
+    "MaintenanceCreate",
+    "MaintenanceResponse",
     # Flight
     "FlightBase",
     "FlightCreate",
@@ -45,4 +78,30 @@ __all__ = [
     "AssignmentUpdate",
     "AssignmentResponse",
     "AssignmentWithDetailsResponse",
+    # Analytics
+    "IdleGap",
+    "UsageSummary",
+    "CarouselDayUtilization",
+    "DayUtilizationResponse",
+    "CarouselRangeUtilization",
+    "TerminalRangeUtilization",
+    "RangeUtilizationResponse",
+    # Scenario
+    "ScenarioCreate",
+    "ScenarioMove",
+    "ScenarioClosure",
+    "ScenarioTerminalOverride",
+    "PlanAssignmentResponse",
+    "ScenarioResponse",
+    "ScenarioPlanResponse",
+    "SolveResponse",
+    "ScenarioChange",
+    "ScenarioConflict",
+    "CarouselUtilizationDiff",
+    "ScenarioDiffResponse",
+    # History
+    "AssignmentState",
+    "AssignmentEventResponse",
+    "PlanStateResponse",
+    "HistoryActionResponse",
 ]
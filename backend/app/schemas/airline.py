@@ -11,6 +11,7 @@ class AirlineBase(BaseModel):
     airline_code: str = Field(..., max_length=10, examples=["KE"])
     airline_name: str = Field(..., max_length=100, examples=["Korean Air"])
     color_code: str = Field(default="#808080", max_length=7, examples=["#0F4C81"])
+    terminal: str | None = Field(default=None, max_length=10, examples=["T1"])
 
 
 class AirlineCreate(AirlineBase):
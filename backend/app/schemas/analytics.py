@@ -0,0 +1,73 @@
+"""
+Analytics Schemas
+Pydantic models for utilization analytics responses
+"""
+
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class IdleGap(BaseModel):
+    """Idle period on a carousel (minutes from midnight, end exclusive)"""
+    start_minute: int = Field(..., examples=[540])
+    end_minute: int = Field(..., examples=[585])
+
+
+class UsageSummary(BaseModel):
+    """Stored daily summary of one carousel or terminal"""
+    usage_date: date
+    scope: str = Field(..., examples=["CAROUSEL"])
+    scope_id: str = Field(..., examples=["C1"])
+    assignment_count: int
+    busy_minutes: int
+    conflict_minutes: int
+    peak_concurrency: int
+    peak_minute: int | None = None
+    hourly_minutes: list[int] | None = None
+    idle_gap_count: int
+    longest_idle_minutes: int
+
+    model_config = {"from_attributes": True}
+
+
+class CarouselDayUtilization(UsageSummary):
+    """Carousel usage for one day, with utilization rate and idle gaps"""
+    utilization: float = Field(..., examples=[0.42])
+    idle_gaps: list[IdleGap] = []
+
+
+class DayUtilizationResponse(BaseModel):
+    """Utilization analytics for a single day"""
+    date: date
+    carousels: list[CarouselDayUtilization]
+    terminals: list[UsageSummary]
+
+
+class CarouselRangeUtilization(BaseModel):
+    """Carousel usage rolled up over a date range"""
+    carousel_id: str
+    active_days: int
+    assignment_count: int
+    busy_minutes: int
+    conflict_minutes: int
+    utilization: float
+    longest_idle_minutes: int
+
+
+class TerminalRangeUtilization(BaseModel):
+    """Terminal usage rolled up over a date range"""
+    terminal: str
+    active_days: int
+    assignment_count: int
+    peak_concurrency: int
+    peak_date: date | None = None
+
+
+class RangeUtilizationResponse(BaseModel):
+    """Utilization analytics rolled up from stored daily summaries"""
+    date_from: date
+    date_to: date
+    carousels: list[CarouselRangeUtilization]
+    terminals: list[TerminalRangeUtilization]
+    terminal_days: list[UsageSummary]
@@ -31,11 +31,16 @@ class AssignmentUpdate(BaseModel):
     start_time: datetime | None = None
     end_time: datetime | None = None
     assignment_type: str | None = None
+    version: int | None = Field(
+        default=None,
+        description="Expected current version (alternative to the If-Match header)"
+    )
 
 
 class AssignmentResponse(AssignmentBase):
     """Schema for assignment response"""
     assignment_id: int
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -3,6 +3,8 @@ Carousel Schemas
 Pydantic models for API request/response validation
 """
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -12,6 +14,7 @@ class CarouselBase(BaseModel):
     terminal: str | None = Field(default=None, max_length=10, examples=["T1"])
     capacity: int = Field(default=100, ge=0, examples=[100])
     is_active: bool = Field(default=True)
+    wide_body_only: bool = Field(default=False)
 
 
 class CarouselCreate(CarouselBase):
@@ -24,9 +27,26 @@ class CarouselUpdate(BaseModel):
     terminal: str | None = None
     capacity: int | None = None
     is_active: bool | None = None
+    wide_body_only: bool | None = None
 
 
 class CarouselResponse(CarouselBase):
     """Schema for carousel response"""
 
     model_config = {"from_attributes": True}
+
+
+class MaintenanceCreate(BaseModel):
+    """Schema for creating a carousel maintenance window"""
+    start_time: datetime = Field(..., examples=["2025-12-15T14:00:00"])
+    end_time: datetime = Field(..., examples=["2025-12-15T18:00:00"])
+    reason: str | None = Field(default=None, max_length=100, examples=["Belt repair"])
+
+
+class MaintenanceResponse(MaintenanceCreate):
+    """Schema for maintenance window response"""
+    maintenance_id: int
+    carousel_id: str
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
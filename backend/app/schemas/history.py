@@ -0,0 +1,49 @@
+"""
+History Schemas
+Pydantic models for assignment history (audit log, undo/redo, restore)
+"""
+
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+
+class AssignmentState(BaseModel):
+    """Assignment state stored in an event or snapshot"""
+    assignment_id: int
+    flight_id: str
+    carousel_id: str
+    start_time: datetime
+    end_time: datetime
+    assignment_type: str | None = None
+    version: int
+
+
+class AssignmentEventResponse(BaseModel):
+    """One logged assignment mutation"""
+    event_id: int
+    plan_date: date
+    assignment_id: int
+    event_type: str
+    batch_id: str
+    batch_kind: str
+    before: AssignmentState | None = None
+    after: AssignmentState | None = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class PlanStateResponse(BaseModel):
+    """A day's plan rebuilt from history"""
+    date: date
+    at: datetime | None = None
+    assignments: list[AssignmentState]
+
+
+class HistoryActionResponse(BaseModel):
+    """Result of an undo, redo or restore"""
+    date: date
+    batch_id: str | None = None
+    reverted_batch_id: str | None = None
+    changed: int
@@ -0,0 +1,107 @@
+"""
+Scenario Schemas
+Pydantic models for what-if scenario requests/responses
+"""
+
+from datetime import date, datetime
+
+from pydantic import BaseModel, Field
+
+
+class ScenarioCreate(BaseModel):
+    """Schema for forking a scenario from a day's plan"""
+    date: date
+    name: str | None = Field(default=None, max_length=100, examples=["Close C7 from 14:00"])
+    from_scenario: str | None = Field(default=None, description="Copy edits of this scenario")
+
+
+class ScenarioMove(BaseModel):
+    """Schema for moving an assignment inside a scenario (all fields optional)"""
+    assignment_id: int
+    carousel_id: str | None = None
+    start_time: datetime | None = None
+    end_time: datetime | None = None
+
+
+class ScenarioClosure(BaseModel):
+    """Schema for closing a carousel inside a scenario"""
+    carousel_id: str = Field(..., examples=["C7"])
+    start_time: datetime = Field(..., examples=["2025-12-15T14:00:00"])
+    end_time: datetime | None = Field(default=None, description="Open-ended if omitted")
+    reassign: bool = Field(default=True, description="Re-place displaced flights")
+
+
+class ScenarioTerminalOverride(BaseModel):
+    """Schema for moving an airline to a terminal inside a scenario"""
+    airline: str = Field(..., examples=["KE"])
+    terminal: str = Field(..., examples=["T1"])
+    reassign: bool = Field(default=True, description="Re-place displaced flights")
+
+
+class PlanAssignmentResponse(BaseModel):
+    """Assignment as seen inside a scenario"""
+    assignment_id: int
+    flight_id: str
+    carousel_id: str
+    start_time: datetime
+    end_time: datetime
+    assignment_type: str | None = None
+    version: int
+
+    model_config = {"from_attributes": True}
+
+
+class ScenarioResponse(BaseModel):
+    """Schema for scenario summary response"""
+    scenario_id: str
+    name: str | None = None
+    date: date
+    changes: int
+    closures: list[ScenarioClosure]
+    terminal_overrides: dict[str, str]
+    created_at: datetime
+    last_access: datetime
+
+
+class ScenarioPlanResponse(ScenarioResponse):
+    """Schema for scenario response with the full plan"""
+    assignments: list[PlanAssignmentResponse]
+
+
+class SolveResponse(BaseModel):
+    """Result of a solver run inside a scenario"""
+    moved: list[int]
+    unplaced: list[int]
+
+
+class ScenarioChange(BaseModel):
+    """One assignment changed by a scenario"""
+    assignment_id: int
+    flight_id: str
+    base: PlanAssignmentResponse
+    scenario: PlanAssignmentResponse
+
+
+class ScenarioConflict(BaseModel):
+    """Two assignments overlapping on the same carousel"""
+    assignment_id: int
+    conflicts_with: int
+
+
+class CarouselUtilizationDiff(BaseModel):
+    """Busy minutes of a carousel in base vs scenario"""
+    carousel_id: str
+    base_minutes: int
+    scenario_minutes: int
+
+
+class ScenarioDiffResponse(BaseModel):
+    """Scenario compared to the live plan it was forked from"""
+    scenario_id: str
+    date: date
+    changes: list[ScenarioChange]
+    base_conflicts: int
+    scenario_conflicts: list[ScenarioConflict]
+    utilization: list[CarouselUtilizationDiff]
+    base_balance: float = Field(..., description="Std dev of busy minutes per carousel")
+    scenario_balance: float
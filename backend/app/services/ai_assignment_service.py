@@ -0,0 +1,122 @@
+"""
+AI Assignment Service
+Greedy conflict-avoiding carousel assignment with utilization balancing
+"""
+
+import bisect
+from datetime import datetime
+from typing import Callable, Iterable
+
+from app.services.assignment_service import Interval
+
+
+class Occupancy:
+    """
+    Per-carousel occupied intervals, kept sorted by start time.
+
+    Alongside each interval the running maximum end time of the intervals
+    up to it is kept, so a free-slot check is one bisect (O(log n)) even
+    when the fixed intervals overlap each other (conflicts in the plan).
+    """
+
+    def __init__(self, assignments: Iterable[Interval] = ()):
+        self.starts: dict[str, list[datetime]] = {}
+        self.intervals: dict[str, list[tuple[datetime, datetime]]] = {}
+        self.max_ends: dict[str, list[datetime]] = {}
+        self.busy_seconds: dict[str, float] = {}
+        for assignment in assignments:
+            self.add(assignment.carousel_id, assignment.start_time, assignment.end_time)
+
+    def _update_max_ends(self, carousel_id: str, index: int) -> None:
+        """Recompute the running maximum end from index on."""
+        intervals = self.intervals[carousel_id]
+        max_ends = self.max_ends[carousel_id]
+        del max_ends[index:]
+        latest = max_ends[-1] if max_ends else None
+        for _, end in intervals[index:]:
+            latest = end if latest is None or end > latest else latest
+            max_ends.append(latest)
+
+    def add(self, carousel_id: str, start: datetime, end: datetime) -> None:
+        """Mark [start, end) as occupied on a carousel."""
+        starts = self.starts.setdefault(carousel_id, [])
+        index = bisect.bisect_right(starts, start)
+        starts.insert(index, start)
+        self.intervals.setdefault(carousel_id, []).insert(index, (start, end))
+        self.max_ends.setdefault(carousel_id, [])
+        self._update_max_ends(carousel_id, index)
+        self.busy_seconds[carousel_id] = (
+            self.busy_seconds.get(carousel_id, 0) + (end - start).total_seconds()
+        )
+
+    def remove(self, carousel_id: str, start: datetime, end: datetime) -> None:
+        """Remove a previously added interval."""
+        intervals = self.intervals.get(carousel_id, [])
+        index = intervals.index((start, end))
+        del intervals[index]
+        del self.starts[carousel_id][index]
+        self._update_max_ends(carousel_id, index)
+        self.busy_seconds[carousel_id] -= (end - start).total_seconds()
+
+    def is_free(self, carousel_id: str, start: datetime, end: datetime) -> bool:
+        """Whether [start, end) does not overlap any interval on the carousel."""
+        starts = self.starts.get(carousel_id)
+        if not starts:
+            return True
+        # Only intervals starting before `end` can overlap; one of them does
+        # iff the latest end among them is after `start`
+        index = bisect.bisect_left(starts, end)
+        return index == 0 or self.max_ends[carousel_id][index - 1] <= start
+
+
+def choose_carousel(
+    occupancy: Occupancy,
+    candidates: Iterable[str],
+    start: datetime,
+    end: datetime,
+) -> str | None:
+    """
+    Pick a free carousel for [start, end).
+
+    Among conflict-free candidates the least used one wins (utilization
+    balancing); ties keep the candidate order.
+
+    Returns:
+        Carousel ID, or None if every candidate is occupied
+    """
+    best = None
+    best_busy = None
+    for carousel_id in candidates:
+        if not occupancy.is_free(carousel_id, start, end):
+            continue
+        busy = occupancy.busy_seconds.get(carousel_id, 0)
+        if best is None or busy < best_busy:
+            best, best_busy = carousel_id, busy
+    return best
+
+
+def assign_all(
+    items: list,
+    occupancy: Occupancy,
+    candidates_for: Callable[[object], Iterable[str]],
+) -> dict[object, str | None]:
+    """
+    Place items (anything with start_time/end_time) in start time order.
+
+    Args:
+        items: Items to place; not yet part of occupancy
+        occupancy: Intervals that stay fixed; updated with each placement
+        candidates_for: Returns the allowed carousel IDs for an item
+
+    Returns:
+        item -> chosen carousel ID (None if it could not be placed)
+    """
+    result = {}
+    for item in sorted(items, key=lambda item: (item.start_time, item.end_time)):
+        carousel_id = choose_carousel(
+            occupancy, candidates_for(item), item.start_time, item.end_time
+        )
+        if carousel_id is not None:
+            occupancy.add(carousel_id, item.start_time, item.end_time)
+        result[item] = carousel_id
+    return result
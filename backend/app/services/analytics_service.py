@@ -0,0 +1,360 @@
+"""
+Analytics Service
+Incrementally maintained carousel/terminal utilization aggregates
+
+Assignment writes update the carousel aggregates in their own transaction.
+Terminal aggregates are the sum of their carousels and are refreshed in
+the same transaction just before it commits, after every carousel row it
+touches is locked, so a committed write never leaves a terminal stale.
+Edits on different carousels of one terminal only wait for each other
+for that last step.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, defer
+
+from app.models import Assignment, Carousel, DailyUsage
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+MINUTES_PER_DAY = 24 * 60
+
+SCOPE_CAROUSEL = "CAROUSEL"
+SCOPE_TERMINAL = "TERMINAL"
+
+
+# =============================================================================
+# Minute Helpers
+# =============================================================================
+
+def split_by_day(start: datetime, end: datetime) -> list[tuple[date, int, int]]:
+    """
+    Split an occupation interval into per-day minute ranges.
+
+    Returns:
+        List of (day, first minute, end minute exclusive).
+        Partial minutes count as occupied.
+    """
+    ranges = []
+    day = start.date()
+    while True:
+        day_start = datetime.combine(day, datetime.min.time())
+        first = max(0, int((start - day_start).total_seconds() // 60))
+        last = min(MINUTES_PER_DAY, -int(-(end - day_start).total_seconds() // 60))
+        if first < last:
+            ranges.append((day, first, last))
+        if end <= day_start + timedelta(days=1):
+            break
+        day += timedelta(days=1)
+    return ranges
+
+
+def idle_gaps(minute_counts: list[int]) -> list[tuple[int, int]]:
+    """
+    Find idle gaps between the first and last busy minute.
+
+    Returns:
+        List of (first idle minute, end minute exclusive)
+    """
+    gaps = []
+    gap_start = None
+    seen_busy = False
+    for minute, count in enumerate(minute_counts):
+        if count > 0:
+            if gap_start is not None:
+                gaps.append((gap_start, minute))
+                gap_start = None
+            seen_busy = True
+        elif seen_busy and gap_start is None:
+            gap_start = minute
+    return gaps
+
+
+def _summarize(usage: DailyUsage) -> None:
+    """Refresh the summary columns from minute_counts."""
+    counts = usage.minute_counts
+    peak = max(counts)
+    gaps = idle_gaps(counts)
+
+    usage.busy_minutes = sum(1 for count in counts if count > 0)
+    usage.conflict_minutes = sum(1 for count in counts if count > 1)
+    usage.peak_concurrency = peak
+    usage.peak_minute = counts.index(peak) if peak else None
+    usage.hourly_minutes = [
+        sum(1 for count in counts[hour * 60:(hour + 1) * 60] if count > 0)
+        for hour in range(24)
+    ]
+    usage.idle_gap_count = len(gaps)
+    usage.longest_idle_minutes = max((end - start for start, end in gaps), default=0)
+
+
+# =============================================================================
+# Incremental Maintenance
+# =============================================================================
+
+def _get_usage(db: Session, usage_date: date, scope: str, scope_id: str) -> DailyUsage:
+    """
+    Load and row-lock an aggregate, creating an empty one if missing.
+
+    The row lock only serializes writers touching the same carousel on
+    the same day, so the JSON histogram is never lost-updated. A missing
+    row is inserted with ON CONFLICT DO NOTHING first, so two first
+    writers do not both INSERT.
+    """
+    query = db.query(DailyUsage).filter(
+        DailyUsage.usage_date == usage_date,
+        DailyUsage.scope == scope,
+        DailyUsage.scope_id == scope_id,
+    ).with_for_update()
+    sqlite_db = db.get_bind().dialect.name == "sqlite"
+    insert = (sqlite.insert if sqlite_db else postgresql.insert)(DailyUsage).values(
+        usage_date=usage_date,
+        scope=scope,
+        scope_id=scope_id,
+        minute_counts=[0] * MINUTES_PER_DAY,
+        assignment_count=0,
+    ).on_conflict_do_nothing()
+
+    if sqlite_db:
+        # No row locks (FOR UPDATE is ignored): any INSERT takes the database
+        # write lock until commit, so the read below cannot be outdated
+        db.execute(insert)
+        return query.one()
+
+    usage = query.first()
+    if usage is None:
+        db.execute(insert)
+        usage = query.one()
+    return usage
+
+
+def _usage_keys(start: datetime, end: datetime, carousel_id: str) -> list[tuple[date, str]]:
+    """(day, carousel) aggregates an occupation interval touches."""
+    if end <= start:
+        return []
+    return [(day, carousel_id) for day, _, _ in split_by_day(start, end)]
+
+
+def placement(row) -> tuple[str, datetime, datetime]:
+    """(carousel_id, start, end) of an assignment row, for lock_usage()."""
+    return row.carousel_id, row.start_time, row.end_time
+
+
+def lock_usage(db: Session, placements: Iterable[tuple[str, datetime, datetime]]) -> None:
+    """
+    Lock the aggregates of several placements, (carousel_id, start, end),
+    in key order.
+
+    Call before a move or a batch, with the old and the new placements:
+    writers that lock rows one by one in their own order (e.g. C1->C2
+    against C2->C1) could otherwise deadlock.
+    """
+    keys = set()
+    for carousel_id, start, end in placements:
+        keys.update(_usage_keys(start, end, carousel_id))
+    for day, carousel_id in sorted(keys):
+        _get_usage(db, day, SCOPE_CAROUSEL, carousel_id)
+
+
+def _apply(
+    db: Session,
+    assignment: Assignment,
+    sign: int,
+    only_day: date | None = None,
+) -> None:
+    """Add (sign=1) or remove (sign=-1) one assignment from the histograms."""
+    if assignment.end_time <= assignment.start_time:
+        return
+
+    carousel = db.get(Carousel, assignment.carousel_id)
+    terminal = carousel.terminal if carousel else None
+    for day, first, last in split_by_day(assignment.start_time, assignment.end_time):
+        if only_day is not None and day != only_day:
+            continue
+        usage = _get_usage(db, day, SCOPE_CAROUSEL, assignment.carousel_id)
+        counts = list(usage.minute_counts)  # New list so the JSON change is detected
+        for minute in range(first, last):
+            counts[minute] += sign
+        usage.minute_counts = counts
+        if day == assignment.start_time.date():
+            usage.assignment_count += sign
+        if usage.assignment_count < 0 or min(counts[first:last]) < 0:
+            logger.warning(
+                "Usage of %s on %s went negative; aggregates drifted from the "
+                "assignments (POST /api/analytics/rebuild?date=%s repairs them)",
+                assignment.carousel_id, day, day,
+            )
+        _summarize(usage)
+        if terminal:
+            db.info.setdefault("usage_terminals", set()).add((day, terminal))
+
+
+def record_assignment(db: Session, assignment: Assignment, sign: int = 1) -> None:
+    """
+    Apply an assignment to the daily aggregates.
+
+    Call with sign=1 after creating an assignment, sign=-1 before deleting it,
+    and -1 / +1 around an update. Changes join the caller's transaction.
+    """
+    _apply(db, assignment, sign)
+
+
+def rebuild_day(db: Session, usage_date: date) -> int:
+    """
+    Recompute all aggregates of a day from the assignments table.
+    Repairs drift (e.g. after a carousel changed terminal).
+
+    Returns:
+        Number of assignments applied
+    """
+    day_start = datetime.combine(usage_date, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+
+    db.query(DailyUsage).filter(DailyUsage.usage_date == usage_date).delete()
+    db.flush()
+
+    assignments = db.query(Assignment).filter(
+        Assignment.start_time < day_end,
+        Assignment.end_time > day_start,
+    ).all()
+
+    for assignment in assignments:
+        _apply(db, assignment, 1, only_day=usage_date)
+
+    refresh_terminals(db)
+
+    return len(assignments)
+
+
+# =============================================================================
+# Terminal Aggregates (refreshed before commit)
+# =============================================================================
+
+def _refresh_terminal(db: Session, usage_date: date, terminal: str) -> None:
+    """Recompute a terminal's aggregate as the sum of its carousels."""
+    usage = _get_usage(db, usage_date, SCOPE_TERMINAL, terminal)
+    db.flush()  # Carousel rows changed in this session (rebuild_day)
+    counts = [0] * MINUTES_PER_DAY
+    assignment_count = 0
+    for carousel_usage in db.query(DailyUsage).filter(
+        DailyUsage.usage_date == usage_date,
+        DailyUsage.scope == SCOPE_CAROUSEL,
+        DailyUsage.scope_id.in_(
+            select(Carousel.carousel_id).where(Carousel.terminal == terminal)
+        ),
+    ):
+        counts = [total + count for total, count in zip(counts, carousel_usage.minute_counts)]
+        assignment_count += carousel_usage.assignment_count
+    usage.minute_counts = counts
+    usage.assignment_count = assignment_count
+    _summarize(usage)
+
+
+def refresh_terminals(db: Session) -> None:
+    """
+    Refresh the (day, terminal) aggregates touched in this transaction.
+
+    Runs last, with the carousel rows already locked, and locks terminal
+    rows in key order: the refresh that commits last always sees every
+    committed carousel change, and writers cannot deadlock.
+    """
+    for usage_date, terminal in sorted(db.info.pop("usage_terminals", ())):
+        _refresh_terminal(db, usage_date, terminal)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session: Session) -> None:
+    refresh_terminals(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("usage_terminals", None)
+
+
+# =============================================================================
+# Queries
+# =============================================================================
+
+def get_day_usage(db: Session, usage_date: date) -> list[DailyUsage]:
+    """All aggregates (carousel and terminal) stored for one day."""
+    return db.query(DailyUsage).filter(
+        DailyUsage.usage_date == usage_date
+    ).order_by(DailyUsage.scope, DailyUsage.scope_id).all()
+
+
+def get_range_usage(db: Session, date_from: date, date_to: date) -> list[DailyUsage]:
+    """
+    Stored summaries for an inclusive date range.
+
+    The minute histograms are deferred, so a month-long rollup reads only
+    the small summary columns.
+    """
+    return db.query(DailyUsage).options(
+        defer(DailyUsage.minute_counts)
+    ).filter(
+        DailyUsage.usage_date >= date_from,
+        DailyUsage.usage_date <= date_to,
+    ).order_by(DailyUsage.usage_date, DailyUsage.scope, DailyUsage.scope_id).all()
+
+
+def rollup(summaries: list[DailyUsage], range_days: int) -> tuple[list[dict], list[dict]]:
+    """
+    Combine stored daily summaries into per-carousel and per-terminal totals.
+    Utilization is busy minutes over every minute of the range (range_days).
+
+    Returns:
+        (carousel rollups, terminal rollups)
+    """
+    carousels: dict[str, dict] = {}
+    terminals: dict[str, dict] = {}
+
+    for usage in summaries:
+        if not usage.busy_minutes:
+            continue
+        if usage.scope == SCOPE_CAROUSEL:
+            item = carousels.setdefault(usage.scope_id, {
+                "carousel_id": usage.scope_id,
+                "active_days": 0,
+                "assignment_count": 0,
+                "busy_minutes": 0,
+                "conflict_minutes": 0,
+                "longest_idle_minutes": 0,
+            })
+            item["active_days"] += 1
+            item["assignment_count"] += usage.assignment_count
+            item["busy_minutes"] += usage.busy_minutes
+            item["conflict_minutes"] += usage.conflict_minutes
+            item["longest_idle_minutes"] = max(
+                item["longest_idle_minutes"], usage.longest_idle_minutes
+            )
+        else:
+            item = terminals.setdefault(usage.scope_id, {
+                "terminal": usage.scope_id,
+                "active_days": 0,
+                "assignment_count": 0,
+                "peak_concurrency": 0,
+                "peak_date": None,
+            })
+            item["active_days"] += 1
+            item["assignment_count"] += usage.assignment_count
+            if usage.peak_concurrency > item["peak_concurrency"]:
+                item["peak_concurrency"] = usage.peak_concurrency
+                item["peak_date"] = usage.usage_date
+
+    for item in carousels.values():
+        item["utilization"] = round(
+            item["busy_minutes"] / (range_days * MINUTES_PER_DAY), 4
+        )
+
+    return list(carousels.values()), list(terminals.values())
@@ -0,0 +1,77 @@
+"""
+Assignment Service
+Time overlap and same-carousel conflict checks
+"""
+
+from datetime import datetime
+from typing import Iterable, Protocol
+
+
+class Interval(Protocol):
+    """Anything with an assignment's carousel and occupation time"""
+    carousel_id: str
+    start_time: datetime
+    end_time: datetime
+
+
+def overlaps(
+    start_a: datetime,
+    end_a: datetime,
+    start_b: datetime,
+    end_b: datetime,
+) -> bool:
+    """Whether two half-open intervals [start, end) overlap."""
+    return start_a < end_b and start_b < end_a
+
+
+def find_conflicts(assignments: Iterable[Interval]) -> list[tuple[Interval, Interval]]:
+    """
+    Find pairs of assignments that occupy the same carousel at the same time.
+
+    Sorts each carousel's assignments by start time and sweeps them once,
+    so a day's plan is checked in O(n log n) plus the number of conflicts.
+
+    Returns:
+        List of (earlier assignment, overlapping later assignment)
+    """
+    by_carousel: dict[str, list[Interval]] = {}
+    for assignment in assignments:
+        by_carousel.setdefault(assignment.carousel_id, []).append(assignment)
+
+    conflicts = []
+    for items in by_carousel.values():
+        items.sort(key=lambda item: (item.start_time, item.end_time))
+        active: list[Interval] = []
+        for item in items:
+            active = [other for other in active if other.end_time > item.start_time]
+            conflicts.extend((other, item) for other in active)
+            active.append(item)
+
+    return conflicts
+
+
+def busy_minutes(assignments: Iterable[Interval]) -> dict[str, int]:
+    """
+    Minutes each carousel is occupied (overlapping assignments counted once).
+    """
+    by_carousel: dict[str, list[Interval]] = {}
+    for assignment in assignments:
+        by_carousel.setdefault(assignment.carousel_id, []).append(assignment)
+
+    result = {}
+    for carousel_id, items in by_carousel.items():
+        items.sort(key=lambda item: item.start_time)
+        total = 0
+        current_start = current_end = None
+        for item in items:
+            if current_end is None or item.start_time >= current_end:
+                if current_end is not None:
+                    total += (current_end - current_start).total_seconds()
+                current_start, current_end = item.start_time, item.end_time
+            else:
+                current_end = max(current_end, item.end_time)
+        if current_end is not None:
+            total += (current_end - current_start).total_seconds()
+        result[carousel_id] = int(total // 60)
+
+    return result
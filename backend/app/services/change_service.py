@@ -0,0 +1,245 @@
+"""
+Change Service
+Cross-worker change notifications so per-process caches never go stale
+
+Writers call publish(db, entity, day) inside their transaction. Changes
+are collected (deduplicated) on the session; right before COMMIT they are
+sent to every other worker in as few NOTIFYs as fit (PostgreSQL), whose
+background listener runs the same handlers; after COMMIT the handlers in
+this process run. A rolled-back transaction announces nothing.
+
+Handlers are registered with subscribe() by the modules that own a cache
+(e.g. constraint_service drops its compiled feasibility tables).
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+from datetime import date
+from typing import Callable, Iterable
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+CHANNEL = "betashift_changes"
+ENTITIES = ("assignments", "flights", "airlines", "carousels", "maintenance")
+POLL_SECONDS = 1.0  # Listener wake-up interval (to notice shutdown)
+RECONNECT_SECONDS = 5.0
+KEEPALIVE_SECONDS = 30.0  # Idle time after which the listener pings its connection
+PAYLOAD_LIMIT = 7000  # Bytes per NOTIFY payload (PostgreSQL rejects 8000 and more)
+
+# libpq settings of the listener connection: a half-open connection (e.g. a
+# dropped NAT entry) fails within about a minute instead of never
+LISTENER_CONNECT_ARGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+    "tcp_user_timeout": 30000,  # ms
+}
+
+# Identifies this process, so its own notifications are not handled twice
+_origin = uuid.uuid4().hex
+
+Handler = Callable[[date | None, str], None]
+
+
+# =============================================================================
+# Handlers
+# =============================================================================
+
+_handlers: list[tuple[frozenset[str], Handler]] = []
+
+
+def subscribe(handler: Handler, entities: Iterable[str] = ENTITIES) -> None:
+    """
+    Call handler(day, entity) after a change to one of the entities commits.
+    day is None when the change is not tied to one day, or when changes may
+    have been missed (listener reconnect): drop everything in that case.
+    """
+    _handlers.append((frozenset(entities), handler))
+
+
+def dispatch(day: date | None, entity: str | None = None) -> None:
+    """Run the handlers for a change (entity None = every entity)."""
+    for entities, handler in _handlers:
+        if entity is None:
+            for name in entities:
+                _call(handler, day, name)
+        elif entity in entities:
+            _call(handler, day, entity)
+
+
+def _call(handler: Handler, day: date | None, entity: str) -> None:
+    try:
+        handler(day, entity)
+    except Exception:  # A broken cache must not fail the write that triggered it
+        logger.exception("Change handler %r failed for %s %s", handler, entity, day)
+
+
+# =============================================================================
+# Publishing
+# =============================================================================
+
+def publish(db: Session, entity: str, day: date | None = None) -> None:
+    """
+    Announce a change made in db's current transaction.
+    Delivered only if and when the transaction commits.
+    """
+    if entity not in ENTITIES:
+        raise ValueError(f"Unknown entity: {entity}")
+    db.info.setdefault("pending_changes", set()).add((day, entity))
+
+
+def _compact(changes: Iterable[tuple[date | None, str]]) -> list[tuple[date | None, str]]:
+    """Drop per-day changes covered by an all-days (None) change of the same entity."""
+    changes = set(changes)
+    whole = {entity for day, entity in changes if day is None}
+    return sorted(
+        ((day, entity) for day, entity in changes if day is None or entity not in whole),
+        key=lambda change: (change[1], change[0] or date.min),
+    )
+
+
+def _payloads(changes: list[tuple[date | None, str]]) -> list[str]:
+    """NOTIFY payloads for a transaction's changes, each within PAYLOAD_LIMIT."""
+    payloads, chunk = [], []
+
+    def encode(items: list) -> str:
+        return json.dumps({"origin": _origin, "changes": items}, separators=(",", ":"))
+
+    for day, entity in changes:
+        item = [entity, day.isoformat() if day else None]
+        if chunk and len(encode(chunk + [item])) > PAYLOAD_LIMIT:
+            payloads.append(encode(chunk))
+            chunk = []
+        chunk.append(item)
+    if chunk:
+        payloads.append(encode(chunk))
+    return payloads
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session: Session) -> None:
+    changes = session.info.get("pending_changes")
+    if not changes or session.get_bind().dialect.name != "postgresql":
+        return
+    # NOTIFY is transactional: other workers see it at COMMIT
+    for payload in _payloads(_compact(changes)):
+        session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": CHANNEL, "payload": payload})
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for day, entity in _compact(session.info.pop("pending_changes", ())):
+        dispatch(day, entity)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("pending_changes", None)
+
+
+# =============================================================================
+# Listener (one background thread per worker, PostgreSQL only)
+# =============================================================================
+
+_stop = threading.Event()
+_thread: threading.Thread | None = None
+
+
+def _receive(payload: str) -> None:
+    try:
+        message = json.loads(payload)
+        if message.get("origin") == _origin:
+            return
+        changes = [
+            (date.fromisoformat(day) if day else None, entity)
+            for entity, day in message["changes"]
+        ]
+    except (ValueError, TypeError, KeyError, AttributeError):
+        logger.warning("Ignoring malformed change notification: %r", payload)
+        return
+    for day, entity in changes:
+        dispatch(day, entity)
+
+
+def _listen(engine: Engine) -> None:
+    # Dedicated DBAPI connection outside the pool (held for the worker's lifetime)
+    connect_args, connect_kwargs = engine.dialect.create_connect_args(engine.url)
+    connect_kwargs = {**LISTENER_CONNECT_ARGS, **connect_kwargs}
+    while not _stop.is_set():
+        try:
+            connection = engine.dialect.connect(*connect_args, **connect_kwargs)
+        except Exception:
+            logger.exception("Change listener could not connect; retrying")
+            _stop.wait(RECONNECT_SECONDS)
+            continue
+
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            # Changes committed before LISTEN was active (while starting up or
+            # disconnected) were never received: drop everything cached so far
+            dispatch(None)
+
+            last_seen = time.monotonic()
+            while not _stop.is_set():
+                if select.select([connection], [], [], POLL_SECONDS)[0]:
+                    connection.poll()
+                    last_seen = time.monotonic()
+                elif time.monotonic() - last_seen >= KEEPALIVE_SECONDS:
+                    # Raises on a dead connection (bounded by tcp_user_timeout)
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    last_seen = time.monotonic()
+                while connection.notifies:
+                    _receive(connection.notifies.pop(0).payload)
+        except Exception:
+            logger.exception("Change listener lost its connection; reconnecting")
+            _stop.wait(RECONNECT_SECONDS)
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+def start_listener(engine: Engine) -> bool:
+    """
+    Start this worker's listener thread.
+
+    Returns:
+        False if the database cannot notify (not PostgreSQL); caches are then
+        only kept coherent within this process
+    """
+    global _thread
+    if engine.dialect.name != "postgresql":
+        return False
+    if _thread is None or not _thread.is_alive():
+        _stop.clear()
+        _thread = threading.Thread(target=_listen, args=(engine,), name="change-listener", daemon=True)
+        _thread.start()
+    return True
+
+
+def stop_listener() -> None:
+    """Stop the listener thread (app shutdown)."""
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=POLL_SECONDS * 2)
+        _thread = None
@@ -0,0 +1,153 @@
+"""
+Compression Service
+Accept-Encoding negotiation and gzip/brotli compression for large responses
+
+Brotli is optional (pip install brotli); without it only gzip is offered.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+MIN_SIZE = 1024  # Smaller bodies are sent as is (headers would eat the gain)
+
+# On-the-fly compression runs per request: favour speed
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+# Cached payloads are compressed once and sent many times: favour size
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 9
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Server preference when the client accepts several codings equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+# =============================================================================
+# Negotiation
+# =============================================================================
+
+def negotiate(accept_encoding: str | None, available: tuple[str, ...] = ENCODINGS) -> str | None:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    Honours q-values (q=0 refuses a coding) and "*".
+
+    Returns:
+        "br" or "gzip", or None to send the body uncompressed
+    """
+    if not accept_encoding:
+        return None
+
+    weights: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip()
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding] = weight
+
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for coding in available:
+        weight = weights.get(coding, wildcard)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(data: bytes, encoding: str, cached: bool = False) -> bytes:
+    """
+    Compress a whole body.
+
+    Args:
+        encoding: "br" or "gzip" (from negotiate())
+        cached: Use the slower, smaller settings for payloads sent many times
+    """
+    if encoding == "br":
+        return brotli.compress(
+            data,
+            mode=brotli.MODE_TEXT,
+            quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY,
+        )
+    if encoding == "gzip":
+        compressor = zlib.compressobj(
+            CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, zlib.DEFLATED, 31
+        )
+        return compressor.compress(data) + compressor.flush()
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+# =============================================================================
+# Middleware
+# =============================================================================
+
+class CompressionMiddleware:
+    """
+    Compresses single-part JSON/text responses of at least MIN_SIZE bytes.
+
+    Responses that already carry a Content-Encoding (precompressed day
+    snapshots, gzip exports) and streamed responses pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # Held until the body shows whether to compress
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if (
+                not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
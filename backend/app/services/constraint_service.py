@@ -0,0 +1,375 @@
+"""
+Constraint Service
+Carousel assignment rules compiled into per-day feasibility bitmasks
+
+Rules are small pluggable classes. Once per day (and again after any
+rule data changes) they are evaluated for every flight x carousel pair
+and every carousel's time window. After that a feasibility check is:
+
+    (flight_mask >> carousel_index) & 1          # static rules
+    interval_mask & blocked_mask[carousel] == 0  # time windows
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.models import Airline, Carousel, CarouselMaintenance, Flight
+from app.services import change_service, single_flight
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+MINUTES_PER_DAY = 24 * 60
+WINDOW_MINUTES = 2 * MINUTES_PER_DAY  # Day of arrival + next day (late arrivals)
+
+WIDE_BODY_PREFIXES = ("A33", "A34", "A35", "A38", "B74", "B76", "B77", "B78")
+
+
+def is_wide_body(aircraft_type: str | None) -> bool:
+    """Whether an aircraft type (e.g., "B777", "A388") is wide-body."""
+    if not aircraft_type:
+        return False
+    return aircraft_type.upper().startswith(WIDE_BODY_PREFIXES)
+
+
+# =============================================================================
+# Constraint Base Class
+# =============================================================================
+
+class Constraint:
+    """
+    Base class for carousel constraints.
+
+    Override allows() for rules about a flight/carousel pair and blocked()
+    for rules about when a carousel cannot be used. They are called while
+    compiling a day (and to explain a violation), never on the feasible
+    fast path.
+
+    Constraints are shared by all threads, so they keep no state: rule
+    data loaded by prepare() is returned, stored with the compiled day
+    and passed back to allows()/blocked() as `context`.
+    """
+    name = "constraint"
+
+    def prepare(self, db: Session, window_start: datetime, window_end: datetime) -> Any:
+        """Load any rule data needed for the window (called once per compile)."""
+        return None
+
+    def allows(self, flight: Flight, carousel: Carousel, context: Any = None) -> bool:
+        """Whether the flight may use the carousel at all."""
+        return True
+
+    def blocked(self, carousel: Carousel, context: Any = None) -> list[tuple[datetime, datetime]]:
+        """Time ranges in which the carousel cannot be used."""
+        return []
+
+
+class ActiveCarouselConstraint(Constraint):
+    """Inactive carousels cannot be used."""
+    name = "inactive_carousel"
+
+    def allows(self, flight, carousel, context=None):
+        return bool(carousel.is_active)
+
+
+class AirlineTerminalConstraint(Constraint):
+    """Airlines with a terminal set may only use carousels in that terminal."""
+    name = "airline_terminal"
+
+    def prepare(self, db, window_start, window_end):
+        return {
+            airline.airline_code: airline.terminal
+            for airline in db.query(Airline).filter(Airline.terminal.isnot(None))
+        }
+
+    def allows(self, flight, carousel, context=None):
+        terminal = context.get(flight.airline)
+        return terminal is None or terminal == carousel.terminal
+
+
+class WideBodyConstraint(Constraint):
+    """Wide-body-only carousels are reserved for wide-body aircraft."""
+    name = "wide_body_only"
+
+    def allows(self, flight, carousel, context=None):
+        return not carousel.wide_body_only or is_wide_body(flight.aircraft_type)
+
+
+class CapacityConstraint(Constraint):
+    """A carousel must be able to take the flight's baggage count."""
+    name = "capacity"
+
+    def allows(self, flight, carousel, context=None):
+        if not flight.baggage_count or not carousel.capacity:
+            return True
+        return flight.baggage_count <= carousel.capacity
+
+
+class MaintenanceConstraint(Constraint):
+    """Carousels cannot be used during their maintenance windows."""
+    name = "maintenance"
+
+    def prepare(self, db, window_start, window_end):
+        windows: dict[str, list[tuple[datetime, datetime]]] = {}
+        rows = db.query(CarouselMaintenance).filter(
+            CarouselMaintenance.start_time < window_end,
+            CarouselMaintenance.end_time > window_start,
+        )
+        for row in rows:
+            windows.setdefault(row.carousel_id, []).append((row.start_time, row.end_time))
+        return windows
+
+    def blocked(self, carousel, context=None):
+        return context.get(carousel.carousel_id, [])
+
+
+CONSTRAINTS: list[Constraint] = [
+    ActiveCarouselConstraint(),
+    AirlineTerminalConstraint(),
+    WideBodyConstraint(),
+    CapacityConstraint(),
+    MaintenanceConstraint(),
+]
+
+
+def register_constraint(constraint: Constraint) -> None:
+    """Add a custom constraint. Compiled days are invalidated."""
+    CONSTRAINTS.append(constraint)
+    invalidate()
+
+
+# =============================================================================
+# Compiled Feasibility Table
+# =============================================================================
+
+def _interval_mask(window_start: datetime, start: datetime, end: datetime) -> int:
+    """Bitmask of the window minutes covered by [start, end)."""
+    first = max(0, int((start - window_start).total_seconds() // 60))
+    last = min(WINDOW_MINUTES, -int(-(end - window_start).total_seconds() // 60))
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+@dataclass
+class FeasibilityTable:
+    """
+    Compiled constraints for the flights of one day.
+
+    Attributes:
+        day: Day of the flights' scheduled arrival
+        window_start: Minute 0 of the time masks (midnight of day)
+        carousel_ids: Carousel order used for flight mask bits
+        flight_masks: flight_id -> bit i set if carousel_ids[i] is allowed
+        blocked_masks: carousel_id -> bit m set if minute m is blocked
+        blocked_by: constraint name -> carousel_id -> that constraint's mask
+        prepared: (constraint, its prepare() result) the masks were built
+            from, to explain a violation without loading the rules again
+    """
+    day: date
+    window_start: datetime
+    carousel_ids: list[str]
+    flight_masks: dict[str, int] = field(default_factory=dict)
+    blocked_masks: dict[str, int] = field(default_factory=dict)
+    blocked_by: dict[str, dict[str, int]] = field(default_factory=dict)
+    prepared: list[tuple[Constraint, Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.carousel_bits = {
+            carousel_id: index for index, carousel_id in enumerate(self.carousel_ids)
+        }
+
+    def is_feasible(
+        self,
+        flight_id: str,
+        carousel_id: str,
+        start: datetime,
+        end: datetime,
+    ) -> bool:
+        """Bit test of the static flight mask and the carousel's time mask."""
+        index = self.carousel_bits.get(carousel_id)
+        if index is None or not (self.flight_masks.get(flight_id, 0) >> index) & 1:
+            return False
+        interval = _interval_mask(self.window_start, start, end)
+        return not interval & self.blocked_masks.get(carousel_id, 0)
+
+    def feasible_carousels(self, flight_id: str, start: datetime, end: datetime) -> list[str]:
+        """All carousels the flight may use in [start, end)."""
+        mask = self.flight_masks.get(flight_id, 0)
+        interval = _interval_mask(self.window_start, start, end)
+        result = []
+        while mask:
+            low = mask & -mask
+            carousel_id = self.carousel_ids[low.bit_length() - 1]
+            if not interval & self.blocked_masks.get(carousel_id, 0):
+                result.append(carousel_id)
+            mask ^= low
+        return result
+
+
+def compile_day(db: Session, day: date) -> FeasibilityTable:
+    """Evaluate every constraint for all flights scheduled on a day."""
+    window_start = datetime.combine(day, datetime.min.time())
+    window_end = window_start + timedelta(minutes=WINDOW_MINUTES)
+
+    prepared = [
+        (constraint, constraint.prepare(db, window_start, window_end))
+        for constraint in list(CONSTRAINTS)
+    ]
+
+    carousels = db.query(Carousel).order_by(Carousel.carousel_id).all()
+    flights = db.query(Flight).filter(
+        Flight.scheduled_time >= window_start,
+        Flight.scheduled_time < window_start + timedelta(days=1),
+    ).all()
+
+    table = FeasibilityTable(
+        day=day,
+        window_start=window_start,
+        carousel_ids=[carousel.carousel_id for carousel in carousels],
+        prepared=prepared,
+    )
+
+    for carousel in carousels:
+        blocked = 0
+        for constraint, context in prepared:
+            mask = 0
+            for start, end in constraint.blocked(carousel, context):
+                mask |= _interval_mask(window_start, start, end)
+            if mask:
+                table.blocked_by.setdefault(constraint.name, {})[carousel.carousel_id] = mask
+                blocked |= mask
+        table.blocked_masks[carousel.carousel_id] = blocked
+
+    for flight in flights:
+        mask = 0
+        for index, carousel in enumerate(carousels):
+            if all(constraint.allows(flight, carousel, context) for constraint, context in prepared):
+                mask |= 1 << index
+        table.flight_masks[flight.flight_id] = mask
+
+    return table
+
+
+# =============================================================================
+# Per-Process Cache
+# =============================================================================
+
+_tables: dict[date, FeasibilityTable] = {}
+_lock = threading.Lock()
+_generation = 0  # Bumped by every invalidation
+
+
+def get_table(db: Session, day: date) -> FeasibilityTable:
+    """
+    Compiled table for a day, compiling it on first use.
+    Concurrent misses for a day share one compile; different days
+    compile in parallel.
+    """
+    with _lock:
+        table = _tables.get(day)
+    if table is not None:
+        return table
+
+    def load() -> FeasibilityTable:
+        with _lock:
+            generation = _generation
+        table = compile_day(db, day)
+        with _lock:
+            # Not kept if rule data changed while it was being compiled
+            if generation == _generation:
+                _tables[day] = table
+        return table
+
+    return single_flight.run(("feasibility", day), load)
+
+
+def invalidate(day: date | None = None) -> None:
+    """
+    Drop compiled tables after rule data changed
+    (carousels, airlines, maintenance windows or flights).
+    Without a day, every compiled day is dropped.
+    """
+    global _generation
+
+    def matches(key) -> bool:
+        return key[0] == "feasibility" and day in (None, key[1])
+
+    with _lock:
+        _generation += 1
+        if day is None:
+            _tables.clear()
+        else:
+            _tables.pop(day, None)
+        # Callers from now on must not join a compile that read pre-change rules
+        single_flight.invalidate(matches)
+
+
+# Rule data changed in any worker (see change_service)
+change_service.subscribe(
+    lambda day, entity: invalidate(day),
+    ("flights", "airlines", "carousels", "maintenance"),
+)
+
+
+# =============================================================================
+# Checks
+# =============================================================================
+
+def check_assignment(
+    db: Session,
+    flight: Flight,
+    carousel: Carousel,
+    start: datetime,
+    end: datetime,
+) -> list[str]:
+    """
+    Check an assignment against all constraints.
+
+    Returns:
+        Names of the violated constraints (empty list if feasible).
+        The bitmasks answer the common feasible case; rules are only
+        re-evaluated to explain a violation.
+    """
+    day = flight.scheduled_time.date()
+    table = get_table(db, day)
+    if flight.flight_id not in table.flight_masks:
+        # Flight added after the day was compiled
+        invalidate(day)
+        table = get_table(db, day)
+
+    if table.is_feasible(flight.flight_id, carousel.carousel_id, start, end):
+        return []
+
+    # Explained with the rule data the table was compiled from
+    violations = [
+        constraint.name for constraint, context in table.prepared
+        if not constraint.allows(flight, carousel, context)
+    ]
+
+    interval = _interval_mask(table.window_start, start, end)
+    for name, masks in table.blocked_by.items():
+        if interval & masks.get(carousel.carousel_id, 0):
+            violations.append(name)
+    return violations
+
+
+def feasible_carousels(
+    db: Session,
+    flight: Flight,
+    start: datetime,
+    end: datetime,
+) -> list[str]:
+    """Carousels a flight may be assigned to in [start, end) (for auto-assignment)."""
+    day = flight.scheduled_time.date()
+    table = get_table(db, day)
+    if flight.flight_id not in table.flight_masks:
+        invalidate(day)
+        table = get_table(db, day)
+    return table.feasible_carousels(flight.flight_id, start, end)
@@ -0,0 +1,134 @@
+"""
+Day Cache Service
+Per-process full-day JSON payloads (flights, assignments), kept compressed
+
+A day is queried and serialized once (concurrent misses are coalesced by
+single_flight); each content coding is compressed on first use and kept,
+so a repeated full-day load is answered from memory without serializing
+or compressing anything. Days are dropped through change_service when
+their data changes in any worker.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable
+
+from fastapi import Response
+
+from app.services import change_service, compression, single_flight
+
+MAX_DAYS = 64  # Cached (kind, day) payloads per process, least recently used dropped
+KINDS = ("flights", "assignments")
+
+
+class DaySnapshot:
+    """One serialized day and its compressed variants"""
+    __slots__ = ("content", "encoded")
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.encoded: dict[str, bytes] = {}
+
+    def body(self, encoding: str | None) -> bytes:
+        """Body for a content coding (None = uncompressed), compressed once."""
+        if encoding is None:
+            return self.content
+        body = self.encoded.get(encoding)
+        if body is None:
+            # Two first requests may both compress; either result is kept
+            body = self.encoded[encoding] = compression.compress(
+                self.content, encoding, cached=True
+            )
+        return body
+
+    def response(self, accept_encoding: str | None) -> Response:
+        """JSON response in the best coding the client accepts."""
+        encoding = None
+        if len(self.content) >= compression.MIN_SIZE:
+            encoding = compression.negotiate(accept_encoding)
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(self.body(encoding), media_type="application/json", headers=headers)
+
+
+# =============================================================================
+# Per-Process Cache
+# =============================================================================
+
+_snapshots: "OrderedDict[tuple[str, date], DaySnapshot]" = OrderedDict()
+_lock = threading.Lock()
+_generation = 0  # Bumped by every invalidation
+_stats = {"hits": 0, "misses": 0}
+
+
+def get(kind: str, day: date, build: Callable[[], bytes]) -> DaySnapshot:
+    """
+    Cached snapshot of a day, built with build() (serialized JSON) on a miss.
+
+    Args:
+        kind: "flights" or "assignments"
+    """
+    key = (kind, day)
+    with _lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is not None:
+            _snapshots.move_to_end(key)
+            _stats["hits"] += 1
+            return snapshot
+        _stats["misses"] += 1
+
+    def load() -> DaySnapshot:
+        with _lock:
+            generation = _generation
+        snapshot = DaySnapshot(build())
+        with _lock:
+            # Not kept if the data changed while it was being built
+            if generation == _generation:
+                _snapshots[key] = snapshot
+                while len(_snapshots) > MAX_DAYS:
+                    _snapshots.popitem(last=False)
+        return snapshot
+
+    return single_flight.run(key, load)
+
+
+def invalidate(kind: str | None = None, day: date | None = None) -> None:
+    """Drop cached days (kind None = every kind, day None = every day)."""
+    global _generation
+
+    def matches(key) -> bool:
+        # single_flight also runs other services' keys (e.g. feasibility compiles)
+        return key[0] in KINDS and kind in (None, key[0]) and day in (None, key[1])
+
+    with _lock:
+        _generation += 1
+        for key in list(_snapshots):
+            if matches(key):
+                del _snapshots[key]
+        # Requests from now on must not join a build that read pre-change rows
+        single_flight.invalidate(matches)
+
+
+def stats() -> dict:
+    """Hits, misses and days currently cached."""
+    with _lock:
+        return {**_stats, "cached": len(_snapshots)}
+
+
+def _on_change(day: date | None, entity: str) -> None:
+    """Drop payloads that embed the changed rows (see change_service)."""
+    if entity == "assignments":
+        invalidate("assignments", day)
+    elif entity == "flights":
+        # Assignment payloads embed flights, and may start the day after
+        invalidate("flights", day)
+        invalidate("assignments")
+    elif entity == "airlines":
+        invalidate("flights")
+    elif entity == "carousels":
+        invalidate("assignments")
+
+
+change_service.subscribe(_on_change, ("assignments", "flights", "airlines", "carousels"))
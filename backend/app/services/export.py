@@ -0,0 +1,207 @@
+"""
+Export Service
+Streams multi-day flight/assignment data as NDJSON or CSV
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import Assignment, Flight
+from app.services import compression
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+YIELD_PER = 1000            # Rows fetched per server-side cursor round trip
+FLUSH_BYTES = 64 * 1024     # Encoded bytes buffered before a chunk is sent
+MAX_RANGE_DAYS = 366
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# =============================================================================
+# Export Column Definitions
+# =============================================================================
+
+FLIGHT_COLUMNS = [
+    Flight.flight_id,
+    Flight.airline,
+    Flight.flight_number,
+    Flight.scheduled_time,
+    Flight.pax_count,
+    Flight.baggage_count,
+    Flight.aircraft_type,
+]
+
+ASSIGNMENT_COLUMNS = [
+    Assignment.assignment_id,
+    Assignment.flight_id,
+    Flight.airline,
+    Flight.flight_number,
+    Assignment.carousel_id,
+    Assignment.start_time,
+    Assignment.end_time,
+    Assignment.assignment_type,
+]
+
+
+# =============================================================================
+# Date Range
+# =============================================================================
+
+def parse_date_range(date_from: str, date_to: str) -> tuple[datetime, datetime]:
+    """
+    Parse an inclusive YYYY-MM-DD range into [start, end) datetimes.
+
+    Raises:
+        ValueError: If a date is malformed or the range is invalid/too long
+    """
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d")
+        end = datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1)
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+
+    if end <= start:
+        raise ValueError("date_to must not be before date_from")
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise ValueError(f"Date range must not exceed {MAX_RANGE_DAYS} days")
+
+    return start, end
+
+
+def flights_statement(start: datetime, end: datetime):
+    """Select flights scheduled in [start, end), oldest first."""
+    return (
+        select(*FLIGHT_COLUMNS)
+        .where(Flight.scheduled_time >= start, Flight.scheduled_time < end)
+        .order_by(Flight.scheduled_time, Flight.flight_id)
+    )
+
+
+def assignments_statement(start: datetime, end: datetime):
+    """Select assignments starting in [start, end) with their flight info."""
+    return (
+        select(*ASSIGNMENT_COLUMNS)
+        .join(Flight, Assignment.flight_id == Flight.flight_id)
+        .where(Assignment.start_time >= start, Assignment.start_time < end)
+        .order_by(Assignment.start_time, Assignment.assignment_id)
+    )
+
+
+# =============================================================================
+# Streaming
+# =============================================================================
+
+def _iter_rows(statement) -> Iterator:
+    """
+    Iterate result rows through a server-side cursor.
+
+    The session is owned by the generator (not the request dependency)
+    so it stays open exactly as long as the response is being streamed.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=YIELD_PER))
+        for row in result:
+            yield row
+    finally:
+        db.close()
+
+
+def _encode_ndjson(statement) -> Iterator[str]:
+    """One JSON object per line."""
+    for row in _iter_rows(statement):
+        yield json.dumps(jsonable_encoder(row._asdict()), ensure_ascii=False) + "\n"
+
+
+def _encode_csv(statement) -> Iterator[str]:
+    """Header line followed by one CSV line per row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([column.key for column in statement.selected_columns])
+    for row in _iter_rows(statement):
+        writer.writerow(
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def stream_export(statement, export_format: str, gzip: bool = False) -> Iterator[bytes]:
+    """
+    Encode a select statement as NDJSON/CSV byte chunks.
+
+    Lines are batched into ~FLUSH_BYTES chunks so the first bytes go out
+    as soon as the first batch of rows is fetched, while memory stays
+    constant regardless of the range length.
+    With gzip=True the chunks form a single gzip member.
+    """
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+    pending = []
+    pending_size = 0
+    for line in encode(statement):
+        data = line.encode("utf-8")
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size < FLUSH_BYTES:
+            continue
+
+        chunk = b"".join(pending)
+        pending, pending_size = [], 0
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield chunk
+
+    chunk = b"".join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_response(
+    statement,
+    export_format: str,
+    filename: str,
+    accept_encoding: str | None,
+) -> StreamingResponse:
+    """
+    Build a StreamingResponse for an export.
+
+    The body is gzip-compressed when the client accepts it.
+    """
+    gzip = compression.negotiate(accept_encoding, ("gzip",)) == "gzip"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{export_format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        stream_export(statement, export_format, gzip=gzip),
+        media_type=EXPORT_FORMATS[export_format],
+        headers=headers,
+    )
@@ -0,0 +1,219 @@
+"""
+Feed Service
+Parses upstream sys_input_dict_YYMMDD.json snapshots and applies only the
+flights that changed to Flight/Assignment
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.models import Airline, Assignment, Carousel, Flight
+from app.services import analytics_service, change_service, history_service
+
+logger = logging.getLogger(__name__)
+
+FEED_PATTERN = "sys_input_dict_*.json"
+ASSIGNMENT_TYPE = "FEED"  # Assignments placed by the upstream system
+
+
+@dataclass(frozen=True, slots=True)
+class FeedFlight:
+    """A flight as of the latest revision of its timeline"""
+    flight_id: str
+    airline: str
+    flight_number: str
+    scheduled_time: datetime  # firstBag of the first revision (original plan)
+    start_time: datetime
+    end_time: datetime
+    carousel_id: str
+    timeline_hash: str
+
+
+def feed_day(path: Path) -> datetime:
+    """Day start from a sys_input_dict_YYMMDD.json file name."""
+    return datetime.strptime(Path(path).stem.rsplit("_", 1)[-1], "%y%m%d")
+
+
+def timeline_hash(timeline: list[dict]) -> str:
+    """Stable hash of a flight's timeline (changes whenever a revision is added)."""
+    encoded = json.dumps(timeline, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+def _parse_flight(flight: dict, day_start: datetime) -> FeedFlight:
+    """
+    One feed flight as of its latest revision.
+
+    Raises:
+        ValueError: If a field is missing or has the wrong type
+    """
+    number = flight.get("flightNumber")
+    if not isinstance(number, str) or len(number) < 3:
+        raise ValueError(f"bad flightNumber {number!r}")
+    timeline = flight.get("timeline")
+    if not isinstance(timeline, list) or not timeline:
+        raise ValueError(f"{number}: timeline missing or empty")
+    for entry in timeline:
+        if not isinstance(entry, dict) or not all(
+            isinstance(entry.get(key), int) and not isinstance(entry.get(key), bool)
+            for key in ("minute", "firstBag", "LastBag", "carousel")
+        ):
+            raise ValueError(f"{number}: malformed timeline entry {entry!r}")
+
+    timeline = sorted(timeline, key=lambda entry: entry["minute"])
+    first, latest = timeline[0], timeline[-1]
+    return FeedFlight(
+        flight_id=f"{number}_{day_start:%Y%m%d}",
+        airline=number[:2],
+        flight_number=number[2:],
+        scheduled_time=day_start + timedelta(minutes=first["firstBag"]),
+        start_time=day_start + timedelta(minutes=latest["firstBag"]),
+        end_time=day_start + timedelta(minutes=latest["LastBag"]),
+        carousel_id=f"C{latest['carousel']}",
+        timeline_hash=timeline_hash(timeline),
+    )
+
+
+def parse_feed(path: Path) -> list[FeedFlight]:
+    """
+    Read a feed snapshot. Malformed flights are logged and skipped.
+
+    Raises:
+        ValueError: If the file is not valid feed JSON (e.g. still being written)
+    """
+    day_start = feed_day(path)
+    with open(path, encoding="utf-8") as f:
+        try:
+            flights = json.load(f)["flights"]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Not a feed file: {path}") from e
+    if not isinstance(flights, list):
+        raise ValueError(f"Not a feed file: {path}")
+
+    result = []
+    for flight in flights:
+        try:
+            if not isinstance(flight, dict):
+                raise ValueError(f"not an object: {flight!r}")
+            result.append(_parse_flight(flight, day_start))
+        except ValueError as e:
+            logger.warning("Skipping flight in %s: %s", Path(path).name, e)
+    return result
+
+
+def apply_changes(
+    db: Session,
+    flights: list[FeedFlight],
+    batch_id: str | None = None,
+) -> tuple[set[date], set[str]]:
+    """
+    Bring Flight/Assignment rows in line with changed feed flights
+    (joins the caller's transaction; the caller commits).
+
+    - Missing airlines and flights are created
+    - A flight without an assignment gets one on the feed's carousel
+      (if that carousel exists)
+    - Times always follow the feed; the carousel only for FEED assignments,
+      so manual and AI placements are kept
+    - Rows that already match are not touched
+
+    All writes are logged as one undoable FEED batch.
+
+    Returns:
+        (days whose assignments or flights changed,
+         IDs of flights not fully applied because their carousel is unknown;
+         apply them again once it exists)
+    """
+    if not flights:
+        return set(), set()
+    batch_id = batch_id or history_service.new_batch_id()
+    flight_ids = [flight.flight_id for flight in flights]
+
+    known_airlines = {
+        code for (code,) in db.query(Airline.airline_code).filter(
+            Airline.airline_code.in_({flight.airline for flight in flights})
+        )
+    }
+    existing_flights = {
+        row.flight_id: row
+        for row in db.query(Flight).filter(Flight.flight_id.in_(flight_ids))
+    }
+    carousel_ids = {carousel_id for (carousel_id,) in db.query(Carousel.carousel_id)}
+    assignments: dict[str, Assignment] = {}
+    for row in db.query(Assignment).filter(
+        Assignment.flight_id.in_(flight_ids)
+    ).order_by(Assignment.assignment_id):
+        assignments.setdefault(row.flight_id, row)
+    analytics_service.lock_usage(db, [
+        *(analytics_service.placement(row) for row in assignments.values()),
+        *(
+            (flight.carousel_id, flight.start_time, flight.end_time)
+            for flight in flights if flight.carousel_id in carousel_ids
+        ),
+    ])
+
+    changed_days: set[date] = set()
+    waiting: set[str] = set()
+    for feed in flights:
+        if feed.airline not in known_airlines:
+            db.add(Airline(airline_code=feed.airline, airline_name=feed.airline))
+            known_airlines.add(feed.airline)
+            change_service.publish(db, "airlines")
+
+        if feed.flight_id not in existing_flights:
+            db.add(Flight(
+                flight_id=feed.flight_id,
+                airline=feed.airline,
+                flight_number=feed.flight_number,
+                scheduled_time=feed.scheduled_time,
+            ))
+            change_service.publish(db, "flights", feed.scheduled_time.date())
+            changed_days.add(feed.scheduled_time.date())
+
+        assignment = assignments.get(feed.flight_id)
+        if assignment is None:
+            if feed.carousel_id not in carousel_ids:
+                waiting.add(feed.flight_id)
+                continue
+            assignment = Assignment(
+                flight_id=feed.flight_id,
+                carousel_id=feed.carousel_id,
+                start_time=feed.start_time,
+                end_time=feed.end_time,
+                assignment_type=ASSIGNMENT_TYPE,
+            )
+            db.add(assignment)
+            analytics_service.record_assignment(db, assignment)
+            db.flush()
+            history_service.record(db, batch_id, "FEED", None, history_service.to_state(assignment))
+            changed_days.add(feed.start_time.date())
+            continue
+
+        carousel_id = assignment.carousel_id
+        if assignment.assignment_type == ASSIGNMENT_TYPE:
+            if feed.carousel_id in carousel_ids:
+                carousel_id = feed.carousel_id
+            else:
+                waiting.add(feed.flight_id)  # Times now, the carousel once it exists
+        if (assignment.carousel_id, assignment.start_time, assignment.end_time) == (
+            carousel_id, feed.start_time, feed.end_time
+        ):
+            continue
+
+        before = history_service.to_state(assignment)
+        analytics_service.record_assignment(db, assignment, -1)
+        assignment.carousel_id = carousel_id
+        assignment.start_time = feed.start_time
+        assignment.end_time = feed.end_time
+        analytics_service.record_assignment(db, assignment)
+        db.flush()
+        history_service.record(db, batch_id, "FEED", before, history_service.to_state(assignment))
+        changed_days.update({datetime.fromisoformat(before["start_time"]).date(), feed.start_time.date()})
+
+    return changed_days, waiting
@@ -0,0 +1,485 @@
+"""
+History Service
+Event-sourced assignment history: audit log, undo/redo and point-in-time restore
+
+Every assignment mutation is appended to assignment_events with its
+before/after state. Every SNAPSHOT_INTERVAL events a day's full state and
+undo/redo stacks are stored in plan_snapshots, so the plan at any event,
+and the next undo or redo, is one snapshot read plus a replay of at most
+SNAPSHOT_INTERVAL events.
+"""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.models import Assignment, AssignmentEvent, PlanSnapshot
+from app.services import analytics_service, change_service
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+SNAPSHOT_INTERVAL = 50  # Events per day between snapshots
+
+STATE_FIELDS = (
+    "assignment_id",
+    "flight_id",
+    "carousel_id",
+    "start_time",
+    "end_time",
+    "assignment_type",
+    "version",
+)
+
+
+class HistoryConflictError(Exception):
+    """The live plan no longer matches the history being reverted."""
+
+
+# =============================================================================
+# State Helpers
+# =============================================================================
+
+def as_utc(at: datetime) -> datetime:
+    """Naive UTC, as stored in created_at (aware times are converted)."""
+    if at.tzinfo is None:
+        return at
+    return at.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def utc_now() -> datetime:
+    """Current time as naive UTC (comparable to created_at)."""
+    return as_utc(datetime.now(timezone.utc))
+
+
+def new_batch_id() -> str:
+    """Batch ID grouping the events of one user action or AI run."""
+    return uuid.uuid4().hex
+
+
+def batch_kind_for(assignment_type: str | None) -> str:
+    """Batch kind of a direct API write ("AI" for AI assignments, else "MANUAL")."""
+    return "AI" if assignment_type == "AI" else "MANUAL"
+
+
+def to_state(row, prefix: str = "") -> dict | None:
+    """
+    JSON-safe state of an assignment (ORM object or result row).
+    prefix selects labelled columns, e.g. "before_" for previous values.
+    """
+    if row is None:
+        return None
+    state = {name: getattr(row, prefix + name) for name in STATE_FIELDS}
+    state["start_time"] = state["start_time"].isoformat()
+    state["end_time"] = state["end_time"].isoformat()
+    return state
+
+
+def _day_of(state: dict) -> date:
+    return datetime.fromisoformat(state["start_time"]).date()
+
+
+def _same_placement(a: dict | None, b: dict | None) -> bool:
+    """Compare two states ignoring the version."""
+    if a is None or b is None:
+        return a is b
+    return all(a[name] == b[name] for name in STATE_FIELDS if name != "version")
+
+
+def _live_state(db: Session, day: date) -> dict[int, dict]:
+    """Current assignments of a day (assignments starting on that day)."""
+    day_start = datetime.combine(day, datetime.min.time())
+    rows = db.query(Assignment).filter(
+        Assignment.start_time >= day_start,
+        Assignment.start_time < day_start + timedelta(days=1),
+    ).all()
+    return {row.assignment_id: to_state(row) for row in rows}
+
+
+def _replay(state: dict[int, dict], day: date, events) -> dict[int, dict]:
+    """Apply events of a day to a state (in event_id order)."""
+    for event in events:
+        if event.after is not None and _day_of(event.after) == day:
+            state[event.assignment_id] = event.after
+        else:
+            state.pop(event.assignment_id, None)
+    return state
+
+
+# =============================================================================
+# Recording
+# =============================================================================
+
+# Days known to have a baseline snapshot (added only once it is committed)
+_baselined: set[date] = set()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    _baselined.update(session.info.pop("baselined_days", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("baselined_days", None)
+
+
+def _ensure_baseline(db: Session, day: date, before: dict | None, after: dict | None) -> None:
+    """
+    Store a day's state from before its first logged event.
+
+    Rows created before history existed would otherwise be invisible to
+    replay. Called after the mutation is flushed, so the pending event's
+    effect is reverted on the live state first.
+    """
+    if day in _baselined or day in db.info.get("baselined_days", ()):
+        return
+    exists = db.query(PlanSnapshot.snapshot_id).filter(
+        PlanSnapshot.plan_date == day
+    ).first()
+    if not exists:
+        state = _live_state(db, day)
+        if after is not None:
+            state.pop(after["assignment_id"], None)
+        if before is not None and _day_of(before) == day:
+            state[before["assignment_id"]] = before
+        last_event_id = db.query(func.max(AssignmentEvent.event_id)).scalar() or 0
+        db.add(PlanSnapshot(
+            plan_date=day,
+            last_event_id=last_event_id,
+            assignments=list(state.values()),
+            stacks={"undo": [], "redo": []},
+        ))
+    db.info.setdefault("baselined_days", set()).add(day)
+
+
+def _maybe_snapshot(db: Session, day: date) -> None:
+    """Store a new snapshot once SNAPSHOT_INTERVAL events followed the last one."""
+    latest = db.query(func.max(PlanSnapshot.last_event_id)).filter(
+        PlanSnapshot.plan_date == day
+    ).scalar() or 0
+    pending, last_event_id = db.query(
+        func.count(AssignmentEvent.event_id),
+        func.max(AssignmentEvent.event_id),
+    ).filter(
+        AssignmentEvent.plan_date == day,
+        AssignmentEvent.event_id > latest,
+    ).one()
+    if pending < SNAPSHOT_INTERVAL:
+        return
+
+    undo_stack, redo_stack = _stacks(db, day, last_event_id)
+    db.add(PlanSnapshot(
+        plan_date=day,
+        last_event_id=last_event_id,
+        assignments=list(state_at(db, day, last_event_id).values()),
+        stacks={"undo": undo_stack, "redo": redo_stack},
+    ))
+
+
+def record(
+    db: Session,
+    batch_id: str,
+    batch_kind: str,
+    before: dict | None,
+    after: dict | None,
+) -> None:
+    """
+    Append one mutation to the log (joins the caller's transaction).
+    The mutation itself must already be flushed. The touched days are
+    announced to every worker on commit (change_service).
+    """
+    if before is None and after is None:
+        return
+    event_type = "CREATE" if before is None else "DELETE" if after is None else "UPDATE"
+    assignment_id = (after or before)["assignment_id"]
+    days = sorted({_day_of(state) for state in (before, after) if state is not None})
+
+    db.flush()
+    for day in days:
+        _ensure_baseline(db, day, before, after)
+        db.add(AssignmentEvent(
+            plan_date=day,
+            assignment_id=assignment_id,
+            event_type=event_type,
+            batch_id=batch_id,
+            batch_kind=batch_kind,
+            before=before,
+            after=after,
+        ))
+    db.flush()
+
+    for day in days:
+        _maybe_snapshot(db, day)
+        change_service.publish(db, "assignments", day)
+
+
+# =============================================================================
+# Replay
+# =============================================================================
+
+def state_at(db: Session, day: date, event_id: int | None = None) -> dict[int, dict]:
+    """
+    A day's plan right after an event (default: the latest event).
+    Latest snapshot at or before the event + replay of the events after it.
+    Days without history return the live plan.
+    """
+    query = db.query(PlanSnapshot).filter(PlanSnapshot.plan_date == day)
+    if event_id is not None:
+        query = query.filter(PlanSnapshot.last_event_id <= event_id)
+    snapshot = query.order_by(PlanSnapshot.last_event_id.desc()).first()
+    if snapshot is None:
+        return _live_state(db, day)
+
+    events = db.query(AssignmentEvent).filter(
+        AssignmentEvent.plan_date == day,
+        AssignmentEvent.event_id > snapshot.last_event_id,
+    )
+    if event_id is not None:
+        events = events.filter(AssignmentEvent.event_id <= event_id)
+
+    state = {item["assignment_id"]: item for item in snapshot.assignments}
+    return _replay(state, day, events.order_by(AssignmentEvent.event_id))
+
+
+def state_as_of(db: Session, day: date, at: datetime) -> dict[int, dict]:
+    """A day's plan as of a point in time (naive = UTC, compared to event created_at)."""
+    at = as_utc(at)
+    event_id = db.query(func.max(AssignmentEvent.event_id)).filter(
+        AssignmentEvent.plan_date == day,
+        AssignmentEvent.created_at <= at,
+    ).scalar()
+    if event_id is not None:
+        return state_at(db, day, event_id)
+
+    # Before the first event of the day: the baseline snapshot
+    baseline = db.query(PlanSnapshot).filter(
+        PlanSnapshot.plan_date == day
+    ).order_by(PlanSnapshot.last_event_id).first()
+    if baseline is None:
+        return _live_state(db, day)
+    return {item["assignment_id"]: item for item in baseline.assignments}
+
+
+# =============================================================================
+# Applying States (undo / redo / restore)
+# =============================================================================
+
+def _apply(
+    db: Session,
+    targets: dict[int, dict | None],
+    expected: dict[int, dict | None] | None,
+    batch_kind: str,
+) -> str:
+    """
+    Bring live assignments to target states as one new batch.
+
+    Args:
+        targets: assignment_id -> target state (None = deleted)
+        expected: assignment_id -> state the live row must have
+            (None = must not exist); skipped when expected is None
+
+    Raises:
+        HistoryConflictError: If a live row does not match `expected`, or
+            changed concurrently while being written
+    """
+    try:
+        return _apply_targets(db, targets, expected, batch_kind)
+    except StaleDataError:
+        # The versioned UPDATE/DELETE matched no row: another transaction won
+        raise HistoryConflictError("The plan changed while history was being applied")
+
+
+def _apply_targets(
+    db: Session,
+    targets: dict[int, dict | None],
+    expected: dict[int, dict | None] | None,
+    batch_kind: str,
+) -> str:
+    batch_id = new_batch_id()
+    rows = {assignment_id: db.get(Assignment, assignment_id) for assignment_id in targets}
+    analytics_service.lock_usage(db, [
+        *(analytics_service.placement(row) for row in rows.values() if row is not None),
+        *(
+            (target["carousel_id"],
+             datetime.fromisoformat(target["start_time"]),
+             datetime.fromisoformat(target["end_time"]))
+            for target in targets.values() if target is not None
+        ),
+    ])
+    for assignment_id, target in targets.items():
+        row = rows[assignment_id]
+        before = to_state(row)
+        if expected is not None and not _same_placement(before, expected[assignment_id]):
+            raise HistoryConflictError(
+                f"Assignment {assignment_id} was changed after this history entry"
+            )
+
+        if row is not None:
+            analytics_service.record_assignment(db, row, -1)
+        if target is None:
+            if row is not None:
+                db.delete(row)
+        else:
+            values = {
+                "flight_id": target["flight_id"],
+                "carousel_id": target["carousel_id"],
+                "start_time": datetime.fromisoformat(target["start_time"]),
+                "end_time": datetime.fromisoformat(target["end_time"]),
+                "assignment_type": target["assignment_type"],
+            }
+            if row is None:
+                row = Assignment(assignment_id=assignment_id, **values)
+                db.add(row)
+            else:
+                for field, value in values.items():
+                    setattr(row, field, value)
+            analytics_service.record_assignment(db, row)
+
+        db.flush()
+        record(db, batch_id, batch_kind, before, to_state(row) if target else None)
+
+    return batch_id
+
+
+def _batches(db: Session, day: date, after_event_id: int, upto_event_id: int | None) -> list[tuple[str, str]]:
+    """(batch_id, batch_kind) with events of a day in (after, upto], in order."""
+    query = db.query(
+        AssignmentEvent.batch_id,
+        AssignmentEvent.batch_kind,
+        func.min(AssignmentEvent.event_id).label("first_event_id"),
+    ).filter(
+        AssignmentEvent.plan_date == day,
+        AssignmentEvent.event_id > after_event_id,
+    )
+    if upto_event_id is not None:
+        query = query.filter(AssignmentEvent.event_id <= upto_event_id)
+    return [
+        (batch_id, batch_kind)
+        for batch_id, batch_kind, _ in query.group_by(
+            AssignmentEvent.batch_id, AssignmentEvent.batch_kind
+        ).order_by("first_event_id")
+    ]
+
+
+def _stacks(db: Session, day: date, upto_event_id: int | None = None) -> tuple[list[str], list[str]]:
+    """
+    Undo and redo stacks of a day (as of an event; default: latest).
+    UNDO pops the undo stack and pushes onto redo; REDO does the opposite;
+    any new action clears the redo stack.
+
+    Starts from the stacks stored with the latest snapshot, so only the
+    batches after it (at most SNAPSHOT_INTERVAL events) are read.
+    """
+    query = db.query(PlanSnapshot).filter(
+        PlanSnapshot.plan_date == day,
+        PlanSnapshot.stacks.isnot(None),  # Snapshots from before stacks were stored
+    )
+    if upto_event_id is not None:
+        query = query.filter(PlanSnapshot.last_event_id <= upto_event_id)
+    snapshot = query.order_by(PlanSnapshot.last_event_id.desc()).first()
+
+    undo_stack, redo_stack, after_event_id = [], [], 0
+    if snapshot is not None:
+        undo_stack = list(snapshot.stacks["undo"])
+        redo_stack = list(snapshot.stacks["redo"])
+        after_event_id = snapshot.last_event_id
+    # A batch cut by the snapshot is already on a stack
+    known = set(undo_stack) | set(redo_stack)
+
+    for batch_id, batch_kind in _batches(db, day, after_event_id, upto_event_id):
+        if batch_id in known:
+            continue
+        if batch_kind == "UNDO":
+            if undo_stack:
+                undo_stack.pop()
+            redo_stack.append(batch_id)
+        elif batch_kind == "REDO":
+            if redo_stack:
+                redo_stack.pop()
+            undo_stack.append(batch_id)
+        else:
+            undo_stack.append(batch_id)
+            redo_stack.clear()
+    return undo_stack, redo_stack
+
+
+def _revert(db: Session, batch_id: str, batch_kind: str) -> tuple[str, int]:
+    """Revert all events of a batch (every day it touched)."""
+    events = db.query(AssignmentEvent).filter(
+        AssignmentEvent.batch_id == batch_id
+    ).order_by(AssignmentEvent.event_id).all()
+
+    targets: dict[int, dict | None] = {}
+    expected: dict[int, dict | None] = {}
+    for event in events:
+        targets.setdefault(event.assignment_id, event.before)
+        expected[event.assignment_id] = event.after
+
+    return _apply(db, targets, expected, batch_kind), len(targets)
+
+
+def undo(db: Session, day: date) -> tuple[str, str, int]:
+    """
+    Revert the latest action of a day.
+
+    Returns:
+        (reverted batch ID, new UNDO batch ID, number of changed assignments)
+
+    Raises:
+        ValueError: If there is nothing to undo
+        HistoryConflictError: If the rows were changed outside the log
+    """
+    undo_stack, _ = _stacks(db, day)
+    if not undo_stack:
+        raise ValueError("Nothing to undo")
+    return (undo_stack[-1], *_revert(db, undo_stack[-1], "UNDO"))
+
+
+def redo(db: Session, day: date) -> tuple[str, str, int]:
+    """
+    Re-apply the latest undone action of a day.
+
+    Returns:
+        (reverted UNDO batch ID, new REDO batch ID, number of changed assignments)
+
+    Raises:
+        ValueError: If there is nothing to redo
+        HistoryConflictError: If the rows were changed outside the log
+    """
+    _, redo_stack = _stacks(db, day)
+    if not redo_stack:
+        raise ValueError("Nothing to redo")
+    return (redo_stack[-1], *_revert(db, redo_stack[-1], "REDO"))
+
+
+def restore(db: Session, day: date, at: datetime) -> tuple[str | None, int]:
+    """
+    Restore a day's plan as of a point in time, as one undoable batch.
+
+    Returns:
+        (RESTORE batch ID or None if nothing changed, number of changed assignments)
+    """
+    target = state_as_of(db, day, at)
+    live = _live_state(db, day)
+
+    targets = {
+        assignment_id: target.get(assignment_id)
+        for assignment_id in live.keys() | target.keys()
+        if not _same_placement(live.get(assignment_id), target.get(assignment_id))
+    }
+    if not targets:
+        return None, 0
+    return _apply(db, targets, None, "RESTORE"), len(targets)
+
+
+def get_events(db: Session, day: date, limit: int = 200) -> list[AssignmentEvent]:
+    """Latest events of a day (audit log), newest first."""
+    return db.query(AssignmentEvent).filter(
+        AssignmentEvent.plan_date == day
+    ).order_by(AssignmentEvent.event_id.desc()).limit(limit).all()
@@ -0,0 +1,178 @@
+"""
+Pagination Service
+Keyset (cursor) pagination and field projection helpers for list endpoints
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+DEFAULT_PAGE_SIZE = 500   # Used when no date filter bounds the result
+MAX_PAGE_SIZE = 1000
+
+
+# =============================================================================
+# Cursor Encoding
+# =============================================================================
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    """
+    Encode the keyset position of the last row into an opaque cursor.
+
+    The cursor is URL-safe base64 of '["<iso time>", <id>]'.
+    """
+    raw = json.dumps([sort_value.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, Any]:
+    """
+    Decode a cursor created by encode_cursor().
+
+    Raises:
+        ValueError: "Invalid cursor" for anything encode_cursor() could not
+            have produced (the message never echoes the payload)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(payload, list) or len(payload) != 2:
+            raise ValueError("Cursor is not a [sort value, id] pair")
+        sort_value, row_id = payload
+        if not isinstance(sort_value, str):
+            raise ValueError("Cursor sort value is not a string")
+        # bool is an int subclass, but never a row id
+        if isinstance(row_id, bool) or not isinstance(row_id, (int, str)):
+            raise ValueError("Cursor id is not an int or a string")
+        return datetime.fromisoformat(sort_value), row_id
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        # JSONDecodeError and binascii.Error are ValueErrors too
+        raise ValueError("Invalid cursor") from e
+
+
+# =============================================================================
+# Keyset Pagination
+# =============================================================================
+
+def paginate(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: int | None,
+    cursor: str | None,
+) -> Query:
+    """
+    Order a query by (sort_column, id_column) and apply the keyset window.
+
+    Rows strictly after the cursor position are returned, so a page is a
+    plain index range scan no matter how deep the client has paged.
+    One extra row is fetched to detect whether a next page exists
+    (see split_page()).
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = query.order_by(sort_column, id_column)
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        # e.g. an int id against a VARCHAR key would fail in the database
+        if not isinstance(row_id, id_column.type.python_type):
+            raise ValueError("Invalid cursor")
+        query = query.filter(
+            or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > row_id),
+            )
+        )
+
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    return query
+
+
+def split_page(
+    rows: list,
+    limit: int | None,
+    sort_attr: str,
+    id_attr: str,
+) -> tuple[list, str | None]:
+    """
+    Trim the look-ahead row fetched by paginate().
+
+    Returns:
+        (rows of this page, cursor for the next page or None)
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+
+
+# =============================================================================
+# Field Projection
+# =============================================================================
+
+def parse_fields(fields: str | None, schema: type[BaseModel]) -> list[str] | None:
+    """
+    Parse a comma separated 'fields=' parameter.
+
+    Returns:
+        Requested field names in request order, or None when no projection
+        was asked for
+
+    Raises:
+        ValueError: If a field is not part of the response schema
+    """
+    if not fields:
+        return None
+
+    requested = list(dict.fromkeys(
+        name.strip() for name in fields.split(",") if name.strip()
+    ))
+    unknown = set(requested) - set(schema.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def project(rows: list, fields: list[str], schema: type[BaseModel]) -> list[dict]:
+    """
+    Serialize ORM rows with only the requested fields.
+
+    Attributes are read one by one so relationships that were not asked
+    for are never loaded. Nested objects are serialized with the schema's
+    own field type (e.g. AirlineResponse for airline_info).
+    """
+    nested = {}
+    for name in fields:
+        annotation = schema.model_fields[name].annotation
+        for candidate in getattr(annotation, "__args__", (annotation,)):
+            if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+                nested[name] = candidate
+
+    result = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            value = getattr(row, name)
+            if name in nested and value is not None:
+                value = nested[name].model_validate(value).model_dump()
+            item[name] = value
+        result.append(item)
+
+    return jsonable_encoder(result)
@@ -0,0 +1,636 @@
+"""
+Scenario Service
+In-memory copy-on-write what-if scenarios over a day's assignment plan
+
+A scenario never copies the day's plan. It keeps a reference to an
+immutable BasePlan (shared by every scenario of that day) and an overlay
+holding only the assignments it changed, so forking costs O(1) and a
+scenario's memory grows with its edits, not with the day's size.
+"""
+
+import math
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.models import Assignment, Carousel, Flight
+from app.services import (
+    ai_assignment_service,
+    analytics_service,
+    change_service,
+    constraint_service,
+    history_service,
+)
+from app.services.assignment_service import busy_minutes, find_conflicts, overlaps
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+MAX_SCENARIOS = 64
+SCENARIO_TTL = timedelta(hours=2)
+
+
+class StaleScenarioError(Exception):
+    """The live plan changed since the scenario was forked."""
+
+
+class PromoteConflictError(StaleScenarioError):
+    """The scenario's changes conflict with, or are not allowed in, the live plan."""
+
+
+# =============================================================================
+# Plan Records
+# =============================================================================
+
+@dataclass(frozen=True, slots=True)
+class PlanAssignment:
+    """Immutable copy of one assignment row"""
+    assignment_id: int
+    flight_id: str
+    carousel_id: str
+    start_time: datetime
+    end_time: datetime
+    assignment_type: str
+    version: int
+
+
+@dataclass(frozen=True)
+class BasePlan:
+    """
+    Read-only snapshot of a day's plan, shared between scenarios.
+
+    Attributes:
+        day: Day of the plan (assignments starting on this day)
+        signature: (row count, max updated_at, sum of IDs) at load time,
+            used to reuse the snapshot while the live plan is unchanged
+        assignments: assignment_id -> PlanAssignment
+        flights: flight_id -> (airline, scheduled_time)
+        terminals: carousel_id -> terminal
+    """
+    day: date
+    signature: tuple
+    assignments: dict[int, PlanAssignment]
+    flights: dict[str, tuple[str, datetime]]
+    terminals: dict[str, str | None]
+
+
+@dataclass
+class Scenario:
+    """
+    A what-if plan: BasePlan + overlay of changed assignments.
+
+    Attributes:
+        overlay: assignment_id -> changed PlanAssignment
+        closures: (carousel_id, start, end) ranges closed in this scenario
+        terminal_overrides: airline -> terminal its flights must use
+        lock: Held while the overlay is read or changed (one request at a time)
+    """
+    scenario_id: str
+    name: str | None
+    base: BasePlan
+    overlay: dict[int, PlanAssignment] = field(default_factory=dict)
+    closures: list[tuple[str, datetime, datetime]] = field(default_factory=list)
+    terminal_overrides: dict[str, str] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    last_access: datetime = field(default_factory=datetime.utcnow)
+    lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+
+    def get(self, assignment_id: int) -> PlanAssignment | None:
+        """Scenario view of one assignment."""
+        return self.overlay.get(assignment_id) or self.base.assignments.get(assignment_id)
+
+    def plan(self) -> list[PlanAssignment]:
+        """Full scenario plan (base with overlay applied)."""
+        return [
+            self.overlay.get(assignment_id, assignment)
+            for assignment_id, assignment in self.base.assignments.items()
+        ]
+
+    def is_closed(self, carousel_id: str, start: datetime, end: datetime) -> bool:
+        """Whether the carousel is closed in this scenario during [start, end)."""
+        return any(
+            closed_id == carousel_id and overlaps(start, end, closed_start, closed_end)
+            for closed_id, closed_start, closed_end in self.closures
+        )
+
+    def terminal_ok(self, flight_id: str, carousel_id: str) -> bool:
+        """Whether the carousel is in the terminal required by an override."""
+        airline = self.base.flights[flight_id][0]
+        terminal = self.terminal_overrides.get(airline)
+        return terminal is None or self.base.terminals.get(carousel_id) == terminal
+
+
+# =============================================================================
+# Base Plan Loading
+# =============================================================================
+
+_bases: dict[date, BasePlan] = {}
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def load_base(db: Session, day: date) -> BasePlan:
+    """
+    Snapshot a day's plan, reusing the cached snapshot if unchanged.
+
+    The freshness check is one aggregate query, so forking dozens of
+    scenarios per day only reads the assignment rows when they changed.
+    """
+    start, end = _day_bounds(day)
+    in_day = (Assignment.start_time >= start, Assignment.start_time < end)
+
+    signature = tuple(db.query(
+        func.count(Assignment.assignment_id),
+        func.max(Assignment.updated_at),
+        func.sum(Assignment.assignment_id),
+    ).filter(*in_day).one())
+
+    cached = _bases.get(day)
+    if cached is not None and cached.signature == signature:
+        return cached
+
+    rows = db.query(
+        Assignment.assignment_id,
+        Assignment.flight_id,
+        Assignment.carousel_id,
+        Assignment.start_time,
+        Assignment.end_time,
+        Assignment.assignment_type,
+        Assignment.version,
+    ).filter(*in_day).all()
+
+    flights = db.query(Flight.flight_id, Flight.airline, Flight.scheduled_time).filter(
+        Flight.flight_id.in_({row.flight_id for row in rows})
+    ).all()
+
+    base = BasePlan(
+        day=day,
+        signature=signature,
+        assignments={row.assignment_id: PlanAssignment(*row) for row in rows},
+        flights={row.flight_id: (row.airline, row.scheduled_time) for row in flights},
+        terminals=dict(db.query(Carousel.carousel_id, Carousel.terminal).all()),
+    )
+    _bases[day] = base
+    return base
+
+
+def _on_change(day: date | None, entity: str) -> None:
+    """Drop cached base snapshots changed in any worker (see change_service)."""
+    if day is None or entity == "carousels":
+        _bases.clear()
+    else:
+        _bases.pop(day, None)
+
+
+change_service.subscribe(_on_change, ("assignments", "flights", "carousels"))
+
+
+# =============================================================================
+# Scenario Store (TTL + LRU)
+# =============================================================================
+
+_scenarios: "OrderedDict[str, Scenario]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _evict(now: datetime) -> None:
+    """Drop expired scenarios, then the least recently used beyond the limit."""
+    for scenario_id in [
+        scenario_id for scenario_id, scenario in _scenarios.items()
+        if now - scenario.last_access > SCENARIO_TTL
+    ]:
+        del _scenarios[scenario_id]
+    while len(_scenarios) > MAX_SCENARIOS:
+        _scenarios.popitem(last=False)
+
+
+def fork(
+    db: Session,
+    day: date,
+    name: str | None = None,
+    from_scenario: str | None = None,
+) -> Scenario:
+    """
+    Create a scenario for a day, optionally copying another scenario's edits.
+
+    Raises:
+        KeyError: If from_scenario does not exist
+        ValueError: If from_scenario is for another day
+    """
+    if from_scenario:
+        parent = get_scenario(from_scenario)
+        if parent.base.day != day:
+            raise ValueError("from_scenario belongs to another day")
+        with parent.lock:
+            scenario = Scenario(
+                scenario_id=uuid.uuid4().hex[:12],
+                name=name,
+                base=parent.base,
+                overlay=dict(parent.overlay),
+                closures=list(parent.closures),
+                terminal_overrides=dict(parent.terminal_overrides),
+            )
+    else:
+        scenario = Scenario(
+            scenario_id=uuid.uuid4().hex[:12],
+            name=name,
+            base=load_base(db, day),
+        )
+
+    with _lock:
+        _scenarios[scenario.scenario_id] = scenario
+        _evict(scenario.created_at)
+    return scenario
+
+
+def get_scenario(scenario_id: str) -> Scenario:
+    """
+    Look up a scenario and mark it as recently used.
+
+    Raises:
+        KeyError: If the scenario does not exist or has expired
+    """
+    now = datetime.utcnow()
+    with _lock:
+        _evict(now)
+        scenario = _scenarios[scenario_id]
+        scenario.last_access = now
+        _scenarios.move_to_end(scenario_id)
+        return scenario
+
+
+def list_scenarios() -> list[Scenario]:
+    """All live scenarios, least recently used first."""
+    with _lock:
+        _evict(datetime.utcnow())
+        return list(_scenarios.values())
+
+
+def discard(scenario_id: str) -> None:
+    """Delete a scenario (no error if it is already gone)."""
+    with _lock:
+        _scenarios.pop(scenario_id, None)
+
+
+# =============================================================================
+# Edits
+# =============================================================================
+
+def _allowed(db: Session, scenario: Scenario, item: PlanAssignment, carousel_id: str) -> bool:
+    """Compiled constraints + scenario closures/overrides for one placement."""
+    scheduled_time = scenario.base.flights[item.flight_id][1]
+    table = constraint_service.get_table(db, scheduled_time.date())
+    return (
+        table.is_feasible(item.flight_id, carousel_id, item.start_time, item.end_time)
+        and not scenario.is_closed(carousel_id, item.start_time, item.end_time)
+        and scenario.terminal_ok(item.flight_id, carousel_id)
+    )
+
+
+def move(
+    db: Session,
+    scenario: Scenario,
+    assignment_id: int,
+    carousel_id: str | None = None,
+    start_time: datetime | None = None,
+    end_time: datetime | None = None,
+) -> PlanAssignment:
+    """
+    Move one assignment inside the scenario.
+
+    Raises:
+        KeyError: If the assignment is not part of the scenario's day
+        ValueError: If the new placement violates a constraint
+    """
+    with scenario.lock:
+        current = scenario.get(assignment_id)
+        if current is None:
+            raise KeyError(assignment_id)
+
+        moved = replace(
+            current,
+            carousel_id=carousel_id or current.carousel_id,
+            start_time=start_time or current.start_time,
+            end_time=end_time or current.end_time,
+        )
+        if moved.end_time <= moved.start_time:
+            raise ValueError("end_time must be after start_time")
+        if not _allowed(db, scenario, moved, moved.carousel_id):
+            raise ValueError(f"Carousel {moved.carousel_id} is not allowed for this flight/time")
+
+        _set(scenario, moved)
+        return moved
+
+
+def _set(scenario: Scenario, item: PlanAssignment) -> None:
+    """Write an assignment to the overlay (dropping it if equal to base)."""
+    if scenario.base.assignments.get(item.assignment_id) == item:
+        scenario.overlay.pop(item.assignment_id, None)
+    else:
+        scenario.overlay[item.assignment_id] = item
+
+
+def close_carousel(
+    db: Session,
+    scenario: Scenario,
+    carousel_id: str,
+    start: datetime,
+    end: datetime | None = None,
+    reassign: bool = True,
+) -> dict:
+    """
+    Close a carousel from `start` (until `end` or the end of the window).
+    Displaced assignments are re-placed by the solver when reassign=True.
+    """
+    if end is None:
+        end = _day_bounds(scenario.base.day)[1] + timedelta(days=1)
+    with scenario.lock:
+        scenario.closures.append((carousel_id, start, end))
+        if not reassign:
+            return {"moved": [], "unplaced": []}
+        # Only what this closure displaces; older conflicts stay as they are
+        displaced = {
+            item.assignment_id for item in scenario.plan()
+            if item.carousel_id == carousel_id
+            and overlaps(item.start_time, item.end_time, start, end)
+        }
+        return _solve(db, scenario, displaced)
+
+
+def set_airline_terminal(
+    db: Session,
+    scenario: Scenario,
+    airline: str,
+    terminal: str,
+    reassign: bool = True,
+) -> dict:
+    """
+    Require an airline's flights to use one terminal.
+    Flights outside it are re-placed by the solver when reassign=True.
+    """
+    with scenario.lock:
+        scenario.terminal_overrides[airline] = terminal
+        if not reassign:
+            return {"moved": [], "unplaced": []}
+        displaced = {
+            item.assignment_id for item in scenario.plan()
+            if scenario.base.flights[item.flight_id][0] == airline
+            and not scenario.terminal_ok(item.flight_id, item.carousel_id)
+        }
+        return _solve(db, scenario, displaced)
+
+
+def problems(db: Session, scenario: Scenario) -> set[int]:
+    """
+    Assignments that need re-placing: conflicts (the later of each pair),
+    closed carousels, terminal overrides and constraint violations.
+    """
+    plan = scenario.plan()
+    result = {later.assignment_id for _, later in find_conflicts(plan)}
+    for item in plan:
+        if not _allowed(db, scenario, item, item.carousel_id):
+            result.add(item.assignment_id)
+    return result
+
+
+def solve(db: Session, scenario: Scenario, assignment_ids: set[int] | None = None) -> dict:
+    """
+    Re-place assignments with the greedy solver, keeping the rest fixed.
+
+    Args:
+        assignment_ids: Assignments to re-place (default: all problems())
+
+    Returns:
+        {"moved": [assignment IDs], "unplaced": [assignment IDs]}
+        Unplaced assignments keep their current position.
+    """
+    with scenario.lock:
+        return _solve(db, scenario, assignment_ids)
+
+
+def _solve(db: Session, scenario: Scenario, assignment_ids: set[int] | None) -> dict:
+    if assignment_ids is None:
+        assignment_ids = problems(db, scenario)
+
+    plan = scenario.plan()
+    items = [item for item in plan if item.assignment_id in assignment_ids]
+    fixed = [item for item in plan if item.assignment_id not in assignment_ids]
+    carousel_ids = sorted(scenario.base.terminals)
+
+    placed = ai_assignment_service.assign_all(
+        items,
+        ai_assignment_service.Occupancy(fixed),
+        lambda item: [
+            carousel_id for carousel_id in carousel_ids
+            if _allowed(db, scenario, item, carousel_id)
+        ],
+    )
+
+    moved, unplaced = [], []
+    for item, carousel_id in placed.items():
+        if carousel_id is None:
+            unplaced.append(item.assignment_id)
+        elif carousel_id != item.carousel_id:
+            _set(scenario, replace(item, carousel_id=carousel_id))
+            moved.append(item.assignment_id)
+
+    return {"moved": sorted(moved), "unplaced": sorted(unplaced)}
+
+
+# =============================================================================
+# Diff
+# =============================================================================
+
+def _balance(minutes: dict[str, int], carousel_ids: list[str]) -> float:
+    """Standard deviation of busy minutes across carousels (lower = more even)."""
+    values = [minutes.get(carousel_id, 0) for carousel_id in carousel_ids]
+    if not values:
+        return 0.0
+    mean = sum(values) / len(values)
+    return round(math.sqrt(sum((value - mean) ** 2 for value in values) / len(values)), 2)
+
+
+def diff(scenario: Scenario) -> dict:
+    """Changed assignments, conflicts and utilization of scenario vs base."""
+    base_plan = list(scenario.base.assignments.values())
+    with scenario.lock:
+        plan = scenario.plan()
+        overlay = sorted(scenario.overlay.items())
+    carousel_ids = sorted(scenario.base.terminals)
+
+    base_minutes = busy_minutes(base_plan)
+    scenario_minutes = busy_minutes(plan)
+
+    return {
+        "scenario_id": scenario.scenario_id,
+        "date": scenario.base.day,
+        "changes": [
+            {
+                "assignment_id": assignment_id,
+                "flight_id": item.flight_id,
+                "base": scenario.base.assignments[assignment_id],
+                "scenario": item,
+            }
+            for assignment_id, item in overlay
+        ],
+        "base_conflicts": len(find_conflicts(base_plan)),
+        "scenario_conflicts": [
+            {"assignment_id": earlier.assignment_id, "conflicts_with": later.assignment_id}
+            for earlier, later in find_conflicts(plan)
+        ],
+        "utilization": [
+            {
+                "carousel_id": carousel_id,
+                "base_minutes": base_minutes.get(carousel_id, 0),
+                "scenario_minutes": scenario_minutes.get(carousel_id, 0),
+            }
+            for carousel_id in carousel_ids
+            if base_minutes.get(carousel_id) or scenario_minutes.get(carousel_id)
+        ],
+        "base_balance": _balance(base_minutes, carousel_ids),
+        "scenario_balance": _balance(scenario_minutes, carousel_ids),
+    }
+
+
+# =============================================================================
+# Promote
+# =============================================================================
+
+def _check_live(db: Session, items: list[PlanAssignment]) -> None:
+    """
+    Check the placements about to be written against the live plan:
+    overlaps with assignments outside them and the current constraints.
+    Call with the carousels' usage rows locked (every writer locks them),
+    so the result holds until commit.
+
+    Raises:
+        PromoteConflictError: On the first problem found
+    """
+    moving = {item.assignment_id for item in items}
+    live = db.query(
+        Assignment.assignment_id,
+        Assignment.flight_id,
+        Assignment.carousel_id,
+        Assignment.start_time,
+        Assignment.end_time,
+        Assignment.assignment_type,
+        Assignment.version,
+    ).filter(
+        Assignment.assignment_id.notin_(moving),
+        or_(*(
+            and_(
+                Assignment.carousel_id == item.carousel_id,
+                Assignment.start_time < item.end_time,
+                Assignment.end_time > item.start_time,
+            )
+            for item in items
+        )),
+    ).all()
+
+    for earlier, later in find_conflicts([*items, *(PlanAssignment(*row) for row in live)]):
+        if earlier.assignment_id in moving or later.assignment_id in moving:
+            raise PromoteConflictError(
+                f"Assignment {earlier.assignment_id} would overlap assignment "
+                f"{later.assignment_id} on {earlier.carousel_id}"
+            )
+
+    flights = {
+        flight.flight_id: flight
+        for flight in db.query(Flight).filter(Flight.flight_id.in_({item.flight_id for item in items}))
+    }
+    carousels = {
+        carousel.carousel_id: carousel
+        for carousel in db.query(Carousel).filter(
+            Carousel.carousel_id.in_({item.carousel_id for item in items})
+        )
+    }
+    for item in items:
+        carousel = carousels.get(item.carousel_id)
+        if carousel is None:
+            raise PromoteConflictError(f"Carousel {item.carousel_id} no longer exists")
+        violations = constraint_service.check_assignment(
+            db, flights[item.flight_id], carousel, item.start_time, item.end_time
+        )
+        if violations:
+            raise PromoteConflictError(
+                f"Assignment {item.assignment_id} on {item.carousel_id} violates: "
+                + ", ".join(violations)
+            )
+
+
+def promote(db: Session, scenario: Scenario) -> int:
+    """
+    Write the scenario's changes to the database in one transaction.
+
+    Every changed row must still have the version seen by the base
+    snapshot, and the new placements must not overlap live assignments
+    or break a current constraint; otherwise the transaction is rolled
+    back and StaleScenarioError (PromoteConflictError) is raised. The
+    changes are logged as one undoable SCENARIO batch.
+
+    Returns:
+        Number of assignments updated
+    """
+    with scenario.lock:
+        if not scenario.overlay:
+            discard(scenario.scenario_id)
+            return 0
+        items = list(scenario.overlay.values())
+
+        rows = {
+            row.assignment_id: row
+            for row in db.query(Assignment).filter(
+                Assignment.assignment_id.in_(scenario.overlay)
+            ).with_for_update()
+        }
+
+        batch_id = history_service.new_batch_id()
+        try:
+            analytics_service.lock_usage(db, [
+                *(analytics_service.placement(row) for row in rows.values()),
+                *(analytics_service.placement(item) for item in items),
+            ])
+            for item in items:
+                row = rows.get(item.assignment_id)
+                base = scenario.base.assignments[item.assignment_id]
+                if row is None or row.version != base.version:
+                    raise StaleScenarioError(
+                        f"Assignment {item.assignment_id} changed since the scenario was created"
+                    )
+            _check_live(db, items)
+
+            for item in items:
+                row = rows[item.assignment_id]
+                before = history_service.to_state(row)
+                analytics_service.record_assignment(db, row, -1)
+                row.carousel_id = item.carousel_id
+                row.start_time = item.start_time
+                row.end_time = item.end_time
+                analytics_service.record_assignment(db, row)
+                db.flush()
+                history_service.record(
+                    db, batch_id, "SCENARIO", before, history_service.to_state(row)
+                )
+
+            db.commit()
+        except StaleDataError:
+            # A row changed between the version check and the versioned UPDATE
+            db.rollback()
+            raise StaleScenarioError("The plan changed while the scenario was being promoted")
+        except Exception:
+            db.rollback()
+            raise
+
+        discard(scenario.scenario_id)
+        return len(items)
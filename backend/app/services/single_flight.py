@@ -0,0 +1,91 @@
+"""
+Single-Flight Service
+Coalesces identical concurrent computations into one (e.g., a day's plan
+loaded by 40 clients at shift start)
+
+The first caller for a key runs the computation; callers arriving while it
+is in progress wait for it and get the same result (or the same error).
+Nothing is kept afterwards, so this is not a cache: a request that starts
+after the computation finished runs its own. After a write, invalidate()
+detaches in-progress computations of the affected keys, so later callers
+run a fresh one instead of receiving a pre-write result.
+"""
+
+import threading
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-progress computation"""
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+_lock = threading.Lock()
+_calls: dict[Hashable, _Call] = {}
+_stats = {"calls": 0, "coalesced": 0, "invalidated": 0}
+
+
+def run(key: Hashable, compute: Callable[[], T]) -> T:
+    """
+    Run compute() once per key at a time.
+
+    Args:
+        key: Identifies identical work, e.g. ("assignments", date)
+        compute: Called by the first caller only; its result is shared,
+            so it should be immutable (e.g. serialized bytes)
+    """
+    with _lock:
+        _stats["calls"] += 1
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+        else:
+            call.waiters += 1
+            _stats["coalesced"] += 1
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = compute()
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            if _calls.get(key) is call:
+                del _calls[key]
+        call.done.set()
+    return call.result
+
+
+def invalidate(match: Callable[[Hashable], bool] | None = None) -> None:
+    """
+    Detach in-progress computations whose key matches (None = all).
+
+    Callers already waiting still get that result (their request overlapped
+    the write); callers arriving afterwards start a new computation.
+    """
+    with _lock:
+        for key, call in list(_calls.items()):
+            if match is None or match(key):
+                del _calls[key]
+                _stats["invalidated"] += 1
+
+
+def stats() -> dict:
+    """Calls so far, how many were served by another caller's computation, and keys in flight."""
+    with _lock:
+        return {**_stats, "in_flight": len(_calls)}
@@ -0,0 +1,4 @@
+"""
+Tools Package
+Offline command-line tools (run with python -m app.tools.<name>)
+"""
@@ -0,0 +1,185 @@
+"""
+Compression Benchmark Tool
+Bytes on the wire and server CPU per request for full-day loads of the
+sample-data days, per content coding
+
+Every sample-data day is seeded through the API (in-process, no sockets),
+then each endpoint is requested --requests times per coding:
+    - cold:   day snapshot dropped before every request
+              (query + serialization + compression each time)
+    - cached: snapshot kept (compressed body served from memory)
+
+The projected assignments view is not snapshotted; it shows the
+middleware's on-the-fly compression.
+
+Usage (from backend/):
+    python -m app.tools.compression_bench --requests 100 --json
+    python -m app.tools.compression_bench --database-url sqlite:////tmp/bench.db
+
+Without --database-url the days are seeded into a throwaway SQLite file,
+never into the configured DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_FEED_DIR = Path(__file__).resolve().parents[3] / "sample_data"
+
+ENDPOINTS = {
+    "assignments": "/api/assignments/?date={day}",
+    "flights": "/api/flights/?date={day}",
+    "assignments (projected)":
+        "/api/assignments/?date={day}&fields=assignment_id,flight_id,carousel_id,start_time,end_time",
+}
+
+
+def _wire_bytes(headers: dict, body: bytes) -> int:
+    """Approximate HTTP/1.1 response size: status line, headers and body."""
+    return len("HTTP/1.1 200 OK\r\n") + sum(
+        len(name) + len(value) + 4 for name, value in headers.items()
+    ) + 2 + len(body)
+
+
+def _decode(headers: dict, body: bytes) -> bytes:
+    encoding = headers.get("content-encoding")
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        from app.services.compression import brotli
+        return brotli.decompress(body)
+    return body
+
+
+async def _measure(client, path: str, accept: str | None, requests: int, cold: bool) -> dict:
+    """Mean CPU and wall time per request, plus the response size."""
+    from app.services import day_cache
+
+    headers = {"Accept-Encoding": accept} if accept else {}
+    cpu = wall = 0.0
+    for _ in range(requests):
+        if cold:
+            day_cache.invalidate()
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        status, response_headers, body = await client.request("GET", path, headers=headers)
+        cpu += time.process_time() - cpu_start
+        wall += time.perf_counter() - wall_start
+        if status != 200:
+            raise SystemExit(f"GET {path} returned {status}")
+    return {
+        "cpu_ms": cpu / requests * 1000,
+        "wall_ms": wall / requests * 1000,
+        "encoding": response_headers.get("content-encoding", "identity"),
+        "wire_bytes": _wire_bytes(response_headers, body),
+        "body": _decode(response_headers, body),
+    }
+
+
+async def run(args) -> dict:
+    """Seed the sample days and measure every endpoint x coding x cache state."""
+    # DATABASE_URL was set by scratch_database()
+    from app import migrations
+    from app.database import engine
+    from app.main import app
+    from app.services.compression import ENCODINGS
+    from app.services.feed_service import FEED_PATTERN
+    from app.tools.loadtest import AsgiClient, lifespan, seed
+
+    engine.echo = False
+    migrations.upgrade(engine)
+    feeds = sorted(Path(args.feed_dir).glob(FEED_PATTERN))
+    if not feeds:
+        raise SystemExit(f"No {FEED_PATTERN} files in {args.feed_dir}")
+    codings = [None, *reversed(ENCODINGS)]  # identity, gzip, br
+
+    rows = []
+    async with lifespan(app):
+        client = AsgiClient(app)
+        days = [(await seed(client, feed))[0] for feed in feeds]
+
+        for endpoint, template in ENDPOINTS.items():
+            for day in days:
+                path = template.format(day=day)
+                plain = None
+                for accept in codings:
+                    cold = await _measure(client, path, accept, args.requests, cold=True)
+                    cached = await _measure(client, path, accept, args.requests, cold=False)
+                    if plain is None:
+                        plain = cold
+                    elif cold["body"] != plain["body"] or cached["body"] != plain["body"]:
+                        raise SystemExit(f"{accept} body of {path} does not decode to the JSON body")
+                    rows.append({
+                        "endpoint": endpoint,
+                        "date": day,
+                        "encoding": cached["encoding"],
+                        "wire_bytes": cached["wire_bytes"],
+                        "ratio": round(plain["wire_bytes"] / cached["wire_bytes"], 2),
+                        "cold_cpu_ms": round(cold["cpu_ms"], 3),
+                        "cached_cpu_ms": round(cached["cpu_ms"], 3),
+                        "cached_wall_ms": round(cached["wall_ms"], 3),
+                    })
+
+    return {"requests": args.requests, "days": days, "encodings": list(ENCODINGS), "results": rows}
+
+
+def _summarize(rows: list[dict]) -> list[dict]:
+    """Mean over days per (endpoint, encoding)."""
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for row in rows:
+        groups.setdefault((row["endpoint"], row["encoding"]), []).append(row)
+    summary = []
+    for (endpoint, encoding), items in groups.items():
+        summary.append({
+            "endpoint": endpoint,
+            "encoding": encoding,
+            **{
+                key: sum(item[key] for item in items) / len(items)
+                for key in ("wire_bytes", "ratio", "cold_cpu_ms", "cached_cpu_ms")
+            },
+        })
+    return summary
+
+
+def _print_report(report: dict) -> None:
+    print(f"{len(report['days'])} days ({', '.join(report['days'])}), "
+          f"{report['requests']} requests per cell, mean per request over days")
+    print(f"{'endpoint':<25}{'coding':<10}{'wire bytes':>12}{'ratio':>8}"
+          f"{'cold cpu ms':>14}{'cached cpu ms':>15}")
+    for row in _summarize(report["results"]):
+        print(f"{row['endpoint']:<25}{row['encoding']:<10}{row['wire_bytes']:>12,.0f}"
+              f"{row['ratio']:>8.2f}{row['cold_cpu_ms']:>14.2f}{row['cached_cpu_ms']:>15.2f}")
+    if "br" not in report["encodings"]:
+        print("(brotli not installed: pip install brotli)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.compression_bench",
+        description="Measure wire bytes and CPU per full-day request per content coding",
+    )
+    parser.add_argument("--feed-dir", type=Path, default=DEFAULT_FEED_DIR)
+    parser.add_argument(
+        "--database-url",
+        help="Database to seed (default: a throwaway SQLite file, e.g. sqlite:////tmp/bench.db)",
+    )
+    parser.add_argument("--requests", type=int, default=30, help="Requests per measurement")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    from app.tools.loadtest import scratch_database
+
+    with scratch_database(args.database_url):
+        report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
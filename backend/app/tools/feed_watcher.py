@@ -0,0 +1,201 @@
+"""
+Feed Watcher Tool
+Tails a drop directory of sys_input_dict_YYMMDD.json snapshots and applies
+only the flights whose timeline changed, in micro-batches
+
+Every --poll seconds new or rewritten files are parsed and each flight's
+timeline hash is compared with the last one applied. Changed flights are
+queued (a newer revision replaces a queued one) and written in a single
+transaction every --interval seconds. Affected dates are announced
+through change_service, so every worker drops its caches for them.
+
+Flights that need a carousel that does not exist yet stay queued and are
+retried with every batch. A batch that fails MAX_ATTEMPTS times in a row
+is applied flight by flight; flights that still fail are quarantined
+(logged and skipped until their timeline changes), so one bad flight
+cannot hold back the rest of the feed.
+
+Usage (from backend/):
+    python -m app.tools.feed_watcher /data/feed --interval 5
+    python -m app.tools.feed_watcher ../sample_data --once
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+from app.database import SessionLocal
+from app.services import feed_service
+from app.services.feed_service import FeedFlight
+
+logger = logging.getLogger("feed_watcher")
+
+MAX_ATTEMPTS = 3  # Failed flushes of a batch before it is split up
+
+
+class FeedWatcher:
+    """Directory scan state, applied hashes and the pending micro-batch"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.file_stamps: dict[Path, tuple[float, int]] = {}
+        self.applied: dict[str, str] = {}  # flight_id -> timeline hash
+        self.pending: dict[str, FeedFlight] = {}
+        self.quarantined: dict[str, str] = {}  # flight_id -> timeline hash that failed
+        self.failures = 0  # Failed flushes in a row
+
+    def scan(self) -> int:
+        """Queue changed flights from new or modified files. Returns files read."""
+        read = 0
+        for path in sorted(self.directory.glob(feed_service.FEED_PATTERN)):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            stamp = (stat.st_mtime, stat.st_size)
+            if self.file_stamps.get(path) == stamp:
+                continue
+            try:
+                flights = feed_service.parse_feed(path)
+            except ValueError as e:
+                # Typically a file still being written; retried on the next scan
+                logger.warning("Skipping %s: %s", path.name, e)
+                continue
+            self.file_stamps[path] = stamp
+            read += 1
+
+            for flight in flights:
+                if flight.timeline_hash in (
+                    self.applied.get(flight.flight_id),
+                    self.quarantined.get(flight.flight_id),
+                ):
+                    continue
+                self.quarantined.pop(flight.flight_id, None)
+                self.pending[flight.flight_id] = flight
+        return read
+
+    def flush(self) -> set:
+        """
+        Apply the pending batch in one transaction. Returns affected dates.
+
+        Raises:
+            Exception: The batch failed and stays queued (fewer than
+                MAX_ATTEMPTS failures in a row)
+        """
+        if not self.pending:
+            return set()
+        batch = list(self.pending.values())
+        try:
+            days, waiting = self._apply(batch)
+        except Exception:
+            self.failures += 1
+            if self.failures < MAX_ATTEMPTS:
+                raise
+            logger.exception(
+                "Applying %d flights failed %d times; applying them one by one",
+                len(batch), self.failures,
+            )
+            days, waiting = self._apply_each(batch)
+        self.failures = 0
+
+        applied = 0
+        for flight in batch:
+            if self.pending.get(flight.flight_id) is not flight:
+                continue  # Quarantined
+            if flight.flight_id in waiting:
+                continue  # Stays queued until its carousel exists
+            self.applied[flight.flight_id] = flight.timeline_hash
+            del self.pending[flight.flight_id]
+            applied += 1
+        if applied:
+            logger.info(
+                "Applied %d changed flights (%d waiting for a carousel); dates: %s",
+                applied, len(waiting),
+                ", ".join(sorted(day.isoformat() for day in days)) or "none",
+            )
+        return days
+
+    def _apply(self, batch: list[FeedFlight]) -> tuple[set, set[str]]:
+        """apply_changes() in its own transaction."""
+        db = SessionLocal()
+        try:
+            result = feed_service.apply_changes(db, batch)
+            db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _apply_each(self, batch: list[FeedFlight]) -> tuple[set, set[str]]:
+        """Apply flights one transaction each; quarantine the ones that fail."""
+        days, waiting = set(), set()
+        for flight in batch:
+            try:
+                flight_days, flight_waiting = self._apply([flight])
+            except Exception:
+                logger.exception(
+                    "Quarantined %s (timeline %s) until its timeline changes",
+                    flight.flight_id, flight.timeline_hash[:12],
+                )
+                self.quarantined[flight.flight_id] = flight.timeline_hash
+                del self.pending[flight.flight_id]
+                continue
+            days |= flight_days
+            waiting |= flight_waiting
+        return days, waiting
+
+    def run(self, interval: float, poll: float) -> None:
+        """Scan every `poll` seconds, flush every `interval` seconds, until interrupted."""
+        next_flush = time.monotonic() + interval
+        while True:
+            try:
+                self.scan()
+            except Exception:
+                # e.g. the drop directory is briefly unavailable; retried next poll
+                logger.exception("Scanning %s failed", self.directory)
+            if time.monotonic() >= next_flush:
+                try:
+                    self.flush()
+                except Exception:
+                    # Keep the batch queued and retry at the next interval
+                    logger.exception(
+                        "Applying %d flights failed (attempt %d of %d)",
+                        len(self.pending), self.failures, MAX_ATTEMPTS,
+                    )
+                next_flush = time.monotonic() + interval
+            time.sleep(poll)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.feed_watcher",
+        description="Apply changed flights from a feed drop directory",
+    )
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds per micro-batch")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between directory scans")
+    parser.add_argument("--once", action="store_true", help="Scan and apply once, then exit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if not args.directory.is_dir():
+        parser.error(f"not a directory: {args.directory}")
+
+    watcher = FeedWatcher(args.directory)
+    if args.once:
+        watcher.scan()
+        watcher.flush()
+        return 0
+    try:
+        watcher.run(args.interval, args.poll)
+    except KeyboardInterrupt:
+        watcher.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,547 @@
+"""
+Load Test Tool
+Concurrent Gantt-client load against the API, in-process or over HTTP
+
+Simulates operators at shift change: virtual clients loop over a weighted
+mix of day loads, bar edits and auto-assign runs on one sample-data day.
+
+    get_assignments  GET /api/assignments/?date=D
+    get_flights      GET /api/flights/?date=D
+    put              PUT /api/assignments/{id} (shift a bar by a few minutes)
+    post             POST /api/assignments/ + DELETE of the created row
+    auto             fork a scenario, POST /solve, discard it (auto-assign)
+
+In-process mode drives app.main:app through ASGI directly and samples the
+database.py engine's connection pool; HTTP mode talks to a running uvicorn
+(pool statistics then live in the server process and are not reported).
+
+In-process mode migrates and seeds its database, so it never uses the
+configured DATABASE_URL: without --database-url it runs on a throwaway
+SQLite file that is deleted afterwards.
+
+Usage (from backend/):
+    python -m app.tools.loadtest
+    python -m app.tools.loadtest --database-url postgresql://localhost/betashift_load
+    python -m app.tools.loadtest --url http://127.0.0.1:8000 --clients 50 --duration 30
+    python -m app.tools.loadtest --mix get_assignments=60,get_flights=30,put=10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+DEFAULT_FEED = Path(__file__).resolve().parents[3] / "sample_data" / "sys_input_dict_251116.json"
+DEFAULT_MIX = {"get_assignments": 45, "get_flights": 35, "put": 12, "post": 5, "auto": 3}
+POOL_SAMPLE_INTERVAL = 0.01  # Seconds
+
+
+# =============================================================================
+# Clients
+# =============================================================================
+
+class AsgiClient:
+    """Calls an ASGI app directly (no sockets)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, body=None, headers=None):
+        """Returns (status, headers dict, body bytes)."""
+        path, _, query = path.partition("?")
+        payload = b"" if body is None else json.dumps(body).encode()
+        raw_headers = [(b"host", b"loadtest"), (b"content-length", str(len(payload)).encode())]
+        if body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+        for name, value in (headers or {}).items():
+            raw_headers.append((name.lower().encode(), value.encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        sent = False
+        response = {"status": 0, "headers": {}, "body": []}
+        finished = asyncio.Event()
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = {
+                    name.decode().lower(): value.decode()
+                    for name, value in message.get("headers", [])
+                }
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+                if not message.get("more_body"):
+                    finished.set()
+
+        await self.app(scope, receive, send)
+        return response["status"], response["headers"], b"".join(response["body"])
+
+    async def close(self):
+        pass
+
+
+class HttpClient:
+    """Minimal HTTP/1.1 keep-alive client on asyncio streams (one per virtual client)."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, body=None, headers=None):
+        """Returns (status, headers dict, body bytes)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        payload = b"" if body is None else json.dumps(body).encode()
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Content-Length: {len(payload)}",
+        ]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while size := int((await self.reader.readline()).strip(), 16):
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            await self.reader.readline()
+            content = b"".join(chunks)
+        else:
+            content = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            await self.close()
+        return status, response_headers, content
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Run the app's startup/shutdown (what uvicorn does around serving)."""
+    queue: asyncio.Queue = asyncio.Queue()
+    started, stopped = asyncio.Event(), asyncio.Event()
+    failure: list[str] = []
+
+    async def send(message):
+        if message["type"].startswith("lifespan.startup"):
+            if message["type"] == "lifespan.startup.failed":
+                failure.append(message.get("message", ""))
+            started.set()
+        elif message["type"].startswith("lifespan.shutdown"):
+            stopped.set()
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, queue.get, send))
+    await queue.put({"type": "lifespan.startup"})
+    await started.wait()
+    if failure:
+        await asyncio.gather(task, return_exceptions=True)
+        raise RuntimeError(f"Application startup failed: {failure[0]}")
+    try:
+        yield
+    finally:
+        await queue.put({"type": "lifespan.shutdown"})
+        await stopped.wait()
+        await task
+
+
+# =============================================================================
+# Seeding
+# =============================================================================
+
+async def seed(client, feed: Path) -> tuple[str, list[dict]]:
+    """
+    Load one sample-data day (airlines, carousels, flights and the feed's
+    final carousel per flight) through the API. Existing rows are kept.
+
+    Returns:
+        (date YYYY-MM-DD, assignments of that day)
+    """
+    from app.services.feed_service import feed_day
+
+    day_start = feed_day(feed)
+    day = day_start.date().isoformat()
+    with open(feed, encoding="utf-8") as f:
+        flights = json.load(f)["flights"]
+
+    await client.request("POST", "/api/airlines/init")
+    await client.request("POST", "/api/carousels/init")
+    for code in sorted({flight["flightNumber"][:2] for flight in flights}):
+        await client.request("POST", "/api/airlines/", {"airline_code": code, "airline_name": code})
+
+    flight_rows, assignment_rows = [], []
+    for flight in flights:
+        final = flight["timeline"][-1]
+        flight_id = f"{flight['flightNumber']}_{day_start:%Y%m%d}"
+        start = day_start + timedelta(minutes=final["firstBag"])
+        flight_rows.append({
+            "flight_id": flight_id,
+            "airline": flight["flightNumber"][:2],
+            "flight_number": flight["flightNumber"][2:],
+            "scheduled_time": start.isoformat(),
+        })
+        assignment_rows.append({
+            "flight_id": flight_id,
+            "carousel_id": f"C{final['carousel']}",
+            "start_time": start.isoformat(),
+            "end_time": (day_start + timedelta(minutes=final["LastBag"])).isoformat(),
+            "assignment_type": "MANUAL",
+        })
+    await client.request("POST", "/api/flights/upload", flight_rows)
+
+    status, _, content = await client.request("GET", f"/api/assignments/?date={day}")
+    existing = {item["flight_id"] for item in json.loads(content)} if status == 200 else set()
+    for row in assignment_rows:
+        if row["flight_id"] not in existing:
+            await client.request("POST", "/api/assignments/", row)
+
+    status, _, content = await client.request("GET", f"/api/assignments/?date={day}")
+    return day, json.loads(content)
+
+
+# =============================================================================
+# Operations
+# =============================================================================
+
+async def op_get_assignments(client, ctx):
+    return await client.request("GET", f"/api/assignments/?date={ctx['date']}")
+
+
+async def op_get_flights(client, ctx):
+    return await client.request("GET", f"/api/flights/?date={ctx['date']}")
+
+
+async def op_put(client, ctx):
+    assignment = random.choice(ctx["assignments"])
+    shift = timedelta(minutes=random.randint(-5, 5))
+    start = datetime.fromisoformat(assignment["start_time"]) + shift
+    end = datetime.fromisoformat(assignment["end_time"]) + shift
+    return await client.request(
+        "PUT",
+        f"/api/assignments/{assignment['assignment_id']}",
+        {"start_time": start.isoformat(), "end_time": end.isoformat()},
+    )
+
+
+async def op_post(client, ctx):
+    assignment = random.choice(ctx["assignments"])
+    result = await client.request("POST", "/api/assignments/", {
+        "flight_id": assignment["flight_id"],
+        "carousel_id": assignment["carousel_id"],
+        "start_time": assignment["start_time"],
+        "end_time": assignment["end_time"],
+    })
+    if result[0] == 201:
+        created = json.loads(result[2])
+        await client.request("DELETE", f"/api/assignments/{created['assignment_id']}")
+    return result
+
+
+async def op_auto(client, ctx):
+    status, headers, content = await client.request(
+        "POST", "/api/scenarios/", {"date": ctx["date"], "name": "loadtest"}
+    )
+    if status != 201:
+        return status, headers, content
+    scenario_id = json.loads(content)["scenario_id"]
+    result = await client.request("POST", f"/api/scenarios/{scenario_id}/solve")
+    await client.request("DELETE", f"/api/scenarios/{scenario_id}")
+    return result
+
+
+OPERATIONS = {
+    "get_assignments": op_get_assignments,
+    "get_flights": op_get_flights,
+    "put": op_put,
+    "post": op_post,
+    "auto": op_auto,
+}
+
+
+# =============================================================================
+# Run
+# =============================================================================
+
+async def _sample_pool(pool, stats: dict, stop: asyncio.Event) -> None:
+    """Sample checked-out connections until stopped."""
+    limit = pool.size() + max(pool._max_overflow, 0)
+    stats.update({"size": pool.size(), "max_overflow": pool._max_overflow, "samples": 0,
+                  "saturated": 0, "peak_checked_out": 0, "total_checked_out": 0})
+    while not stop.is_set():
+        checked_out = pool.checkedout()
+        stats["samples"] += 1
+        stats["total_checked_out"] += checked_out
+        stats["peak_checked_out"] = max(stats["peak_checked_out"], checked_out)
+        if checked_out >= limit:
+            stats["saturated"] += 1
+        await asyncio.sleep(POOL_SAMPLE_INTERVAL)
+
+
+async def _client_loop(client, ctx, mix, deadline, think, results):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            status = (await OPERATIONS[name](client, ctx))[0]
+        except Exception as e:  # Transport errors count as failures
+            status = type(e).__name__
+        results.append((name, status, (time.perf_counter() - started) * 1000))
+        if think:
+            await asyncio.sleep(random.uniform(0, think))
+
+
+@contextmanager
+def scratch_database(database_url: str | None):
+    """
+    Point DATABASE_URL at the database to migrate and seed (before app.database
+    is imported). Without database_url, a throwaway SQLite file is used and
+    deleted on exit. Yields the URL.
+    """
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+        yield database_url
+        return
+    with tempfile.TemporaryDirectory(prefix="betashift-load-") as directory:
+        database_url = f"sqlite:///{Path(directory) / 'load.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        try:
+            yield database_url
+        finally:
+            from app.database import engine
+            engine.dispose()  # Close pooled connections before the file is removed
+
+
+async def run(args) -> dict:
+    """Seed, run the load for args.duration seconds and summarize."""
+    random.seed(args.seed)
+    pool = None
+    if args.url:
+        def make_client():
+            return HttpClient(args.url)
+
+        context = nullcontext()
+    else:
+        # DATABASE_URL was set by scratch_database()
+        from app import migrations
+        from app.database import engine
+        from app.main import app
+
+        engine.echo = args.echo
+        migrations.upgrade(engine)  # e.g. a fresh SQLite stand-in
+        if hasattr(engine.pool, "checkedout"):  # QueuePool (not NullPool/StaticPool)
+            pool = engine.pool
+        shared = AsgiClient(app)
+
+        def make_client():
+            return shared  # Requests go straight to the app, no connection to hold
+
+        context = lifespan(app)
+
+    # app.* is imported only now (and in seed()): importing app.database
+    # creates the engine, which must see --database-url first
+    from app.tools.replay import latency_summary
+
+    async with context:
+        setup_client = make_client()
+        day, assignments = await seed(setup_client, Path(args.feed))
+        await setup_client.close()
+        if not assignments:
+            raise SystemExit(f"No assignments on {day} after seeding")
+        ctx = {"date": day, "assignments": assignments}
+
+        results: list[tuple[str, object, float]] = []
+        pool_stats: dict = {}
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(_sample_pool(pool, pool_stats, stop)) if pool else None
+
+        clients = [make_client() for _ in range(args.clients)]
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            _client_loop(client, ctx, args.mix, deadline, args.think, results)
+            for client in clients
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        if sampler:
+            await sampler
+        for client in clients:
+            await client.close()
+
+    operations = {}
+    for name in args.mix:
+        items = [item for item in results if item[0] == name]
+        statuses: dict[str, int] = {}
+        for _, status, _ in items:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        operations[name] = {
+            "count": len(items),
+            "per_second": round(len(items) / elapsed, 2),
+            "statuses": statuses,
+            "latency_ms": latency_summary([latency for _, _, latency in items]),
+        }
+
+    report = {
+        "target": args.url or "in-process",
+        "date": day,
+        "clients": args.clients,
+        "seconds": round(elapsed, 2),
+        "operations_total": len(results),
+        "per_second": round(len(results) / elapsed, 2),
+        "latency_ms": latency_summary([latency for _, _, latency in results]),
+        "operations": operations,
+    }
+    if pool_stats.get("samples"):
+        report["pool"] = {
+            "size": pool_stats["size"],
+            "max_overflow": pool_stats["max_overflow"],
+            "peak_checked_out": pool_stats["peak_checked_out"],
+            "mean_checked_out": round(pool_stats["total_checked_out"] / pool_stats["samples"], 2),
+            "saturated_ratio": round(pool_stats["saturated"] / pool_stats["samples"], 4),
+        }
+    if not args.url:
+        from app.services import day_cache, single_flight
+
+        report["day_cache"] = day_cache.stats()
+        report["single_flight"] = single_flight.stats()
+    return report
+
+
+# =============================================================================
+# Command Line
+# =============================================================================
+
+def _parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def _print_report(report: dict) -> None:
+    print(
+        f"{report['target']}"
+        + (f" on {report['database']}" if "database" in report else "")
+        + f"  date={report['date']}  clients={report['clients']}  "
+        f"{report['operations_total']} ops in {report['seconds']}s = {report['per_second']} ops/s"
+    )
+    header = f"{'operation':<17}{'count':>7}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  statuses"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["operations"].items()) + [("ALL", {**report, "count": report["operations_total"], "statuses": {}})]
+    for name, item in rows:
+        latency = item["latency_ms"]
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(item["statuses"].items()))
+        print(
+            f"{name:<17}{item['count']:>7}{item['per_second']:>9.2f}"
+            f"{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}{latency['max']:>9.2f}  {statuses}"
+        )
+    pool = report.get("pool")
+    if pool:
+        print(
+            f"pool: size={pool['size']} max_overflow={pool['max_overflow']} "
+            f"peak={pool['peak_checked_out']} mean={pool['mean_checked_out']} "
+            f"saturated={pool['saturated_ratio']:.1%} of samples"
+        )
+    else:
+        print("pool: n/a (engine runs in the server process)")
+    cache = report.get("day_cache")
+    if cache:
+        print(f"day loads: {cache['hits']} of {cache['hits'] + cache['misses']} served from the day snapshot")
+    coalesced = report.get("single_flight")
+    if coalesced:
+        print(f"day snapshot builds: {coalesced['coalesced']} of {coalesced['calls']} "
+              f"served by a concurrent identical build")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.loadtest",
+        description="Concurrent Gantt-client load test",
+    )
+    parser.add_argument("--url", help="Running server (default: in-process app.main:app)")
+    parser.add_argument("--database-url",
+                        help="In-process only: database to migrate and seed "
+                             "(default: a throwaway SQLite file)")
+    parser.add_argument("--feed", default=str(DEFAULT_FEED), help="sys_input_dict_*.json to seed")
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--think", type=float, default=0.0, help="Max random pause between ops (s)")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="Weights, e.g. get_assignments=45,get_flights=35,put=12,post=5,auto=3")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--echo", action="store_true", help="Keep SQL logging on")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.url and args.database_url:
+        parser.error("--database-url only applies to the in-process mode (without --url)")
+
+    if args.url:
+        report = asyncio.run(run(args))
+    else:
+        with scratch_database(args.database_url) as database_url:
+            report = asyncio.run(run(args))
+        if args.database_url:
+            from sqlalchemy.engine import make_url
+            report["database"] = make_url(database_url).render_as_string(hide_password=True)
+        else:
+            report["database"] = "throwaway SQLite"
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
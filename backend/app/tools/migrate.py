@@ -0,0 +1,48 @@
+"""
+Migrate Tool
+Applies schema migrations out-of-band (once per deploy, not per worker)
+
+Usage (from backend/):
+    python -m app.tools.migrate upgrade
+    python -m app.tools.migrate current
+"""
+
+import argparse
+import sys
+
+from app import migrations
+from app.database import engine
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.migrate",
+        description="Database schema migrations",
+    )
+    parser.add_argument("command", choices=("upgrade", "current", "list"))
+    parser.add_argument("--target", type=int, default=migrations.SCHEMA_VERSION,
+                        help="Version to upgrade to (default: latest)")
+    parser.add_argument("--echo", action="store_true", help="Log SQL")
+    args = parser.parse_args(argv)
+    engine.echo = args.echo
+
+    with engine.connect() as connection:
+        version = migrations.current_version(connection)
+
+    if args.command == "current":
+        print(f"{version} (latest: {migrations.SCHEMA_VERSION})")
+    elif args.command == "list":
+        for migration in migrations.MIGRATIONS:
+            mark = "applied" if migration.version <= version else "pending"
+            print(f"{migration.version:04d}  {mark:<8} {migration.name}")
+    else:
+        applied = migrations.upgrade(engine, args.target)
+        for migration in applied:
+            print(f"Applied {migration.version:04d} {migration.name}")
+        if not applied:
+            print(f"Already at version {version}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
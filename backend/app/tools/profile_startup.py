@@ -0,0 +1,153 @@
+"""
+Startup Profile Tool
+Measures how long a fresh web worker takes until it serves its first request
+
+Runs a new interpreter (nothing cached in-process) and reports:
+    - import time of app.main, grouped by top-level package (-X importtime)
+    - the slowest app.* modules
+    - lifespan startup (schema check, listener) and first GET /health
+
+and fails when the total exceeds --budget-ms, so it can gate deploys.
+
+Usage (from backend/):
+    python -m app.tools.profile_startup
+    python -m app.tools.profile_startup --budget-ms 1500 --json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+DEFAULT_BUDGET_MS = 2000.0
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _child() -> None:
+    """Measured in the fresh interpreter; prints timings (ms) as JSON."""
+    import asyncio
+
+    started = time.perf_counter()
+    from app.database import engine
+    from app.main import app
+    imported = time.perf_counter()
+
+    from app.tools.loadtest import AsgiClient, lifespan
+
+    engine.echo = False
+
+    async def serve() -> tuple[float, float, int]:
+        async with lifespan(app):
+            ready = time.perf_counter()
+            status, _, _ = await AsgiClient(app).request("GET", "/health")
+            return ready, time.perf_counter(), status
+
+    ready, served, status = asyncio.run(serve())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+        "first_request_ms": (served - ready) * 1000,
+        "status": status,
+    }))
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter; if it fails, stop with its stderr instead of timings."""
+    try:
+        return subprocess.run(
+            [sys.executable, *args],
+            capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+        )
+    except subprocess.CalledProcessError as e:
+        raise SystemExit(f"python {' '.join(args)} failed (exit {e.returncode}):\n{e.stderr}")
+
+
+def _import_profile() -> tuple[dict[str, float], list[tuple[str, float]]]:
+    """(self ms per top-level package, [(app module, cumulative ms)] slowest first)."""
+    result = _run("-X", "importtime", "-c", "import app.main")
+    packages: dict[str, float] = {}
+    app_modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1000
+        if name.startswith("app."):
+            app_modules.append((name, int(cumulative_us) / 1000))
+    app_modules.sort(key=lambda item: item[1], reverse=True)
+    return packages, app_modules
+
+
+def profile(budget_ms: float, top: int) -> dict:
+    """Profile a cold start in fresh interpreters."""
+    packages, app_modules = _import_profile()
+
+    # Interpreter boot + imports + lifespan + first request, as a process manager sees it
+    started = time.perf_counter()
+    result = _run("-m", "app.tools.profile_startup", "--child")
+    total_ms = (time.perf_counter() - started) * 1000
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+    return {
+        "total_ms": round(total_ms, 1),
+        "budget_ms": budget_ms,
+        "within_budget": total_ms <= budget_ms,
+        "import_ms": round(timings["import_ms"], 1),
+        "startup_ms": round(timings["startup_ms"], 1),
+        "first_request_ms": round(timings["first_request_ms"], 1),
+        "first_request_status": timings["status"],
+        "import_by_package_ms": {
+            name: round(ms, 1)
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "slowest_app_modules_ms": [(name, round(ms, 1)) for name, ms in app_modules[:top]],
+    }
+
+
+def _print_report(report: dict) -> None:
+    verdict = "OK" if report["within_budget"] else "OVER BUDGET"
+    print(f"cold start to first response: {report['total_ms']:.1f} ms "
+          f"(budget {report['budget_ms']:.0f} ms) {verdict}")
+    print(f"  import app.main   {report['import_ms']:>8.1f} ms")
+    print(f"  lifespan startup  {report['startup_ms']:>8.1f} ms")
+    print(f"  first request     {report['first_request_ms']:>8.1f} ms "
+          f"(status {report['first_request_status']})")
+    print("import self time by package:")
+    for name, ms in report["import_by_package_ms"].items():
+        print(f"  {name:<24}{ms:>8.1f} ms")
+    print("slowest app modules (cumulative):")
+    for name, ms in report["slowest_app_modules_ms"]:
+        print(f"  {name:<40}{ms:>8.1f} ms")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.profile_startup",
+        description="Profile web worker import and startup time",
+    )
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=12, help="Rows per table")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child()
+        return 0
+
+    report = profile(args.budget_ms, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 0 if report["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+Replay Tool
+Offline evaluation of the AI assignment algorithm against recorded feed days
+
+Each sys_input_dict_*.json holds every flight's timeline of revisions
+(minute, firstBag, LastBag, carousel). The revisions are fed in minute
+order through ai_assignment_service in two modes:
+
+    batch        re-plan every flight from scratch at each revision
+    incremental  keep the plan; only re-place flights whose times changed
+                 (staying on their carousel while it is still free)
+
+and the result is compared with the carousels the feed actually used.
+Days run in parallel in a process pool. Each flight may use the carousels
+of its terminal; carousel terminals are read from the database
+(DATABASE_URL), as the live assigner sees them.
+
+Usage (from backend/):
+    python -m app.tools.replay ../sample_data
+    python -m app.tools.replay ../sample_data/sys_input_dict_251116.json --mode batch --json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.services.ai_assignment_service import Occupancy, assign_all, choose_carousel
+from app.services.assignment_service import busy_minutes, find_conflicts
+from app.services.feed_service import FEED_PATTERN, feed_day
+
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+MODES = ("batch", "incremental")
+PERCENTILES = (50, 95, 99)
+
+
+# =============================================================================
+# Feed Loading
+# =============================================================================
+
+@dataclass(eq=False)
+class ReplayFlight:
+    """A flight's occupation at the current revision (hashable by identity)"""
+    flight_number: str
+    start_time: datetime
+    end_time: datetime
+    actual_carousel: str  # Carousel of the last revision (what the feed finally used)
+    candidates: list[str]  # Carousels of the flight's terminal
+
+
+@dataclass(frozen=True, slots=True)
+class Placement:
+    """A flight placed on a carousel"""
+    flight_number: str
+    carousel_id: str
+    start_time: datetime
+    end_time: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class FlightInfo:
+    """Per-flight facts that do not change between revisions"""
+    scheduled_carousel: str  # From the first revision (decides the terminal)
+    actual_carousel: str  # From the last revision (ground truth)
+
+
+def load_revisions(path: Path) -> tuple[datetime, list[tuple[int, list[dict]]], dict[str, FlightInfo]]:
+    """
+    Read a feed day.
+
+    Returns:
+        (day start,
+         [(minute, [revision entries with flightNumber])] in minute order,
+         flightNumber -> FlightInfo)
+    """
+    with open(path, encoding="utf-8") as f:
+        flights = json.load(f)["flights"]
+
+    by_minute: dict[int, list[dict]] = {}
+    info: dict[str, FlightInfo] = {}
+    for flight in flights:
+        timeline = sorted(flight["timeline"], key=lambda entry: entry["minute"])
+        info[flight["flightNumber"]] = FlightInfo(
+            scheduled_carousel=f"C{timeline[0]['carousel']}",
+            actual_carousel=f"C{timeline[-1]['carousel']}",
+        )
+        for entry in timeline:
+            by_minute.setdefault(entry["minute"], []).append(
+                {**entry, "flightNumber": flight["flightNumber"]}
+            )
+    return feed_day(path), sorted(by_minute.items()), info
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def balance(plan: list[Placement], carousel_ids: list[str]) -> float:
+    """Standard deviation of busy minutes across carousels (lower = more even)."""
+    minutes = busy_minutes(plan)
+    values = [minutes.get(carousel_id, 0) for carousel_id in carousel_ids]
+    if not values:
+        return 0.0
+    mean = sum(values) / len(values)
+    return round(math.sqrt(sum((value - mean) ** 2 for value in values) / len(values)), 2)
+
+
+def latency_summary(latencies_ms: list[float]) -> dict:
+    return {
+        **{f"p{p}": round(percentile(latencies_ms, p), 3) for p in PERCENTILES},
+        "max": round(max(latencies_ms, default=0.0), 3),
+    }
+
+
+# =============================================================================
+# Replay
+# =============================================================================
+
+def _plan(flights: dict[str, ReplayFlight], placed: dict[str, str | None]) -> list[Placement]:
+    return [
+        Placement(number, carousel_id, flights[number].start_time, flights[number].end_time)
+        for number, carousel_id in placed.items()
+        if carousel_id is not None
+    ]
+
+
+def _place_batch(flights: dict[str, ReplayFlight]) -> dict[str, str | None]:
+    """Re-plan every known flight from an empty occupancy."""
+    result = assign_all(list(flights.values()), Occupancy(), lambda item: item.candidates)
+    return {item.flight_number: carousel_id for item, carousel_id in result.items()}
+
+
+def _place_incremental(
+    flights: dict[str, ReplayFlight],
+    state: dict,
+    changed: set[str],
+) -> dict[str, str | None]:
+    """Re-place changed or unplaced flights; everything else stays put."""
+    occupancy: Occupancy = state.setdefault("occupancy", Occupancy())
+    placed: dict[str, str | None] = state.setdefault("placed", {})
+    intervals: dict[str, tuple[datetime, datetime]] = state.setdefault("intervals", {})
+
+    todo = changed | {number for number, carousel_id in placed.items() if carousel_id is None}
+    for number in sorted(todo, key=lambda number: (flights[number].start_time, number)):
+        flight = flights[number]
+        previous = placed.get(number)
+        if previous is not None:
+            occupancy.remove(previous, *intervals[number])
+
+        if previous is not None and occupancy.is_free(previous, flight.start_time, flight.end_time):
+            carousel_id = previous
+        else:
+            carousel_id = choose_carousel(
+                occupancy, flight.candidates, flight.start_time, flight.end_time
+            )
+        if carousel_id is not None:
+            occupancy.add(carousel_id, flight.start_time, flight.end_time)
+            intervals[number] = (flight.start_time, flight.end_time)
+        placed[number] = carousel_id
+
+    return dict(placed)
+
+
+def load_terminals() -> dict[str, str | None]:
+    """carousel_id -> terminal, as configured in the database."""
+    from app.database import SessionLocal, engine
+    from app.models import Carousel
+
+    engine.echo = False
+    with SessionLocal() as db:
+        return dict(db.query(Carousel.carousel_id, Carousel.terminal).all())
+
+
+def replay_day(path: str | Path, terminals: dict[str, str | None], modes: tuple[str, ...] = MODES) -> dict:
+    """
+    Replay one feed day in the given modes.
+
+    Args:
+        terminals: carousel_id -> terminal (see load_terminals())
+
+    Returns:
+        JSON-safe report: per mode conflicts, carousel changes, balance,
+        agreement with the feed and per-revision solver latency (ms).
+    """
+    path = Path(path)
+    day_start, revisions, info = load_revisions(path)
+    carousel_ids = sorted(
+        {f"C{entry['carousel']}" for _, entries in revisions for entry in entries},
+        key=lambda carousel_id: int(carousel_id[1:]),
+    )
+    unknown = sorted(
+        {*carousel_ids, *(flight.scheduled_carousel for flight in info.values())} - terminals.keys(),
+        key=lambda carousel_id: int(carousel_id[1:]),
+    )
+    if unknown:
+        raise ValueError(f"{path.name} uses carousels missing from the database: {', '.join(unknown)}")
+    by_terminal: dict[str | None, list[str]] = {}
+    for carousel_id in carousel_ids:
+        by_terminal.setdefault(terminals[carousel_id], []).append(carousel_id)
+
+    report = {"file": path.name, "date": day_start.date().isoformat(), "revisions": len(revisions)}
+
+    for mode in ("feed", *modes):
+        flights: dict[str, ReplayFlight] = {}
+        state: dict = {}
+        placed: dict[str, str | None] = {}
+        changes: dict[str, int] = {}
+        conflicts_per_revision = []
+        latencies_ms = []
+
+        for _, entries in revisions:
+            changed = set()
+            for entry in entries:
+                number = entry["flightNumber"]
+                start = day_start + timedelta(minutes=entry["firstBag"])
+                end = day_start + timedelta(minutes=entry["LastBag"])
+                flight = flights.get(number)
+                if flight is None:
+                    flights[number] = ReplayFlight(
+                        number, start, end, info[number].actual_carousel,
+                        by_terminal[terminals[info[number].scheduled_carousel]],
+                    )
+                elif (flight.start_time, flight.end_time) != (start, end):
+                    flight.start_time, flight.end_time = start, end
+                else:
+                    continue
+                changed.add(number)
+
+            if mode == "feed":
+                # The feed's own carousel at this revision
+                current = dict(placed)
+                for entry in entries:
+                    current[entry["flightNumber"]] = f"C{entry['carousel']}"
+            else:
+                started = time.perf_counter()
+                if mode == "batch":
+                    current = _place_batch(flights)
+                else:
+                    current = _place_incremental(flights, state, changed)
+                latencies_ms.append((time.perf_counter() - started) * 1000)
+
+            for number, carousel_id in current.items():
+                if number in placed and placed[number] != carousel_id:
+                    changes[number] = changes.get(number, 0) + 1
+            placed = current
+            conflicts_per_revision.append(len(find_conflicts(_plan(flights, placed))))
+
+        plan = _plan(flights, placed)
+        total_changes = sum(changes.values())
+        report[mode] = {
+            "flights": len(flights),
+            "unplaced": sum(1 for carousel_id in placed.values() if carousel_id is None),
+            "final_conflicts": conflicts_per_revision[-1] if conflicts_per_revision else 0,
+            "max_conflicts": max(conflicts_per_revision, default=0),
+            "carousel_changes": total_changes,
+            "flights_changed": len(changes),
+            "changes_per_flight": round(total_changes / len(flights), 3) if flights else 0.0,
+            "balance": balance(plan, carousel_ids),
+            "matches_feed": sum(
+                1 for number, carousel_id in placed.items()
+                if carousel_id == flights[number].actual_carousel
+            ),
+        }
+        if mode != "feed":
+            report[mode]["latency_ms"] = latency_summary(latencies_ms)
+            report[mode]["latencies_ms"] = latencies_ms
+
+    return report
+
+
+def replay(
+    paths: list[Path],
+    terminals: dict[str, str | None],
+    modes: tuple[str, ...] = MODES,
+    workers: int | None = None,
+) -> dict:
+    """
+    Replay several days in parallel (one process per day).
+
+    Returns:
+        {"days": [per-day reports], "total": totals per mode}
+    """
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            days = list(pool.map(
+                replay_day, paths, [terminals] * len(paths), [modes] * len(paths)
+            ))
+    else:
+        days = [replay_day(path, terminals, modes) for path in paths]
+
+    total = {}
+    for mode in ("feed", *modes):
+        reports = [day[mode] for day in days]
+        flights = sum(report["flights"] for report in reports)
+        changes = sum(report["carousel_changes"] for report in reports)
+        total[mode] = {
+            "flights": flights,
+            "unplaced": sum(report["unplaced"] for report in reports),
+            "final_conflicts": sum(report["final_conflicts"] for report in reports),
+            "carousel_changes": changes,
+            "changes_per_flight": round(changes / flights, 3) if flights else 0.0,
+            "balance": round(sum(report["balance"] for report in reports) / len(reports), 2),
+            "matches_feed": sum(report["matches_feed"] for report in reports),
+        }
+        if mode != "feed":
+            # Percentiles over every revision of every day, not an average of days
+            latencies = [value for report in reports for value in report.pop("latencies_ms")]
+            total[mode]["latency_ms"] = latency_summary(latencies)
+
+    return {"days": days, "total": total}
+
+
+# =============================================================================
+# Command Line
+# =============================================================================
+
+def _feed_files(inputs: list[str]) -> list[Path]:
+    paths = []
+    for value in inputs:
+        path = Path(value)
+        if path.is_dir():
+            paths.extend(sorted(path.glob(FEED_PATTERN)))
+        else:
+            paths.append(path)
+    return paths
+
+
+def _print_table(result: dict, modes: tuple[str, ...]) -> None:
+    header = (
+        f"{'day':<12}{'mode':<13}{'flights':>8}{'unplaced':>9}{'conflicts':>10}"
+        f"{'changes':>8}{'chg/flt':>8}{'balance':>9}{'match':>7}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    rows = [(day["date"], day) for day in result["days"]] + [("TOTAL", result["total"])]
+    for label, report in rows:
+        for mode in ("feed", *modes):
+            item = report[mode]
+            latency = item.get("latency_ms")
+            timing = (
+                f"{latency['p50']:>9.3f}{latency['p95']:>9.3f}{latency['p99']:>9.3f}"
+                if latency else f"{'-':>9}{'-':>9}{'-':>9}"
+            )
+            print(
+                f"{label:<12}{mode:<13}{item['flights']:>8}{item['unplaced']:>9}"
+                f"{item['final_conflicts']:>10}{item['carousel_changes']:>8}"
+                f"{item['changes_per_flight']:>8.3f}{item['balance']:>9.2f}"
+                f"{item['matches_feed']:>7}{timing}"
+            )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.replay",
+        description="Replay feed days through the AI assignment algorithm",
+    )
+    parser.add_argument("inputs", nargs="+", help="Feed files or directories")
+    parser.add_argument("--mode", choices=(*MODES, "both"), default="both")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per day)")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    paths = _feed_files(args.inputs)
+    if not paths:
+        parser.error("no sys_input_dict_*.json files found")
+    modes = MODES if args.mode == "both" else (args.mode,)
+
+    terminals = load_terminals()
+    if not terminals:
+        parser.error("no carousels in the database (POST /api/carousels/init creates them)")
+    try:
+        result = replay(paths, terminals, modes, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        _print_table(result, modes)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
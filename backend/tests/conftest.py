@@ -0,0 +1,42 @@
+"""
+Test fixtures: a throwaway SQLite database per test
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Must be set before app.database creates the engine
+_db_dir = tempfile.mkdtemp(prefix="betashift-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_db_dir) / 'test.db'}"
+
+import app.models  # noqa: E402,F401  (registers every table)
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.services import day_cache, history_service  # noqa: E402
+
+engine.echo = False
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        history_service._baselined.clear()
+        day_cache.invalidate()  # Days of the dropped tables
+
+
+@pytest.fixture
+def client(db):
+    """API client on the test database (lifespan not run: no migrations, no listener)."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
@@ -0,0 +1,37 @@
+"""
+AI Assignment Service Tests
+Free-slot checks against a carousel's occupied intervals
+"""
+
+from datetime import datetime, timedelta
+
+from app.services.ai_assignment_service import Occupancy
+
+T0 = datetime(2025, 11, 16, 8)
+
+
+def at(minutes: int) -> datetime:
+    return T0 + timedelta(minutes=minutes)
+
+
+def test_is_free_sees_a_long_interval_behind_shorter_ones():
+    occupancy = Occupancy()
+    occupancy.add("C1", at(0), at(300))  # Overlaps the two below (a plan conflict)
+    occupancy.add("C1", at(10), at(20))
+    occupancy.add("C1", at(30), at(40))
+
+    assert not occupancy.is_free("C1", at(60), at(70))
+    assert occupancy.is_free("C1", at(300), at(310))
+    assert occupancy.is_free("C2", at(60), at(70))
+
+
+def test_is_free_after_remove():
+    occupancy = Occupancy()
+    occupancy.add("C1", at(0), at(300))
+    occupancy.add("C1", at(30), at(40))
+    occupancy.remove("C1", at(0), at(300))
+
+    assert occupancy.is_free("C1", at(60), at(70))
+    assert not occupancy.is_free("C1", at(35), at(70))
+    assert occupancy.is_free("C1", at(40), at(70))
+    assert occupancy.is_free("C1", at(-20), at(0))
@@ -0,0 +1,153 @@
+"""
+Analytics Service Tests
+Incremental aggregates vs a full rebuild, terminal peaks, stored rollups
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.models import Airline, Assignment, Carousel, DailyUsage, Flight
+from app.services import analytics_service
+from app.services.analytics_service import SCOPE_CAROUSEL, SCOPE_TERMINAL
+
+DAY = date(2025, 11, 16)
+DAY_START = datetime(2025, 11, 16)
+
+
+@pytest.fixture
+def carousels(db):
+    """C1 and C2 in T1, one flight per hour from 06:00."""
+    db.add(Airline(airline_code="KE", airline_name="Korean Air"))
+    db.add_all([Carousel(carousel_id="C1", terminal="T1"), Carousel(carousel_id="C2", terminal="T1")])
+    for n in range(6):
+        db.add(Flight(
+            flight_id=f"KE00{n}", airline="KE", flight_number=f"00{n}",
+            scheduled_time=DAY_START + timedelta(hours=6 + n),
+        ))
+    db.commit()
+    return db
+
+
+def create(db, n: int, carousel_id: str, start: datetime, minutes: int = 45) -> Assignment:
+    row = Assignment(
+        assignment_id=n, flight_id=f"KE00{n}", carousel_id=carousel_id,
+        start_time=start, end_time=start + timedelta(minutes=minutes),
+    )
+    db.add(row)
+    db.flush()
+    analytics_service.record_assignment(db, row)
+    db.commit()
+    return row
+
+
+def stored(db, day: date = DAY) -> dict:
+    """(scope, scope_id) -> (minute_counts, hourly_minutes, assignment_count, peak)."""
+    db.expire_all()
+    return {
+        (usage.scope, usage.scope_id): (
+            usage.minute_counts, usage.hourly_minutes, usage.assignment_count, usage.peak_concurrency,
+        )
+        for usage in analytics_service.get_day_usage(db, day)
+    }
+
+
+def rebuilt(db, day: date = DAY) -> dict:
+    analytics_service.rebuild_day(db, day)
+    db.commit()
+    return stored(db, day)
+
+
+# =============================================================================
+# Incremental Maintenance
+# =============================================================================
+
+def test_create_move_delete_match_a_rebuild(carousels):
+    db = carousels
+    create(db, 0, "C1", DAY_START + timedelta(hours=6))
+    row = create(db, 1, "C1", DAY_START + timedelta(hours=6, minutes=30))
+    create(db, 2, "C2", DAY_START + timedelta(hours=23, minutes=30))  # Runs into the next day
+    assert stored(db) == rebuilt(db)
+
+    analytics_service.lock_usage(db, [
+        analytics_service.placement(row),
+        ("C2", row.start_time + timedelta(hours=2), row.end_time + timedelta(hours=2)),
+    ])
+    analytics_service.record_assignment(db, row, -1)
+    row.carousel_id = "C2"
+    row.start_time += timedelta(hours=2)
+    row.end_time += timedelta(hours=2)
+    analytics_service.record_assignment(db, row)
+    db.commit()
+    incremental = stored(db)
+    assert incremental[SCOPE_CAROUSEL, "C2"][1][8:10] == [30, 15]  # 08:30-09:15
+    assert incremental == rebuilt(db)
+
+    analytics_service.record_assignment(db, row, -1)
+    db.delete(row)
+    db.commit()
+    assert stored(db) == rebuilt(db)
+    assert stored(db, DAY + timedelta(days=1)) == rebuilt(db, DAY + timedelta(days=1))
+
+
+def test_terminal_peak_is_current_after_commit(carousels):
+    db = carousels
+    create(db, 0, "C1", DAY_START + timedelta(hours=8))
+    create(db, 1, "C2", DAY_START + timedelta(hours=8, minutes=10))
+
+    terminal = db.get(DailyUsage, (DAY, SCOPE_TERMINAL, "T1"))
+    assert terminal.peak_concurrency == 2
+    assert terminal.peak_minute == 8 * 60 + 10
+    assert terminal.assignment_count == 2
+
+    row = db.get(Assignment, 1)
+    analytics_service.record_assignment(db, row, -1)
+    db.delete(row)
+    db.commit()
+    db.expire_all()
+    assert db.get(DailyUsage, (DAY, SCOPE_TERMINAL, "T1")).peak_concurrency == 1
+
+
+def test_terminal_refresh_failure_fails_the_commit(carousels, monkeypatch):
+    db = carousels
+
+    def broken(db, usage_date, terminal):
+        raise RuntimeError("terminal refresh failed")
+
+    monkeypatch.setattr(analytics_service, "_refresh_terminal", broken)
+    with pytest.raises(RuntimeError):
+        create(db, 0, "C1", DAY_START + timedelta(hours=8))
+    db.rollback()
+    assert db.query(Assignment).count() == 0
+
+
+# =============================================================================
+# Rollups
+# =============================================================================
+
+def test_range_rollup_reads_stored_rows(carousels):
+    db = carousels
+    create(db, 0, "C1", DAY_START + timedelta(hours=8), minutes=60)
+    create(db, 1, "C1", DAY_START + timedelta(days=1, hours=8), minutes=30)
+    # Rollups never rescan assignments: removing them behind the
+    # aggregates' back leaves the stored numbers
+    db.execute(delete(Assignment))
+    db.commit()
+
+    summaries = analytics_service.get_range_usage(db, DAY, DAY + timedelta(days=1))
+    carousel_rollups, terminal_rollups = analytics_service.rollup(summaries, range_days=2)
+
+    assert carousel_rollups == [{
+        "carousel_id": "C1",
+        "active_days": 2,
+        "assignment_count": 2,
+        "busy_minutes": 90,
+        "conflict_minutes": 0,
+        "longest_idle_minutes": 0,
+        "utilization": round(90 / (2 * analytics_service.MINUTES_PER_DAY), 4),
+    }]
+    assert terminal_rollups == [{
+        "terminal": "T1", "active_days": 2, "assignment_count": 2,
+        "peak_concurrency": 1, "peak_date": DAY,
+    }]
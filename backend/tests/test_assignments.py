@@ -0,0 +1,102 @@
+"""
+Assignments API Tests
+Optimistic concurrency: versions, ETag and If-Match on PUT/DELETE
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Airline, Assignment, Carousel, Flight
+
+START = datetime(2025, 11, 16, 8)
+
+
+@pytest.fixture
+def assignment(db):
+    """Assignment 1 of flight KE001 on C1, at version 1."""
+    db.add(Airline(airline_code="KE", airline_name="Korean Air"))
+    db.add_all([
+        Carousel(carousel_id="C1", terminal="T1", is_active=True),
+        Carousel(carousel_id="C2", terminal="T1", is_active=True),
+    ])
+    db.add(Flight(flight_id="KE001", airline="KE", flight_number="001", scheduled_time=START))
+    db.add(Assignment(
+        assignment_id=1, flight_id="KE001", carousel_id="C1",
+        start_time=START, end_time=START + timedelta(minutes=45),
+    ))
+    db.commit()
+    return 1
+
+
+def version_of(db, assignment_id: int) -> int:
+    db.expire_all()
+    return db.get(Assignment, assignment_id).version
+
+
+def test_get_and_put_send_the_version_as_etag(client, assignment):
+    response = client.get(f"/api/assignments/{assignment}")
+    assert response.headers["ETag"] == '"1"'
+
+    response = client.put(
+        f"/api/assignments/{assignment}", json={"assignment_type": "MANUAL"},
+        headers={"If-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+    assert response.json()["version"] == 2
+
+
+def test_version_increments_once_per_write(client, db, assignment):
+    for version, body in enumerate((
+        {"assignment_type": "MANUAL"},  # Not a move
+        {"carousel_id": "C2"},  # A move
+        {"start_time": (START + timedelta(minutes=5)).isoformat(), "version": 3},
+    ), start=2):
+        assert client.put(f"/api/assignments/{assignment}", json=body).status_code == 200
+        assert version_of(db, assignment) == version
+
+
+@pytest.mark.parametrize("stale", [
+    {"headers": {"If-Match": '"1"'}, "json": {"carousel_id": "C1"}},
+    {"headers": {"If-Match": 'W/"1"'}, "json": {"assignment_type": "AI"}},
+    {"json": {"carousel_id": "C1", "version": 1}},
+])
+def test_stale_version_is_409_with_the_current_row(client, db, assignment, stale):
+    client.put(f"/api/assignments/{assignment}", json={"carousel_id": "C2"})  # Now version 2
+
+    response = client.put(f"/api/assignments/{assignment}", **stale)
+
+    assert response.status_code == 409
+    assert response.headers["ETag"] == '"2"'
+    current = response.json()["detail"]["current"]
+    assert (current["carousel_id"], current["version"]) == ("C2", 2)
+    assert version_of(db, assignment) == 2
+
+
+def test_put_without_a_version_overwrites(client, db, assignment):
+    client.put(f"/api/assignments/{assignment}", json={"carousel_id": "C2"})
+    response = client.put(f"/api/assignments/{assignment}", json={"carousel_id": "C1"})
+    assert response.status_code == 200
+    assert response.json()["version"] == 3
+
+
+def test_delete_with_stale_if_match_is_refused(client, db, assignment):
+    client.put(f"/api/assignments/{assignment}", json={"assignment_type": "MANUAL"})
+
+    response = client.delete(f"/api/assignments/{assignment}", headers={"If-Match": '"1"'})
+    assert response.status_code == 409
+    assert response.json()["detail"]["current"]["version"] == 2
+    assert version_of(db, assignment) == 2
+
+    response = client.delete(f"/api/assignments/{assignment}", headers={"If-Match": '"2"'})
+    assert response.status_code == 204
+    db.expire_all()
+    assert db.get(Assignment, assignment) is None
+
+
+def test_malformed_if_match_is_400(client, assignment):
+    response = client.put(
+        f"/api/assignments/{assignment}", json={"carousel_id": "C2"}, headers={"If-Match": "v1"},
+    )
+    assert response.status_code == 400
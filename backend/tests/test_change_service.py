@@ -0,0 +1,67 @@
+"""
+Change Service Tests
+Delivery on commit, deduplication and NOTIFY payloads
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.services import change_service
+
+DAY = date(2025, 11, 16)
+
+
+@pytest.fixture
+def received(monkeypatch):
+    calls = []
+    monkeypatch.setattr(change_service, "_handlers", [])
+    change_service.subscribe(lambda day, entity: calls.append((day, entity)), ("assignments", "flights"))
+    return calls
+
+
+def test_delivered_once_on_commit(db, received):
+    for _ in range(3):
+        change_service.publish(db, "assignments", DAY)
+    change_service.publish(db, "flights", DAY)
+    change_service.publish(db, "flights")
+    assert received == []
+
+    db.commit()
+    # The all-days flights change covers the dated one
+    assert received == [(DAY, "assignments"), (None, "flights")]
+
+
+def test_nothing_delivered_on_rollback(db, received):
+    db.execute(text("SELECT 1"))  # Begins the transaction the change belongs to
+    change_service.publish(db, "assignments", DAY)
+    db.rollback()
+    db.commit()
+    assert received == []
+
+
+def test_unknown_entity(db):
+    with pytest.raises(ValueError):
+        change_service.publish(db, "gates", DAY)
+
+
+def test_payloads_fit_notify_limit_and_round_trip(received, monkeypatch):
+    changes = [(DAY + timedelta(days=n), "assignments") for n in range(800)]
+    payloads = change_service._payloads(changes)
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) <= change_service.PAYLOAD_LIMIT for payload in payloads)
+
+    change_service._receive(payloads[0])
+    assert received == []  # Own notifications are handled on commit, not twice
+
+    monkeypatch.setattr(change_service, "_origin", "another worker")
+    for payload in payloads:
+        change_service._receive(payload)
+    assert received == changes
+
+
+@pytest.mark.parametrize("payload", ["", "[]", '{"origin": "x"}', '{"origin": "x", "changes": [["flights", "tomorrow"]]}'])
+def test_malformed_notification_is_ignored(received, payload):
+    change_service._receive(payload)
+    assert received == []
@@ -0,0 +1,110 @@
+"""
+Compression Tests
+Accept-Encoding negotiation and what CompressionMiddleware compresses
+"""
+
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.services import compression
+from app.services.compression import CompressionMiddleware
+
+ROWS = [{"assignment_id": n, "carousel_id": f"C{n % 12 + 1}"} for n in range(100)]
+BODY = json.dumps(ROWS).encode()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/large")
+    def large():
+        return JSONResponse(ROWS)
+
+    @app.get("/small")
+    def small():
+        return JSONResponse({"status": "healthy"})
+
+    @app.get("/export")
+    def export():
+        # Like export_response(): streamed, maybe gzip-encoded by the endpoint itself
+        return StreamingResponse(iter([BODY[:500], BODY[500:]]), media_type="application/json")
+
+    @app.get("/export.gz")
+    def export_gzip():
+        return StreamingResponse(
+            iter([gzip.compress(BODY)]), media_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    return TestClient(app)
+
+
+def get_raw(client, path: str, accept: str | None) -> tuple[dict, bytes]:
+    """Headers and the body as sent (not decoded by the client)."""
+    headers = {"Accept-Encoding": accept or "identity"}
+    with client.stream("GET", path, headers=headers) as response:
+        return response.headers, b"".join(response.iter_raw())
+
+
+# =============================================================================
+# Negotiation
+# =============================================================================
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("*", compression.ENCODINGS[0]),
+    ("*;q=0.5, gzip;q=0", "br" if "br" in compression.ENCODINGS else None),
+    ("deflate, gzip;q=0.8", "gzip"),
+])
+def test_negotiate(accept, expected):
+    assert compression.negotiate(accept) == expected
+
+
+# =============================================================================
+# Middleware
+# =============================================================================
+
+def test_large_json_is_gzipped_when_accepted(client):
+    headers, body = get_raw(client, "/large", "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    assert int(headers["content-length"]) == len(body)
+    assert "accept-encoding" in headers["vary"].lower()
+    assert json.loads(gzip.decompress(body)) == ROWS
+
+
+@pytest.mark.parametrize("accept", [None, "gzip;q=0", "identity"])
+def test_not_compressed_unless_accepted(client, accept):
+    headers, body = get_raw(client, "/large", accept)
+
+    assert "content-encoding" not in headers
+    assert int(headers["content-length"]) == len(body)
+    assert json.loads(body) == ROWS
+
+
+def test_small_body_is_sent_as_is(client):
+    headers, body = get_raw(client, "/small", "gzip")
+
+    assert "content-encoding" not in headers
+    assert len(body) < compression.MIN_SIZE
+    assert json.loads(body) == {"status": "healthy"}
+
+
+def test_streamed_export_is_left_alone(client):
+    headers, body = get_raw(client, "/export", "gzip")
+    assert "content-encoding" not in headers
+    assert json.loads(body) == ROWS
+
+    headers, body = get_raw(client, "/export.gz", "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == ROWS  # Not compressed twice
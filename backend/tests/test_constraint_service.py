@@ -0,0 +1,90 @@
+"""
+Constraint Service Tests
+Compiled feasibility tables, violation explanations and cache invalidation
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Airline, Carousel, CarouselMaintenance, Flight
+from app.services import constraint_service
+
+DAY_START = datetime(2025, 11, 16)
+
+
+@pytest.fixture
+def rules(db):
+    db.add(Airline(airline_code="KE", airline_name="Korean Air", terminal="T2"))
+    db.add_all([
+        Carousel(carousel_id="C1", terminal="T1"),
+        Carousel(carousel_id="C2", terminal="T2"),
+        Carousel(carousel_id="C3", terminal="T2", wide_body_only=True),
+    ])
+    db.add(Flight(
+        flight_id="KE001_20251116", airline="KE", flight_number="001",
+        scheduled_time=DAY_START + timedelta(hours=8), aircraft_type="A321",
+    ))
+    db.add(CarouselMaintenance(
+        carousel_id="C2", start_time=DAY_START + timedelta(hours=9),
+        end_time=DAY_START + timedelta(hours=10),
+    ))
+    db.commit()
+    constraint_service.invalidate()
+    yield db
+    constraint_service.invalidate()
+
+
+def check(db, carousel_id: str, hour: int) -> list[str]:
+    flight = db.get(Flight, "KE001_20251116")
+    start = DAY_START + timedelta(hours=hour)
+    return constraint_service.check_assignment(
+        db, flight, db.get(Carousel, carousel_id), start, start + timedelta(minutes=30)
+    )
+
+
+def test_violations_are_explained(rules):
+    db = rules
+    assert check(db, "C2", 8) == []
+    assert check(db, "C1", 8) == ["airline_terminal"]
+    assert check(db, "C3", 8) == ["wide_body_only"]
+    assert check(db, "C2", 9) == ["maintenance"]
+
+
+def test_explanation_uses_the_compiled_rule_data(rules, monkeypatch):
+    db = rules
+    constraint_service.get_table(db, DAY_START.date())
+
+    def fail(*args):
+        raise AssertionError("prepare() called again")
+
+    for constraint in constraint_service.CONSTRAINTS:
+        monkeypatch.setattr(constraint, "prepare", fail)
+    assert check(db, "C1", 9) == ["airline_terminal"]
+
+
+def test_table_compiled_before_a_change_is_not_cached(rules, monkeypatch):
+    db = rules
+    compile_day = constraint_service.compile_day
+
+    def compile_during_change(session, day):
+        table = compile_day(session, day)
+        constraint_service.invalidate(day)  # Rule data changed meanwhile
+        return table
+
+    monkeypatch.setattr(constraint_service, "compile_day", compile_during_change)
+    constraint_service.get_table(db, DAY_START.date())
+    assert DAY_START.date() not in constraint_service._tables
+
+    monkeypatch.setattr(constraint_service, "compile_day", compile_day)
+    constraint_service.get_table(db, DAY_START.date())
+    assert DAY_START.date() in constraint_service._tables
+
+
+def test_rule_change_recompiles(rules):
+    db = rules
+    assert check(db, "C1", 8) == ["airline_terminal"]
+    db.get(Airline, "KE").terminal = None
+    db.commit()
+    constraint_service.invalidate()
+    assert check(db, "C1", 8) == []
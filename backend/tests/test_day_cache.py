@@ -0,0 +1,60 @@
+"""
+Day Cache Tests
+Full-day payloads are built once and dropped when that day is written
+"""
+
+from datetime import date, datetime, timedelta
+
+from app.models import Airline, Assignment, Carousel, Flight
+from app.services import change_service, day_cache
+
+DAY = date(2025, 11, 16)
+START = datetime(2025, 11, 16, 8)
+
+
+def counting_build(builds: list, body: bytes):
+    def build() -> bytes:
+        builds.append(body)
+        return body
+    return build
+
+
+def test_write_to_the_day_drops_its_payload(db):
+    builds = []
+    day_cache.get("assignments", DAY, counting_build(builds, b"[1]"))
+    day_cache.get("assignments", DAY + timedelta(days=1), counting_build(builds, b"[2]"))
+    assert day_cache.get("assignments", DAY, counting_build(builds, b"[x]")).content == b"[1]"
+    assert len(builds) == 2
+
+    change_service.publish(db, "assignments", DAY)
+    assert day_cache.get("assignments", DAY, counting_build(builds, b"[x]")).content == b"[1]"  # Not committed
+    db.commit()
+
+    assert day_cache.get("assignments", DAY, counting_build(builds, b"[3]")).content == b"[3]"
+    assert day_cache.get("assignments", DAY + timedelta(days=1), counting_build(builds, b"[x]")).content == b"[2]"
+
+
+def test_api_day_load_reflects_a_put(client, db):
+    db.add(Airline(airline_code="KE", airline_name="Korean Air"))
+    db.add_all([
+        Carousel(carousel_id="C1", terminal="T1", is_active=True),
+        Carousel(carousel_id="C2", terminal="T1", is_active=True),
+    ])
+    db.add(Flight(flight_id="KE001", airline="KE", flight_number="001", scheduled_time=START))
+    db.add(Assignment(
+        assignment_id=1, flight_id="KE001", carousel_id="C1",
+        start_time=START, end_time=START + timedelta(minutes=45),
+    ))
+    db.commit()
+
+    def carousels() -> list[str]:
+        response = client.get("/api/assignments/", params={"date": str(DAY)})
+        return [item["carousel_id"] for item in response.json()]
+
+    assert carousels() == ["C1"]
+    hits = day_cache.stats()["hits"]
+    assert carousels() == ["C1"]
+    assert day_cache.stats()["hits"] == hits + 1
+
+    assert client.put("/api/assignments/1", json={"carousel_id": "C2"}).status_code == 200
+    assert carousels() == ["C2"]
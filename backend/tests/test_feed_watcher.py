@@ -0,0 +1,116 @@
+"""
+Feed Watcher Tests
+Feed parsing, retries of flights waiting for a carousel, and quarantine
+"""
+
+import json
+import logging
+
+import pytest
+
+from app.models import Assignment, Carousel
+from app.services import feed_service
+from app.tools import feed_watcher
+from app.tools.feed_watcher import FeedWatcher
+
+
+def flight(number: str, carousel: int, first_bag: int = 600) -> dict:
+    return {"flightNumber": number, "timeline": [
+        {"minute": 0, "firstBag": first_bag, "LastBag": first_bag + 30, "carousel": carousel},
+    ]}
+
+
+def write_feed(directory, flights: list) -> None:
+    path = directory / "sys_input_dict_251116.json"
+    path.write_text(json.dumps({"flights": flights}))
+
+
+@pytest.fixture
+def carousels(db):
+    db.add_all([Carousel(carousel_id="C1", terminal="T1"), Carousel(carousel_id="C2", terminal="T1")])
+    db.commit()
+    return db
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+def test_malformed_flights_are_skipped(tmp_path, caplog):
+    write_feed(tmp_path, [
+        flight("KE001", 1),
+        {"flightNumber": "KE002"},
+        {"flightNumber": "KE003", "timeline": []},
+        {"flightNumber": "KE004", "timeline": [{"minute": 0, "firstBag": "600"}]},
+        "KE005",
+        flight("KE006", 2),
+    ])
+    with caplog.at_level(logging.WARNING):
+        flights = feed_service.parse_feed(tmp_path / "sys_input_dict_251116.json")
+
+    assert [item.flight_id for item in flights] == ["KE001_20251116", "KE006_20251116"]
+    assert len(caplog.records) == 4
+
+
+@pytest.mark.parametrize("content", ['{"flights": [', '{"flights": {}}', "[]", '{"other": []}'])
+def test_not_a_feed_file(tmp_path, content):
+    path = tmp_path / "sys_input_dict_251116.json"
+    path.write_text(content)
+    with pytest.raises(ValueError):
+        feed_service.parse_feed(path)
+
+
+# =============================================================================
+# Watcher
+# =============================================================================
+
+def test_flight_waits_for_unknown_carousel(carousels, tmp_path):
+    db = carousels
+    write_feed(tmp_path, [flight("KE001", 1), flight("KE002", 9)])
+    watcher = FeedWatcher(tmp_path)
+    watcher.scan()
+    watcher.flush()
+
+    assert set(watcher.applied) == {"KE001_20251116"}
+    assert set(watcher.pending) == {"KE002_20251116"}
+
+    db.add(Carousel(carousel_id="C9", terminal="T1"))
+    db.commit()
+    watcher.flush()
+    assert not watcher.pending
+    assert db.query(Assignment).filter(Assignment.flight_id == "KE002_20251116").one().carousel_id == "C9"
+
+
+def test_failing_flight_is_quarantined(carousels, tmp_path, monkeypatch):
+    db = carousels
+    write_feed(tmp_path, [flight("KE001", 1), flight("KE002", 2)])
+    apply_changes = feed_service.apply_changes
+
+    def failing(session, flights, batch_id=None):
+        if any(item.flight_id == "KE002_20251116" for item in flights):
+            raise RuntimeError("bad row")
+        return apply_changes(session, flights, batch_id)
+
+    monkeypatch.setattr(feed_service, "apply_changes", failing)
+    watcher = FeedWatcher(tmp_path)
+    watcher.scan()
+    for _ in range(feed_watcher.MAX_ATTEMPTS - 1):
+        with pytest.raises(RuntimeError):
+            watcher.flush()
+    assert len(watcher.pending) == 2
+
+    watcher.flush()
+    assert set(watcher.applied) == {"KE001_20251116"}
+    assert set(watcher.quarantined) == {"KE002_20251116"}
+    assert not watcher.pending
+    assert db.query(Assignment).count() == 1
+
+    # Same timeline: stays quarantined; a new revision is tried again
+    watcher.file_stamps.clear()
+    watcher.scan()
+    assert not watcher.pending
+    write_feed(tmp_path, [flight("KE001", 1), flight("KE002", 2, first_bag=620)])
+    watcher.file_stamps.clear()
+    watcher.scan()
+    assert set(watcher.pending) == {"KE002_20251116"}
+    assert not watcher.quarantined
@@ -0,0 +1,320 @@
+"""
+History Service Tests
+Undo, redo and point-in-time restore of assignment changes
+"""
+
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models import Airline, Assignment, Carousel, Flight, PlanSnapshot
+from app.services import analytics_service, feed_service, history_service
+from app.services.feed_service import FeedFlight
+from app.services.history_service import HistoryConflictError
+
+DAY = date(2025, 11, 16)
+DAY_START = datetime(2025, 11, 16)
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+@pytest.fixture
+def plan(db):
+    """Two carousels, three flights, each with an assignment (as of before history)."""
+    db.add(Airline(airline_code="KE", airline_name="Korean Air"))
+    db.add_all([
+        Carousel(carousel_id="C1", terminal="T1"),
+        Carousel(carousel_id="C2", terminal="T1"),
+    ])
+    for n in range(3):
+        scheduled = DAY_START + timedelta(hours=8 + n)
+        db.add(Flight(
+            flight_id=f"KE00{n}_20251116", airline="KE",
+            flight_number=f"00{n}", scheduled_time=scheduled,
+        ))
+        row = Assignment(
+            flight_id=f"KE00{n}_20251116", carousel_id="C1",
+            start_time=scheduled, end_time=scheduled + timedelta(minutes=40),
+            assignment_type="MANUAL",
+        )
+        db.add(row)
+        analytics_service.record_assignment(db, row)
+    db.commit()
+    return db
+
+
+def edit(db, assignment_id: int, carousel_id: str | None = None, shift: int = 0) -> str:
+    """A manual edit as the assignments router makes it, committed as one batch."""
+    row = db.get(Assignment, assignment_id)
+    before = history_service.to_state(row)
+    analytics_service.record_assignment(db, row, -1)
+    if carousel_id:
+        row.carousel_id = carousel_id
+    row.start_time += timedelta(minutes=shift)
+    row.end_time += timedelta(minutes=shift)
+    analytics_service.record_assignment(db, row)
+    db.flush()
+    batch_id = history_service.new_batch_id()
+    history_service.record(db, batch_id, "MANUAL", before, history_service.to_state(row))
+    db.commit()
+    return batch_id
+
+
+def placements(db) -> dict[int, tuple[str, datetime, datetime]]:
+    db.expire_all()
+    return {
+        row.assignment_id: (row.carousel_id, row.start_time, row.end_time)
+        for row in db.query(Assignment)
+    }
+
+
+def checkpoint() -> datetime:
+    """A point in time strictly between two committed changes."""
+    time.sleep(0.01)
+    at = history_service.utc_now()
+    time.sleep(0.01)
+    return at
+
+
+# =============================================================================
+# Undo / Redo
+# =============================================================================
+
+def test_undo_and_redo_a_move(plan):
+    db = plan
+    original = placements(db)
+    edit(db, 1, carousel_id="C2", shift=15)
+    moved = placements(db)
+
+    history_service.undo(db, DAY)
+    db.commit()
+    assert placements(db) == original
+
+    history_service.redo(db, DAY)
+    db.commit()
+    assert placements(db) == moved
+
+
+def test_new_action_clears_redo(plan):
+    db = plan
+    edit(db, 1, carousel_id="C2")
+    history_service.undo(db, DAY)
+    db.commit()
+    edit(db, 2, shift=5)
+
+    with pytest.raises(ValueError):
+        history_service.redo(db, DAY)
+
+
+def test_nothing_to_undo(plan):
+    with pytest.raises(ValueError):
+        history_service.undo(plan, DAY)
+
+
+def test_undo_of_create_deletes_and_redo_recreates(plan):
+    db = plan
+    row = Assignment(
+        flight_id="KE000_20251116", carousel_id="C2",
+        start_time=DAY_START + timedelta(hours=12),
+        end_time=DAY_START + timedelta(hours=13),
+        assignment_type="MANUAL",
+    )
+    db.add(row)
+    analytics_service.record_assignment(db, row)
+    db.flush()
+    history_service.record(db, history_service.new_batch_id(), "MANUAL", None, history_service.to_state(row))
+    db.commit()
+    created = placements(db)
+
+    history_service.undo(db, DAY)
+    db.commit()
+    assert row.assignment_id not in placements(db)
+
+    history_service.redo(db, DAY)
+    db.commit()
+    assert placements(db) == created
+
+
+def test_mixed_feed_and_manual_batch(plan):
+    """A FEED batch moves its own assignment; a MANUAL one keeps its carousel."""
+    db = plan
+    db.get(Assignment, 1).assignment_type = feed_service.ASSIGNMENT_TYPE
+    db.commit()
+    original = placements(db)
+
+    feed = [
+        FeedFlight(
+            flight_id=f"KE00{n}_20251116", airline="KE", flight_number=f"00{n}",
+            scheduled_time=DAY_START + timedelta(hours=8 + n),
+            start_time=DAY_START + timedelta(hours=8 + n, minutes=30),
+            end_time=DAY_START + timedelta(hours=9 + n, minutes=10),
+            carousel_id="C2", timeline_hash=str(n),
+        )
+        for n in range(2)
+    ]
+    feed_service.apply_changes(db, feed)
+    db.commit()
+    applied = placements(db)
+    assert applied[1][0] == "C2"  # FEED: follows the feed's carousel
+    assert applied[2][0] == "C1"  # MANUAL: times only
+    assert applied[2][1] == DAY_START + timedelta(hours=9, minutes=30)
+
+    _, _, count = history_service.undo(db, DAY)
+    db.commit()
+    assert count == 2
+    assert placements(db) == original
+
+    history_service.redo(db, DAY)
+    db.commit()
+    assert placements(db) == applied
+
+
+def test_undo_conflicts_with_change_outside_the_log(plan):
+    db = plan
+    edit(db, 1, carousel_id="C2")
+    db.execute(update(Assignment).where(Assignment.assignment_id == 1).values(
+        carousel_id="C1", version=Assignment.version + 1,
+    ))
+    db.commit()
+
+    with pytest.raises(HistoryConflictError):
+        history_service.undo(db, DAY)
+
+
+def test_concurrent_version_bump_is_a_conflict(plan):
+    """A row changed by another transaction after it was read (StaleDataError)."""
+    db = plan
+    edit(db, 1, carousel_id="C2")
+    row = db.get(Assignment, 1)  # Loaded, then bumped elsewhere
+    assert row.version == 2
+
+    with SessionLocal() as other:
+        other.execute(update(Assignment).where(Assignment.assignment_id == 1).values(
+            version=Assignment.version + 1,
+        ))
+        other.commit()
+
+    with pytest.raises(HistoryConflictError):
+        history_service.undo(db, DAY)
+    db.rollback()
+
+
+def test_undo_stacks_across_snapshots(plan, monkeypatch):
+    """Stacks resume from snapshots and match the plan step by step."""
+    db = plan
+    monkeypatch.setattr(history_service, "SNAPSHOT_INTERVAL", 3)
+    states = [placements(db)]
+    for n in range(7):
+        edit(db, 1 + n % 3, shift=5)
+        states.append(placements(db))
+    assert db.query(PlanSnapshot).filter(PlanSnapshot.stacks.isnot(None)).count() > 2
+
+    for expected in reversed(states[:-1]):
+        history_service.undo(db, DAY)
+        db.commit()
+        assert placements(db) == expected
+    with pytest.raises(ValueError):
+        history_service.undo(db, DAY)
+
+    for expected in states[1:4]:
+        history_service.redo(db, DAY)
+        db.commit()
+        assert placements(db) == expected
+
+    edit(db, 2, carousel_id="C2")
+    with pytest.raises(ValueError):
+        history_service.redo(db, DAY)
+    history_service.undo(db, DAY)
+    db.commit()
+    assert placements(db) == states[3]
+
+
+# =============================================================================
+# Restore
+# =============================================================================
+
+def test_restore_to_point_in_time_and_undo(plan):
+    db = plan
+    edit(db, 1, carousel_id="C2")
+    at = checkpoint()
+    target = placements(db)
+    edit(db, 2, carousel_id="C2", shift=10)
+    edit(db, 1, shift=-10)
+    latest = placements(db)
+
+    _, count = history_service.restore(db, DAY, at)
+    db.commit()
+    assert count == 2
+    assert placements(db) == target
+
+    history_service.undo(db, DAY)
+    db.commit()
+    assert placements(db) == latest
+
+
+def test_restore_converts_times_with_an_offset(plan):
+    db = plan
+    edit(db, 1, carousel_id="C2")
+    at = checkpoint()
+    target = placements(db)
+    edit(db, 1, shift=-10)
+
+    # Same instant in KST: compared as UTC, not as the local wall clock
+    kst = at.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=9)))
+    assert history_service.state_as_of(db, DAY, kst) == history_service.state_as_of(db, DAY, at)
+    history_service.restore(db, DAY, kst)
+    db.commit()
+    assert placements(db) == target
+
+
+def test_restore_route_conflict_is_409(plan, client, monkeypatch):
+    def conflicting_restore(db, day, at):
+        raise HistoryConflictError("Assignment 1 was changed since")
+
+    monkeypatch.setattr(history_service, "restore", conflicting_restore)
+    response = client.post("/api/history/restore", params={"date": str(DAY), "at": "2025-11-16T09:00:00+09:00"})
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Assignment 1 was changed since"
+
+
+def test_restore_before_first_event_uses_baseline(plan):
+    db = plan
+    original = placements(db)
+    at = checkpoint()
+    edit(db, 1, carousel_id="C2")
+    edit(db, 3, shift=20)
+
+    history_service.restore(db, DAY, at)
+    db.commit()
+    assert placements(db) == original
+
+
+def test_restore_without_changes_is_a_no_op(plan):
+    db = plan
+    edit(db, 1, carousel_id="C2")
+    assert history_service.restore(db, DAY, checkpoint()) == (None, 0)
+
+
+def test_baseline_of_rolled_back_change_is_written_again(plan):
+    db = plan
+    original = placements(db)
+    row = db.get(Assignment, 1)
+    before = history_service.to_state(row)
+    row.carousel_id = "C2"
+    db.flush()
+    history_service.record(db, history_service.new_batch_id(), "MANUAL", before, history_service.to_state(row))
+    db.rollback()
+    assert db.query(PlanSnapshot).count() == 0
+
+    at = checkpoint()
+    edit(db, 2, carousel_id="C2")
+    assert db.query(PlanSnapshot).count() == 1
+    history_service.restore(db, DAY, at)
+    db.commit()
+    assert placements(db) == original
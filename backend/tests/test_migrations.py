@@ -0,0 +1,116 @@
+"""
+Migration Tests
+Migrated schema vs models, adopting pre-migration databases, version checks
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401
+from app import migrations
+from app.database import Base
+from app.migrations import versions
+from app.models import DailyUsage
+from app.services import analytics_service
+
+
+def schema(engine) -> dict:
+    """table -> {column: (type, nullable)} plus index columns."""
+    inspector = inspect(engine)
+    return {
+        table: (
+            {
+                column["name"]: (str(column["type"]), column["nullable"])
+                for column in inspector.get_columns(table)
+            },
+            sorted(tuple(index["column_names"]) for index in inspector.get_indexes(table)),
+        )
+        for table in inspector.get_table_names()
+        if table != migrations.version_table.name
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_matches_models(engine, tmp_path):
+    applied = migrations.upgrade(engine)
+    assert [migration.version for migration in applied] == [
+        migration.version for migration in versions.MIGRATIONS
+    ]
+    assert migrations.upgrade(engine) == []
+
+    expected = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    Base.metadata.create_all(expected)
+    assert schema(engine) == schema(expected)
+    expected.dispose()
+
+
+def test_database_from_before_migrations_is_adopted(engine):
+    with engine.begin() as connection:
+        versions._baseline(connection)  # What create_all on boot used to leave
+        connection.execute(text(
+            "INSERT INTO airlines (airline_code, airline_name) VALUES ('KE', 'Korean Air')"
+        ))
+    migrations.upgrade(engine)
+
+    with engine.connect() as connection:
+        assert migrations.current_version(connection) == migrations.SCHEMA_VERSION
+        assert connection.execute(text("SELECT airline_code, terminal FROM airlines")).all() == [("KE", None)]
+
+
+def test_daily_usage_is_backfilled(engine):
+    with engine.begin() as connection:
+        versions._baseline(connection)
+        connection.execute(text(
+            "INSERT INTO airlines (airline_code, airline_name) VALUES ('KE', 'Korean Air')"
+        ))
+        connection.execute(text(
+            "INSERT INTO carousels (carousel_id, terminal) VALUES ('C1', 'T1'), ('C2', 'T1')"
+        ))
+        connection.execute(text(
+            "INSERT INTO flights (flight_id, airline, flight_number, scheduled_time) VALUES "
+            "('KE001', 'KE', '001', '2025-11-16 08:00:00'), ('KE002', 'KE', '002', '2025-11-16 23:30:00')"
+        ))
+        connection.execute(text(
+            "INSERT INTO assignments (flight_id, carousel_id, start_time, end_time) VALUES "
+            "('KE001', 'C1', '2025-11-16 08:00:00', '2025-11-16 08:45:00'), "
+            "('KE001', 'C1', '2025-11-16 08:30:00', '2025-11-16 09:00:00'), "
+            "('KE002', 'C2', '2025-11-16 23:30:00', '2025-11-17 00:20:00')"
+        ))
+    migrations.upgrade(engine)
+
+    def stored(session) -> dict:
+        return {
+            (row.usage_date, row.scope, row.scope_id): (
+                row.minute_counts, row.assignment_count, row.busy_minutes, row.conflict_minutes,
+                row.peak_concurrency, row.peak_minute, row.hourly_minutes,
+                row.idle_gap_count, row.longest_idle_minutes,
+            )
+            for row in session.query(DailyUsage)
+        }
+
+    with Session(engine) as session:
+        backfilled = stored(session)
+        for day in (date(2025, 11, 16), date(2025, 11, 17)):
+            analytics_service.rebuild_day(session, day)
+        session.commit()
+        assert backfilled == stored(session)
+        assert len(backfilled) == 5  # C1, C2, T1 on the 16th; C2, T1 on the 17th
+
+
+def test_check_schema(engine):
+    with pytest.raises(migrations.SchemaVersionError):
+        migrations.check_schema(engine)
+    migrations.upgrade(engine, target=2)
+    with pytest.raises(migrations.SchemaVersionError):
+        migrations.check_schema(engine)
+    migrations.upgrade(engine)
+    assert migrations.check_schema(engine) == migrations.SCHEMA_VERSION
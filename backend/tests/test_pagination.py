@@ -0,0 +1,42 @@
+"""
+Pagination Tests
+Cursor encoding and validation
+"""
+
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from app.services.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("row_id", [42, "KE123_20251116"])
+def test_round_trip(row_id):
+    at = datetime(2025, 11, 16, 8, 30)
+    assert decode_cursor(encode_cursor(at, row_id)) == (at, row_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    raw_cursor({"a": 1}),
+    raw_cursor(["2025-11-16"]),
+    raw_cursor(["2025-11-16", 1, 2]),
+    raw_cursor(["2025-11-16", {"a": 1}]),
+    raw_cursor(["2025-11-16", None]),
+    raw_cursor(["2025-11-16", True]),
+    raw_cursor([20251116, 1]),
+    raw_cursor(["yesterday", 1]),
+    raw_cursor("2025-11-16"),
+])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError) as info:
+        decode_cursor(cursor)
+    assert str(info.value) == "Invalid cursor"
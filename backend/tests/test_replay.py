@@ -0,0 +1,56 @@
+"""
+Replay Tool Tests
+Ground truth and terminal of replayed flights
+"""
+
+import json
+
+import pytest
+
+from app.models import Carousel
+from app.tools.replay import load_revisions, load_terminals, replay_day
+
+TERMINALS = {"C3": "T1", "C13": "T2", "C14": "T2", "C20": "T2"}
+
+
+def write_feed(tmp_path):
+    path = tmp_path / "sys_input_dict_251116.json"
+    path.write_text(json.dumps({"flights": [
+        # Out of minute order on purpose; moved C14 -> C13 -> C20 (all T2)
+        {"flightNumber": "KE001", "timeline": [
+            {"minute": 900, "firstBag": 1000, "LastBag": 1020, "carousel": 20},
+            {"minute": 0, "firstBag": 960, "LastBag": 980, "carousel": 14},
+            {"minute": 600, "firstBag": 990, "LastBag": 1010, "carousel": 13},
+        ]},
+        {"flightNumber": "OZ002", "timeline": [
+            {"minute": 0, "firstBag": 960, "LastBag": 980, "carousel": 3},
+        ]},
+    ]}))
+    return path
+
+
+def test_actual_carousel_is_the_last_revision(tmp_path):
+    path = write_feed(tmp_path)
+    _, revisions, info = load_revisions(path)
+    assert [minute for minute, _ in revisions] == [0, 600, 900]
+    assert info["KE001"].actual_carousel == "C20"
+    assert info["KE001"].scheduled_carousel == "C14"
+
+    report = replay_day(path, TERMINALS)
+    assert report["feed"]["matches_feed"] == 2
+    assert report["feed"]["carousel_changes"] == 2
+
+
+def test_terminals_come_from_the_database(db, tmp_path):
+    # C20 was moved to T1 after POST /api/carousels/init
+    db.add_all([
+        Carousel(carousel_id=carousel_id, terminal=terminal)
+        for carousel_id, terminal in {**TERMINALS, "C20": "T1"}.items()
+    ])
+    db.commit()
+    assert load_terminals()["C20"] == "T1"
+
+
+def test_carousel_missing_from_the_database_is_an_error(tmp_path):
+    with pytest.raises(ValueError, match="C20"):
+        replay_day(write_feed(tmp_path), {"C3": "T1", "C13": "T2", "C14": "T2"})
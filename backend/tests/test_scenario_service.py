@@ -0,0 +1,152 @@
+"""
+Scenario Service Tests
+Promoting scenario edits against a live plan that moved on
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models import Airline, Assignment, Carousel, CarouselMaintenance, Flight
+from app.services import analytics_service, constraint_service, scenario_service
+from app.services.scenario_service import PromoteConflictError, StaleScenarioError
+
+DAY_START = datetime(2025, 11, 16)
+
+
+@pytest.fixture
+def plan(db):
+    """Flights 1 and 2 on C1 at 08:00 and 10:00, C2 empty."""
+    db.add(Airline(airline_code="KE", airline_name="Korean Air"))
+    db.add_all([Carousel(carousel_id="C1", terminal="T1"), Carousel(carousel_id="C2", terminal="T1")])
+    for n, hour in ((1, 8), (2, 10)):
+        start = DAY_START + timedelta(hours=hour)
+        db.add(Flight(flight_id=f"KE00{n}", airline="KE", flight_number=f"00{n}", scheduled_time=start))
+        row = Assignment(
+            assignment_id=n, flight_id=f"KE00{n}", carousel_id="C1",
+            start_time=start, end_time=start + timedelta(minutes=45),
+        )
+        db.add(row)
+        analytics_service.record_assignment(db, row)
+    db.commit()
+    constraint_service.invalidate()
+    yield db
+    constraint_service.invalidate()
+    scenario_service._bases.clear()
+
+
+def carousel_of(db, assignment_id: int) -> str:
+    db.expire_all()
+    return db.get(Assignment, assignment_id).carousel_id
+
+
+def test_promote_writes_the_overlay(plan):
+    db = plan
+    scenario = scenario_service.fork(db, DAY_START.date())
+    scenario_service.move(db, scenario, 1, carousel_id="C2")
+
+    assert scenario_service.promote(db, scenario) == 1
+    assert carousel_of(db, 1) == "C2"
+    with pytest.raises(KeyError):
+        scenario_service.get_scenario(scenario.scenario_id)
+
+
+def test_promote_rejects_overlap_with_live_change(plan):
+    db = plan
+    scenario = scenario_service.fork(db, DAY_START.date())
+    scenario_service.move(db, scenario, 1, carousel_id="C2")
+
+    # Meanwhile flight 2 was moved onto C2 at the same time as flight 1
+    db.execute(update(Assignment).where(Assignment.assignment_id == 2).values(
+        carousel_id="C2", start_time=DAY_START + timedelta(hours=8),
+        end_time=DAY_START + timedelta(hours=9),
+    ))
+    db.commit()
+
+    with pytest.raises(PromoteConflictError):
+        scenario_service.promote(db, scenario)
+    assert carousel_of(db, 1) == "C1"
+    scenario_service.get_scenario(scenario.scenario_id)  # Kept for another try
+
+
+def test_promote_rejects_new_constraint(plan):
+    db = plan
+    scenario = scenario_service.fork(db, DAY_START.date())
+    scenario_service.move(db, scenario, 1, carousel_id="C2")
+
+    db.add(CarouselMaintenance(
+        carousel_id="C2", start_time=DAY_START + timedelta(hours=7),
+        end_time=DAY_START + timedelta(hours=12),
+    ))
+    db.commit()
+    constraint_service.invalidate()
+
+    with pytest.raises(PromoteConflictError, match="maintenance"):
+        scenario_service.promote(db, scenario)
+    assert carousel_of(db, 1) == "C1"
+
+
+def test_promote_rejects_changed_row(plan):
+    db = plan
+    scenario = scenario_service.fork(db, DAY_START.date())
+    scenario_service.move(db, scenario, 1, carousel_id="C2")
+    db.execute(update(Assignment).where(Assignment.assignment_id == 1).values(
+        version=Assignment.version + 1,
+    ))
+    db.commit()
+
+    with pytest.raises(StaleScenarioError):
+        scenario_service.promote(db, scenario)
+
+
+def test_close_carousel_reassigns_under_the_scenario_lock(plan):
+    db = plan
+    scenario = scenario_service.fork(db, DAY_START.date())
+    result = scenario_service.close_carousel(db, scenario, "C1", DAY_START)
+
+    assert result == {"moved": [1, 2], "unplaced": []}
+    assert {item.carousel_id for item in scenario.plan()} == {"C2"}
+
+
+def test_close_carousel_leaves_unrelated_conflicts_alone(plan):
+    db = plan
+    # A conflict already in the base plan, on a carousel that stays open
+    db.add(Carousel(carousel_id="C3", terminal="T1"))
+    for n in (3, 4):
+        start = DAY_START + timedelta(hours=14)
+        db.add(Flight(flight_id=f"KE00{n}", airline="KE", flight_number=f"00{n}", scheduled_time=start))
+        db.add(Assignment(
+            assignment_id=n, flight_id=f"KE00{n}", carousel_id="C3",
+            start_time=start, end_time=start + timedelta(minutes=45),
+        ))
+    db.commit()
+    constraint_service.invalidate()
+
+    scenario = scenario_service.fork(db, DAY_START.date())
+    result = scenario_service.close_carousel(db, scenario, "C1", DAY_START)
+
+    assert result["moved"] == [1, 2]
+    assert scenario.get(3).carousel_id == scenario.get(4).carousel_id == "C3"
+
+
+def test_airline_terminal_only_moves_that_airline(plan):
+    db = plan
+    db.add(Airline(airline_code="OZ", airline_name="Asiana"))
+    db.add(Carousel(carousel_id="C3", terminal="T2"))
+    start = DAY_START + timedelta(hours=8)
+    db.add(Flight(flight_id="OZ001", airline="OZ", flight_number="001", scheduled_time=start))
+    db.add(Assignment(
+        assignment_id=3, flight_id="OZ001", carousel_id="C1",
+        start_time=start, end_time=start + timedelta(minutes=45),
+    ))
+    db.commit()
+    constraint_service.invalidate()
+
+    scenario = scenario_service.fork(db, DAY_START.date())
+    result = scenario_service.set_airline_terminal(db, scenario, "OZ", "T2")
+
+    # Flight 1 conflicts with OZ001 on C1 in the base plan, but is not displaced
+    assert result == {"moved": [3], "unplaced": []}
+    assert scenario.get(3).carousel_id == "C3"
+    assert scenario.get(1).carousel_id == "C1"
@@ -0,0 +1,83 @@
+"""
+Single-Flight Tests
+Concurrent identical calls share one computation, its result or its error
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import single_flight
+
+CALLERS = 8
+
+
+def wait_for_waiters(key, count: int) -> None:
+    """Block until `count` callers are waiting on the key's computation."""
+    deadline = time.monotonic() + 5
+    while True:
+        with single_flight._lock:
+            call = single_flight._calls.get(key)
+            if call is not None and call.waiters == count:
+                return
+        assert time.monotonic() < deadline, "callers never joined the computation"
+        time.sleep(0.001)
+
+
+def test_concurrent_identical_calls_run_once():
+    key = ("test", "once")
+    release = threading.Event()
+    runs = []
+
+    def build() -> bytes:
+        runs.append(1)
+        release.wait(5)
+        return b'{"day": "2025-11-16"}'
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(single_flight.run, key, build) for _ in range(CALLERS)]
+        wait_for_waiters(key, CALLERS - 1)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+    assert single_flight.stats()["in_flight"] == 0
+
+
+def test_failing_leader_propagates_and_releases_the_key():
+    key = ("test", "failure")
+    release = threading.Event()
+
+    def build() -> bytes:
+        release.wait(5)
+        raise RuntimeError("query failed")
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(single_flight.run, key, build) for _ in range(CALLERS)]
+        wait_for_waiters(key, CALLERS - 1)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="query failed"):
+                future.result(5)
+
+    # The key is free again: the next call runs its own computation
+    assert single_flight.run(key, lambda: b"ok") == b"ok"
+    assert single_flight.stats()["in_flight"] == 0
+
+
+def test_invalidate_detaches_the_running_computation():
+    key = ("test", "invalidate")
+    release = threading.Event()
+
+    with ThreadPoolExecutor(1) as pool:
+        stale = pool.submit(single_flight.run, key, lambda: release.wait(5) and b"before")
+        wait_for_waiters(key, 0)
+        single_flight.invalidate(lambda other: other == key)
+
+        # A caller after the write does not join the pre-write computation
+        assert single_flight.run(key, lambda: b"after") == b"after"
+        release.set()
+        assert stale.result(5) == b"before"